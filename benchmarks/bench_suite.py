@@ -0,0 +1,224 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_writer import big_config
+
+from nids_configurator.__main__ import apply_args_to_config, build_parser
+from nids_configurator.app import NIDSConfigurator
+from nids_configurator.osinfo import OSInfo
+
+# Benchmarks of the configurator's hot paths on synthetic production-size inputs. Results are written as
+# JSON and can be checked against a stored baseline. Every result is also divided by a fixed pure-Python
+# calibration loop, so a baseline taken on one machine stays meaningful on a faster or slower one.
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+PREFIX_COUNTS = (1000, 10000, 100000, 1000000)
+
+
+def ipv4_prefixes(count):
+    # Distinct /24s and /32s spread over the address space, in feed-like (unsorted) order.
+    step = 2654435761
+    return [f"{(i * step >> 24) & 255}.{(i * step >> 16) & 255}.{(i * step >> 8) & 255}.0/24" if i % 4
+            else f"{(i * step >> 24) & 255}.{(i * step >> 16) & 255}.{(i * step >> 8) & 255}.{i & 255}"
+            for i in range(count)]
+
+
+def calibrate(repeat=5):
+    def loop():
+        total = 0
+        for i in range(1000000):
+            total += i & 7
+        return total
+    return measure(loop, repeat)["best"]
+
+
+def measure(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "median": statistics.median(times), "repeat": repeat}
+
+
+def quiet(func):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+    return run
+
+
+def bench_validate_cidr_list(max_prefixes, repeat):
+    configurator = NIDSConfigurator()
+    for count in PREFIX_COUNTS:
+        if count > max_prefixes:
+            break
+        cidrs = ipv4_prefixes(count)
+        run = quiet(lambda cidrs=cidrs: configurator.validate_cidr_list(cidrs, 4))
+        yield f"validate_cidr_list/{count}", count, run, max(1, repeat if count < 1000000 else repeat // 2)
+
+
+def bench_save_config_yaml(tmpdir, repeat):
+    path = os.path.join(tmpdir, "nids-config.yml")
+    for entries in (1000, 10000, 50000):
+        configurator = NIDSConfigurator()
+        configurator.config = big_config(entries)
+        yield f"save_config_yaml/{entries}", entries, quiet(lambda c=configurator: c.save_config_yaml(path)), repeat
+
+
+def bench_parser(repeat):
+    # Typical fleet invocation: env-provided lists plus a handful of flags.
+    env = {"NDIS_IPV4_HOME_NETS": ",".join(ipv4_prefixes(1000)), "NDIS_INTERFACES": "eth0,eth1",
+           "NDIS_LOG_MODE": "both"}
+    argv = ["--non-interactive", "--nids-name", "bench", "--ipv4-excl", "10.1.0.0/16", "--compact-networks"]
+
+    def run():
+        saved = {key: os.environ.get(key) for key in env}
+        os.environ.update(env)
+        try:
+            for _ in range(100):
+                configurator = NIDSConfigurator()
+                apply_args_to_config(configurator, build_parser(configurator).parse_args(argv))
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+    yield "build_parser+apply_args_to_config/100", 100, run, repeat
+
+
+def bench_osinfo(repeat):
+    def run():
+        for _ in range(1000):
+            OSInfo()
+    yield "OSInfo.detect/1000", 1000, run, repeat
+
+
+def bench_startup(repeat):
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+
+    def run():
+        subprocess.run([sys.executable, "-m", "nids_configurator", "--help"], env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+    def bare():
+        subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+    yield "cli_startup/--help", 1, run, repeat
+    yield "cli_startup/bare_interpreter", 1, bare, repeat
+
+
+def run_suite(args):
+    calibration = calibrate()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        groups = [bench_validate_cidr_list(args.max_prefixes, args.repeat), bench_save_config_yaml(tmpdir, args.repeat),
+                  bench_parser(args.repeat), bench_osinfo(args.repeat), bench_startup(args.repeat)]
+        for group in groups:
+            for name, items, func, repeat in group:
+                if args.only and not any(pattern in name for pattern in args.only):
+                    continue
+                result = measure(func, repeat)
+                result["items"] = items
+                result["normalized"] = result["best"] / calibration
+                results[name] = result
+                print(f"{name:<42} {result['best'] * 1000:>10.2f} ms  (median {result['median'] * 1000:.2f} ms, "
+                      f"{result['normalized']:.2f}x calibration)", flush=True)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "calibration_s": calibration,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Return (regressions, lines); a result regresses when its normalized time exceeds the baseline's by more
+    than its tolerance. Per-benchmark tolerances come from the baseline's "tolerances" mapping."""
+    tolerances = baseline.get("tolerances", {})
+    regressions, lines = [], []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            lines.append(f"{name:<42} (no baseline)")
+            continue
+        allowed = tolerances.get(name, tolerance)
+        ratio = result["normalized"] / base["normalized"]
+        status = "ok"
+        if ratio > 1 + allowed:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - allowed:
+            status = "faster"
+        lines.append(f"{name:<42} {ratio:>6.2f}x baseline (tolerance {allowed:.0%}) {status}")
+    return regressions, lines
+
+
+def save_baseline(path, report, baseline=None):
+    # Tolerances are tuned by hand in the baseline file and survive re-baselining.
+    stored = dict(report, tolerances=(baseline or {}).get("tolerances", {}))
+    with open(path, "w", encoding="utf-8") as baseline_file:
+        json.dump(stored, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+    return stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the configurator's hot paths on synthetic inputs")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Baseline to compare against (default: benchmarks/baseline.json)")
+    parser.add_argument("--no-compare", action="store_true", help="Do not compare against the baseline")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store the results as the new baseline, keeping its tolerances")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown as a fraction (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark, the best one counts")
+    parser.add_argument("--max-prefixes", type=int, default=max(PREFIX_COUNTS),
+                        help="Largest validate_cidr_list input (default: 1000000)")
+    parser.add_argument("--only", action="append", help="Run only benchmarks whose name contains this (repeatable)")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+            output.write("\n")
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+    if args.save_baseline:
+        save_baseline(args.baseline, report, baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if args.no_compare or baseline is None:
+        return 0
+    regressions, lines = compare(report, baseline, args.tolerance)
+    print("\nAgainst baseline:")
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} benchmarks regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import argparse
+import os
+import tempfile
+import time
+
+import yaml
+
+from nids_configurator.app import NIDSConfigurator
+from nids_configurator.writer import write_config_yaml
+
+
+def big_config(entries):
+    config = NIDSConfigurator().default_config()
+    network = config["network"]
+    network["interfaces"] = [f"eth{i}" for i in range(8)]
+    network["ipv4_home_nets"] = [f"10.{i >> 8 & 255}.{i & 255}.0/24" for i in range(entries)]
+    network["ipv4_excluded_nets"] = [f"172.{16 + (i >> 16 & 15)}.{i >> 8 & 255}.{i & 255}/32" for i in range(entries)]
+    network["ipv6_home_nets"] = [f"2001:db8:{i:x}::/48" for i in range(entries)]
+    config["rules"]["enabled_rule_sets"] = [f"ruleset-{i}" for i in range(entries)]
+    return config
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare YAML config writers on large configs")
+    parser.add_argument("--entries", type=int, action="append", help="List length per section (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "nids-config.yml")
+        print(f"{'entries':>8} {'safe_dump':>10} {'writer':>10} {'speedup':>8}")
+        for entries in args.entries or [1000, 10000, 50000]:
+            config = big_config(entries)
+
+            def legacy():
+                with open(path, "w", encoding="utf-8") as config_file:
+                    yaml.safe_dump(config, config_file, sort_keys=False)
+
+            legacy_time = timed(legacy, args.repeat)
+            writer_time = timed(lambda: write_config_yaml(path, config), args.repeat)
+            print(f"{entries:>8} {legacy_time:>9.3f}s {writer_time:>9.3f}s {legacy_time / writer_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
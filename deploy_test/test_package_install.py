@@ -69,3 +69,11 @@ def test_cli_help_works(host):
     assert cmd.rc == 0
     # Make sure it’s actually our program
     assert "NIDS" in cmd.stdout or "nids" in cmd.stdout.lower()
+
+
+def test_opt_bundle_built_at_install(host):
+    f = host.file("/opt/nids-configurator/nids-configurator.pyz")
+    assert f.exists
+    assert f.is_file
+    # The wrapper should run the bundle instead of the loose modules
+    assert "nids-configurator.pyz" in host.file("/usr/bin/nids-configurator").content_string
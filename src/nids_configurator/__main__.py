@@ -1,6 +1,20 @@
 import os
+import sys
 import argparse
 from .app import NIDSConfigurator
+from .memestimate import parse_size
+from .osinfo import CAPTURE_METHODS
+from .ringplan import DEFAULT_BURST_MS, DEFAULT_RAM_FRACTION
+
+# Exit codes for --if-changed, so config management can tell a rewrite from a no-op.
+EXIT_UNCHANGED = 0
+EXIT_CHANGED = 3
+
+# Boolean options copied onto the configurator when set
+RUN_FLAGS = ("non_interactive", "compact_networks", "address_index", "if_changed", "scan_rules",
+             "check_rule_sets", "rule_manifest", "rule_store", "verify_rules", "check_interfaces",
+             "worker_layout", "plan_rings", "capture_filter", "capture_home_only",
+             "prune_rules", "estimate_memory", "shard_by_numa", "probe_syslog", "probe_local")
 
 
 def env_get(name, default=None):
@@ -20,6 +34,16 @@ def env_get_int(name, default=None):
         return default
 
 
+def env_get_float(name, default=None):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
 def env_get_bool(name, default=None):
     value = os.environ.get(name)
     if value is None:
@@ -40,6 +64,35 @@ def env_get_list(name, default=None):
     return [p for p in parts if p]
 
 
+def _number_type(convert, kind):
+    # argparse type that rejects zero and negative values; string defaults from env vars are checked too.
+    def parse(value):
+        try:
+            number = convert(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"'{value}' is not {kind}") from None
+        if number <= 0:
+            raise argparse.ArgumentTypeError(f"must be positive, got '{value}'")
+        return number
+    return parse
+
+
+positive_int = _number_type(int, "an integer")
+positive_float = _number_type(float, "a number")
+
+
+def parse_rule_vars(items):
+    # ["EXTERNAL_NET=!$HOME_NET", "DNS_SERVERS=[10.0.0.53,10.0.1.53]"] -> {"EXTERNAL_NET": "!$HOME_NET", ...}
+    variables = {}
+    for item in items or []:
+        name, sep, value = item.partition("=")
+        name = name.strip().lstrip("$")
+        if not sep or not name.replace("_", "").isalnum() or not value.strip():
+            raise ValueError(f"invalid rule variable '{item}', expected NAME=ADDRESSES")
+        variables[name] = value.strip()
+    return variables
+
+
 def build_parser(configurator):
     cfg = configurator.config
     general = cfg["general"]
@@ -60,6 +113,11 @@ def build_parser(configurator):
     parser.add_argument("--non-interactive", action="store_true", default=non_interactive_default,
                         help="Run in non-interactive mode (future extension)")
 
+    if_changed_default = env_get_bool("NDIS_IF_CHANGED", False)
+    parser.add_argument("--if-changed", action="store_true", default=if_changed_default,
+                        help=f"Only rewrite the config file when its content changes; exit {EXIT_UNCHANGED} when "
+                             f"unchanged and {EXIT_CHANGED} when changed (env: NDIS_IF_CHANGED)")
+
     nids_name_default = env_get("NDIS_NIDS_NAME", general["nids_name"])
     parser.add_argument("--nids-name", default=nids_name_default,
                         help="Name of the NIDS instance (env: NDIS_NIDS_NAME)")
@@ -82,6 +140,61 @@ def build_parser(configurator):
                         help="Network interface to monitor, can be used multiple times"
                              " (env: NDIS_INTERFACES, comma-separated)")
 
+    check_interfaces_default = env_get_bool("NDIS_CHECK_INTERFACES", False)
+    parser.add_argument("--check-interfaces", action="store_true", default=check_interfaces_default,
+                        help="Fail unless every interface exists in /sys/class/net and record link speed and "
+                             "queue counts in network.interface_details (env: NDIS_CHECK_INTERFACES)")
+
+    plan_rings_default = env_get_bool("NDIS_PLAN_RINGS", False)
+    parser.add_argument("--plan-rings", action="store_true", default=plan_rings_default,
+                        help="Size the capture rings from link speed, capture threads and RAM and write them to "
+                             "performance.rings (env: NDIS_PLAN_RINGS)")
+    burst_ms_default = env_get("NDIS_BURST_MS", str(DEFAULT_BURST_MS))
+    parser.add_argument("--burst-ms", type=positive_int, default=burst_ms_default,
+                        help=f"Line-rate burst each ring must absorb, in milliseconds (default: {DEFAULT_BURST_MS}, "
+                             "env: NDIS_BURST_MS)")
+    max_ring_ram_default = env_get("NDIS_MAX_RING_RAM", str(DEFAULT_RAM_FRACTION))
+    parser.add_argument("--max-ring-ram", type=positive_float, default=max_ring_ram_default,
+                        help=f"Warn when the rings need more than this fraction of RAM (default: "
+                             f"{DEFAULT_RAM_FRACTION}, env: NDIS_MAX_RING_RAM)")
+
+    instances_default = env_get_int("NDIS_INSTANCES", None)
+    parser.add_argument("--instances", type=int, default=instances_default, metavar="N",
+                        help="Also split the interfaces over N engine instances, balanced by capture threads: "
+                             "one config per instance with its own log file, shared address groups and rules "
+                             "as include files, and an <config name>.instances.yml index (env: NDIS_INSTANCES)")
+    shard_by_numa_default = env_get_bool("NDIS_SHARD_BY_NUMA", False)
+    parser.add_argument("--shard-by-numa", action="store_true", default=shard_by_numa_default,
+                        help="Like --instances, with one instance per NUMA node of the capture interfaces "
+                             "(env: NDIS_SHARD_BY_NUMA)")
+
+    sample_default = env_get("NDIS_SAMPLE", None)
+    parser.add_argument("--sample", type=positive_float, default=sample_default, metavar="SECONDS",
+                        help="Sample /proc/net/dev of the capture interfaces for SECONDS and write peak/p99 rates "
+                             "with recommended workers and ring size to performance.sampled (env: NDIS_SAMPLE)")
+    sample_interval_default = env_get("NDIS_SAMPLE_INTERVAL_MS", "100")
+    parser.add_argument("--sample-interval-ms", type=positive_int, default=sample_interval_default,
+                        help="Sampling interval in milliseconds (default: 100, env: NDIS_SAMPLE_INTERVAL_MS)")
+
+    capture_filter_default = env_get_bool("NDIS_CAPTURE_FILTER", False)
+    parser.add_argument("--capture-filter", action="store_true", default=capture_filter_default,
+                        help="Write a BPF filter expression that drops traffic to or from the excluded networks in "
+                             "the kernel to network.capture_filter (env: NDIS_CAPTURE_FILTER)")
+    capture_home_only_default = env_get_bool("NDIS_CAPTURE_HOME_ONLY", False)
+    parser.add_argument("--capture-home-only", action="store_true", default=capture_home_only_default,
+                        help="Like --capture-filter, and also drop traffic that touches no home network "
+                             "(env: NDIS_CAPTURE_HOME_ONLY)")
+
+    capture_method_default = env_get("NDIS_CAPTURE_METHOD", None)
+    parser.add_argument("--capture-method", choices=("auto",) + CAPTURE_METHODS, default=capture_method_default,
+                        help="Write the capture method to network.capture_method; 'auto' picks the fastest one "
+                             "the running kernel supports (env: NDIS_CAPTURE_METHOD)")
+
+    worker_layout_default = env_get_bool("NDIS_WORKER_LAYOUT", False)
+    parser.add_argument("--worker-layout", action="store_true", default=worker_layout_default,
+                        help="Compute capture worker counts and CPU affinity from the CPU/NUMA topology and "
+                             "write them to the performance section (env: NDIS_WORKER_LAYOUT)")
+
     ipv4_home_default = env_get_list("NDIS_IPV4_HOME_NETS", None)
     parser.add_argument("--ipv4-home", dest="ipv4_home_nets", action="append", default=ipv4_home_default,
                         help="IPv4 home network in CIDR, can be used multiple times"
@@ -103,11 +216,93 @@ def build_parser(configurator):
                         default=ipv6_excl_default, help="IPv6 excluded network in CIDR, can be used multiple times "
                                                         "(env: NDIS_IPV6_EXCLUDED_NETS, comma-separated)")
 
+    compact_default = env_get_bool("NDIS_COMPACT_NETWORKS", False)
+    parser.add_argument("--compact-networks", action="store_true", default=compact_default,
+                        help="Merge duplicate/overlapping networks, write the home-minus-excluded lists "
+                             "and warn about conflicts (env: NDIS_COMPACT_NETWORKS)")
+
+    address_index_default = env_get_bool("NDIS_ADDRESS_INDEX", False)
+    parser.add_argument("--address-index", action="store_true", default=address_index_default,
+                        help="Also write a binary home-network membership index next to the config file "
+                             "(env: NDIS_ADDRESS_INDEX)")
+
+    import_home_default = env_get_list("NDIS_IMPORT_HOME", None)
+    parser.add_argument("--import-home", action="append", default=import_home_default, metavar="FILE",
+                        help="Add the IPv4/IPv6 prefixes of a text or CSV file ('-' for stdin, gzip allowed) to the "
+                             "home networks, can be used multiple times (env: NDIS_IMPORT_HOME, comma-separated)")
+    import_excluded_default = env_get_list("NDIS_IMPORT_EXCLUDED", None)
+    parser.add_argument("--import-excluded", action="append", default=import_excluded_default, metavar="FILE",
+                        help="Add the prefixes of a text or CSV file to the excluded networks, can be used "
+                             "multiple times (env: NDIS_IMPORT_EXCLUDED, comma-separated)")
+    import_format_default = env_get("NDIS_IMPORT_FORMAT", None)
+    parser.add_argument("--import-format", choices=["text", "csv"], default=import_format_default,
+                        help="Format of imported files, guessed from the file name by default "
+                             "(env: NDIS_IMPORT_FORMAT)")
+    import_column_default = env_get("NDIS_IMPORT_COLUMN", "0")
+    parser.add_argument("--import-column", default=import_column_default,
+                        help="CSV column holding the prefix: a 0-based index, or a header name "
+                             "(default: 0, env: NDIS_IMPORT_COLUMN)")
+
     # ----- rules -----
     rule_paths_default = env_get_list("NDIS_RULE_PATHS", None)
     parser.add_argument("--rule-path", dest="rule_paths", action="append", default=rule_paths_default,
                         help="Rule directory path, can be used multiple times (env: NDIS_RULE_PATHS, comma-separated)")
 
+    scan_rules_default = env_get_bool("NDIS_SCAN_RULES", False)
+    parser.add_argument("--scan-rules", action="store_true", default=scan_rules_default,
+                        help="Scan the rule directories and report file and rule counts per path; only files "
+                             "whose size/mtime/inode changed since the last scan are read (env: NDIS_SCAN_RULES)")
+    rule_index_default = env_get("NDIS_RULE_INDEX", None)
+    parser.add_argument("--rule-index", default=rule_index_default,
+                        help="Rule scan index file, defaults to rule-index.json in the cache directory "
+                             "(env: NDIS_RULE_INDEX)")
+
+    check_rule_sets_default = env_get_bool("NDIS_CHECK_RULE_SETS", False)
+    parser.add_argument("--check-rule-sets", action="store_true", default=check_rule_sets_default,
+                        help="Fail when an enabled or disabled rule set name matches no file under the rule "
+                             "paths (env: NDIS_CHECK_RULE_SETS)")
+    rule_manifest_default = env_get_bool("NDIS_RULE_MANIFEST", False)
+    parser.add_argument("--rule-manifest", action="store_true", default=rule_manifest_default,
+                        help="Write the resolved rule file list to rules.rule_files so the engine does not "
+                             "have to glob at startup; implies --check-rule-sets (env: NDIS_RULE_MANIFEST)")
+
+    rule_store_default = env_get_bool("NDIS_RULE_STORE", False)
+    parser.add_argument("--rule-store", action="store_true", default=rule_store_default,
+                        help="Also write a binary, mmap-able rule store (sid, rev, action, protocol, text offset, "
+                             "enabled flag) next to the config file; only rule files whose content changed are "
+                             "parsed again (env: NDIS_RULE_STORE)")
+
+    verify_rules_default = env_get_bool("NDIS_VERIFY_RULES", False)
+    parser.add_argument("--verify-rules", action="store_true", default=verify_rules_default,
+                        help="Hash the rule files and record the tree digest in rules.rule_tree_digest; digests "
+                             "of unchanged files are cached (env: NDIS_VERIFY_RULES)")
+    rule_checksums_default = env_get("NDIS_RULE_CHECKSUMS", None)
+    parser.add_argument("--rule-checksums", default=rule_checksums_default, metavar="SHA256SUMS",
+                        help="Fail unless the rule files match this sha256sum-style vendor manifest; "
+                             "implies --verify-rules (env: NDIS_RULE_CHECKSUMS)")
+
+    prune_rules_default = env_get_bool("NDIS_PRUNE_RULES", False)
+    parser.add_argument("--prune-rules", action="store_true", default=prune_rules_default,
+                        help="Write the sids of enabled rules whose addresses can never match the home/excluded "
+                             "networks to a disable.conf next to the config file (env: NDIS_PRUNE_RULES)")
+    rule_vars_env = env_get("NDIS_RULE_VARS", None)
+    rule_vars_default = [item for item in rule_vars_env.split(";") if item.strip()] if rule_vars_env else None
+    parser.add_argument("--rule-var", dest="rule_vars", action="append", default=rule_vars_default,
+                        metavar="NAME=ADDRESSES",
+                        help="Define a rule address variable for --prune-rules, e.g. EXTERNAL_NET='!$HOME_NET'; "
+                             "variables other than HOME_NET that are not defined match any address, can be used "
+                             "multiple times (env: NDIS_RULE_VARS, semicolon-separated)")
+
+    estimate_memory_default = env_get_bool("NDIS_ESTIMATE_MEMORY", False)
+    parser.add_argument("--estimate-memory", action="store_true", default=estimate_memory_default,
+                        help="Print the expected engine memory per component (rules, pattern matcher, address "
+                             "tables, capture rings, flow table) (env: NDIS_ESTIMATE_MEMORY)")
+    memory_budget_default = env_get("NDIS_MEMORY_BUDGET", None)
+    parser.add_argument("--memory-budget", type=parse_size, default=memory_budget_default, metavar="SIZE",
+                        help="Fail without writing the config when the estimated engine memory exceeds SIZE, "
+                             "e.g. 4G; implies --estimate-memory, in batch mode it fails each host over budget "
+                             "(env: NDIS_MEMORY_BUDGET)")
+
     enabled_sets_default = env_get_list("NDIS_ENABLED_RULE_SETS", None)
     parser.add_argument("--enable-rule-set", dest="enabled_rule_sets", action="append",
                         default=enabled_sets_default,
@@ -136,6 +331,86 @@ def build_parser(configurator):
     parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
                         default=log_level_default, help="Logging level (env: NDIS_LOG_LEVEL)")
 
+    probe_syslog_default = env_get_bool("NDIS_PROBE_SYSLOG", False)
+    parser.add_argument("--probe-syslog", action="store_true", default=probe_syslog_default,
+                        help="Send bursts of synthetic RFC 5424 messages to the syslog target over UDP and TCP, "
+                             "and write the recommended transport and batching into the logging section "
+                             "(env: NDIS_PROBE_SYSLOG)")
+    probe_local_default = env_get_bool("NDIS_PROBE_LOCAL", False)
+    parser.add_argument("--probe-local", action="store_true", default=probe_local_default,
+                        help="Probe a bundled receiver on localhost instead of the target, which also measures "
+                             "loss and delivery latency (env: NDIS_PROBE_LOCAL)")
+    probe_messages_default = env_get_int("NDIS_PROBE_MESSAGES", 10000)
+    parser.add_argument("--probe-messages", type=int, default=probe_messages_default,
+                        help="Messages per probe burst (default: 10000, env: NDIS_PROBE_MESSAGES)")
+    probe_size_default = env_get_int("NDIS_PROBE_MESSAGE_SIZE", 512)
+    parser.add_argument("--probe-message-size", type=int, default=probe_size_default,
+                        help="Size of a probe message in bytes (default: 512, env: NDIS_PROBE_MESSAGE_SIZE)")
+    alert_rate_default = env_get_int("NDIS_ALERT_RATE", 1000)
+    parser.add_argument("--alert-rate", type=int, default=alert_rate_default,
+                        help="Expected peak alerts per second; the recommended transport must sustain twice "
+                             "this without loss (default: 1000, env: NDIS_ALERT_RATE)")
+
+    # ----- instrumentation -----
+    metrics_json_default = env_get("NDIS_METRICS_JSON", None)
+    parser.add_argument("--metrics-json", metavar="PATH", default=metrics_json_default,
+                        help="Write wall time, CPU time, peak RSS and item counts per stage as JSON "
+                             "(env: NDIS_METRICS_JSON)")
+    metrics_prom_default = env_get("NDIS_METRICS_PROM", None)
+    parser.add_argument("--metrics-prom", metavar="PATH", default=metrics_prom_default,
+                        help="Write the same metrics for the node_exporter textfile collector, e.g. "
+                             "/var/lib/node_exporter/textfile/nids_configurator.prom (env: NDIS_METRICS_PROM)")
+    profile_default = env_get("NDIS_PROFILE", None)
+    parser.add_argument("--profile", metavar="PATH", default=profile_default,
+                        help="Profile the run with cProfile and dump the stats to PATH (env: NDIS_PROFILE)")
+
+    # ----- watch -----
+    watch_default = env_get_bool("NDIS_WATCH", False)
+    parser.add_argument("--watch", action="store_true", default=watch_default,
+                        help="Keep running and render again when the env file, the batch manifest, imported "
+                             "network files or the rule directories change (env: NDIS_WATCH)")
+    env_file_default = env_get("NDIS_ENV_FILE", "/etc/default/nids-configurator")
+    parser.add_argument("--env-file", default=env_file_default,
+                        help="Env file read and watched in watch mode (default: /etc/default/nids-configurator, "
+                             "env: NDIS_ENV_FILE)")
+    debounce_default = env_get_int("NDIS_DEBOUNCE_MS", 1000)
+    parser.add_argument("--debounce-ms", type=int, default=debounce_default,
+                        help="Render once changes have been quiet for this long (default: 1000, "
+                             "env: NDIS_DEBOUNCE_MS)")
+    poll_interval_default = env_get_int("NDIS_POLL_INTERVAL_MS", 2000)
+    parser.add_argument("--poll-interval-ms", type=int, default=poll_interval_default,
+                        help="Stat interval when inotify is not available (default: 2000, env: NDIS_POLL_INTERVAL_MS)")
+    watch_polling_default = env_get_bool("NDIS_WATCH_POLLING", False)
+    parser.add_argument("--watch-polling", action="store_true", default=watch_polling_default,
+                        help="Poll file stats instead of using inotify (env: NDIS_WATCH_POLLING)")
+
+    # ----- service -----
+    serve_default = env_get("NDIS_SERVE_SOCKET", None)
+    parser.add_argument("--serve", metavar="SOCKET", default=serve_default,
+                        help="Run as a config service on this Unix socket: render, validate and diff requests "
+                             "as JSON lines, with the CLI/env values as base config (env: NDIS_SERVE_SOCKET)")
+    serve_http_default = env_get_int("NDIS_SERVE_HTTP_PORT", None)
+    parser.add_argument("--serve-http", type=int, metavar="PORT", default=serve_http_default,
+                        help="Also (or only) serve the same API over HTTP on 127.0.0.1:PORT "
+                             "(env: NDIS_SERVE_HTTP_PORT)")
+    cache_size_default = env_get_int("NDIS_RENDER_CACHE_SIZE", 256)
+    parser.add_argument("--render-cache-size", type=int, default=cache_size_default,
+                        help="Rendered configs kept by the service, least recently used are evicted "
+                             "(default: 256, env: NDIS_RENDER_CACHE_SIZE)")
+
+    # ----- batch -----
+    parser.add_argument("--batch", metavar="MANIFEST", default=None,
+                        help="Render one config per host from a CSV/JSONL/YAML manifest ('-' for stdin) "
+                             "without running the wizard")
+    parser.add_argument("--manifest-format", choices=["csv", "jsonl", "yaml"], default=None,
+                        help="Manifest format, guessed from the file extension by default")
+    output_dir_default = env_get("NDIS_OUTPUT_DIR", ".")
+    parser.add_argument("--output-dir", default=output_dir_default,
+                        help="Directory for per-host configs in batch mode (env: NDIS_OUTPUT_DIR)")
+    jobs_default = env_get_int("NDIS_JOBS", None)
+    parser.add_argument("--jobs", type=int, default=jobs_default,
+                        help="Worker processes for batch mode, defaults to the CPU count (env: NDIS_JOBS)")
+
     return parser
 
 
@@ -184,20 +459,126 @@ def apply_args_to_config(configurator, args):
     logging_cfg["log_level"] = args.log_level
 
 
-def main():
-    configurator = NIDSConfigurator()
-    parser = build_parser(configurator)
-    args = parser.parse_args()
-    if args.non_interactive:
-        configurator.non_interactive = True
+def apply_args_to_configurator(configurator, args):
+    for flag in RUN_FLAGS:
+        if getattr(args, flag):
+            setattr(configurator, flag, True)
     if args.output:
         configurator.config_path = args.output
+    configurator.rule_index = args.rule_index
+    configurator.rule_checksums = args.rule_checksums
+    configurator.capture_method = args.capture_method
+    configurator.burst_ms = args.burst_ms
+    configurator.max_ring_ram = args.max_ring_ram
+    configurator.sample_seconds = args.sample
+    configurator.sample_interval_ms = args.sample_interval_ms
+    configurator.memory_budget = args.memory_budget
+    configurator.instances = args.instances
+    configurator.probe_messages = args.probe_messages
+    configurator.probe_message_size = args.probe_message_size
+    configurator.alert_rate = args.alert_rate
+    configurator.rule_vars = args.rule_vars
+    configurator.import_home = args.import_home
+    configurator.import_excluded = args.import_excluded
+    configurator.import_format = args.import_format
+    configurator.import_column = int(args.import_column) if args.import_column.isdigit() else args.import_column
+    if args.metrics_json or args.metrics_prom:
+        from .instrument import Recorder
+        configurator.metrics = Recorder()
+
+
+def configurator_from_argv(argv=None):
+    configurator = NIDSConfigurator()
+    parser = build_parser(configurator)
+    args = parser.parse_args(argv)
+    try:
+        args.rule_vars = parse_rule_vars(args.rule_vars)
+    except ValueError as exc:
+        parser.error(str(exc))
+    apply_args_to_configurator(configurator, args)
 
     # Use CLI/env values to override defaults before running the wizard.
     # The interactive prompts will now show these values as defaults.
     apply_args_to_config(configurator, args)
+    return configurator, args
+
 
-    configurator.run()
+def _exit_code(code):
+    if code is None:
+        return 0
+    return code if isinstance(code, int) else 1
+
+
+def main():
+    configurator, args = configurator_from_argv()
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    exit_code = 0
+    try:
+        run_main(configurator, args)
+    except SystemExit as exc:
+        exit_code = _exit_code(exc.code)
+        raise
+    except BaseException:
+        exit_code = 1
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"Profile written to: {args.profile} (python -m pstats {args.profile})")
+        if configurator.metrics is not None:
+            from .instrument import write_metrics
+            report = configurator.metrics.report({"nids_name": configurator.config["general"]["nids_name"]},
+                                                 exit_code)
+            write_metrics(report, args.metrics_json, args.metrics_prom)
+
+
+def _rebuild(configurator):
+    rebuilt, args = configurator_from_argv()
+    # One recorder covers the whole watch session: stages are summed over every regeneration.
+    rebuilt.metrics = configurator.metrics
+    return rebuilt, args
+
+
+def run_main(configurator, args):
+    if args.watch:
+        from .watch import run_watch
+        # Each full render re-reads the environment, so the env file is applied on every rebuild.
+        sys.exit(run_watch(lambda: _rebuild(configurator), args.env_file, args.debounce_ms, args.poll_interval_ms,
+                           args.watch_polling))
+
+    if args.serve or args.serve_http is not None:
+        from .service import run_service
+        sys.exit(run_service(configurator.config, args.serve, args.serve_http, configurator.os_info,
+                             args.render_cache_size))
+
+    if args.batch:
+        from .batch import ManifestError, run_batch
+        # Per-host rows override the CLI/env values applied above.
+        rule_count = None
+        if args.memory_budget is not None and configurator.config["rules"]["rule_paths"]:
+            # Hosts share the rule tree, so it is counted once here rather than in every worker.
+            from .memestimate import count_active_rules
+            rule_count = count_active_rules(configurator.config["rules"], configurator.current_rule_inventory())
+        try:
+            with configurator.stage("batch_render") as stage:
+                summary = run_batch(args.batch, configurator.config, args.output_dir,
+                                    manifest_format=args.manifest_format, jobs=args.jobs,
+                                    compact_networks=args.compact_networks, if_changed=args.if_changed,
+                                    memory_budget=args.memory_budget, rule_count=rule_count)
+                stage.items = sum(summary.values())
+        except (ManifestError, OSError) as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+        sys.exit(1 if summary["failed"] else 0)
+
+    changed = configurator.run()
+    if args.if_changed:
+        sys.exit(EXIT_CHANGED if changed else EXIT_UNCHANGED)
 
 
 if __name__ == "__main__":
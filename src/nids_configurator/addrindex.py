@@ -0,0 +1,156 @@
+import bisect
+import mmap
+import os
+import socket
+import struct
+import sys
+import zlib
+from array import array
+
+from .cidrset import CIDRSet
+from .writer import atomic_write
+
+# On-disk layout (all integers little-endian):
+#
+#   header (64 bytes)  magic, version, flags, v4 count, v6 count, v4 offset, v6 offset, crc32 of the body
+#   v4 section         start u32[n4], end u32[n4]
+#   v6 section         start_hi u64[n6], start_lo u64[n6], end_hi u64[n6], end_lo u64[n6]
+#
+# Ranges are merged, sorted and disjoint, so a lookup is one bisect over the start column.
+
+MAGIC = b"NIDSADDR"
+VERSION = 1
+HEADER = struct.Struct("<8sHHQQQQI")
+HEADER_SIZE = 64
+LOW64 = (1 << 64) - 1
+
+
+class AddressIndexError(ValueError):
+    pass
+
+
+def index_path_for(config_path):
+    return os.path.splitext(config_path)[0] + ".addridx"
+
+
+def _column(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def build_index(ipv4_set, ipv6_set):
+    v4 = ipv4_set.intervals
+    v6 = ipv6_set.intervals
+    body = b"".join([
+        _column("I", [start for start, _ in v4]),
+        _column("I", [end for _, end in v4]),
+        _column("Q", [start >> 64 for start, _ in v6]),
+        _column("Q", [start & LOW64 for start, _ in v6]),
+        _column("Q", [end >> 64 for _, end in v6]),
+        _column("Q", [end & LOW64 for _, end in v6]),
+    ])
+    # Pad the v4 section so the v6 columns stay 8-byte aligned in the mapping.
+    v4_size = 8 * len(v4)
+    pad = b"\0" * (-v4_size % 8)
+    body = body[:v4_size] + pad + body[v4_size:]
+    header = HEADER.pack(MAGIC, VERSION, 0, len(v4), len(v6), HEADER_SIZE, HEADER_SIZE + v4_size + len(pad),
+                         zlib.crc32(body))
+    return header.ljust(HEADER_SIZE, b"\0") + body
+
+
+def write_index(path, ipv4_set, ipv6_set):
+    # Readers keep the old file mapped, so the new one must replace it by rename, never in place.
+    return atomic_write(path, build_index(ipv4_set, ipv6_set), backup=False)
+
+
+def write_config_index(path, network):
+    ipv4 = CIDRSet.from_cidrs(network.get("ipv4_home_nets", []), 4, errors=[])
+    ipv4 = ipv4.difference(CIDRSet.from_cidrs(network.get("ipv4_excluded_nets", []), 4, errors=[]))
+    ipv6 = CIDRSet.from_cidrs(network.get("ipv6_home_nets", []), 6, errors=[])
+    ipv6 = ipv6.difference(CIDRSet.from_cidrs(network.get("ipv6_excluded_nets", []), 6, errors=[]))
+    return write_index(path, ipv4, ipv6)
+
+
+class AddressIndex:
+    def __init__(self, path, verify=True):
+        self.path = path
+        with open(path, "rb") as index_file:
+            size = os.fstat(index_file.fileno()).st_size
+            if size < HEADER_SIZE:
+                raise AddressIndexError(f"{path}: file too short for an address index")
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load(verify)
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self, verify):
+        magic, version, _flags, n4, n6, off4, off6, crc = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise AddressIndexError(f"{self.path}: not an address index")
+        if version != VERSION:
+            raise AddressIndexError(f"{self.path}: unsupported index version {version}")
+        if off6 + 32 * n6 > len(self._map) or off4 + 8 * n4 > off6:
+            raise AddressIndexError(f"{self.path}: truncated index")
+        self._view = memoryview(self._map)
+        if verify and zlib.crc32(self._view[HEADER_SIZE:]) != crc:
+            raise AddressIndexError(f"{self.path}: checksum mismatch")
+        self.ipv4_count = n4
+        self.ipv6_count = n6
+        self._v4_start = self._cast(off4, "I", n4)
+        self._v4_end = self._cast(off4 + 4 * n4, "I", n4)
+        self._v6_start_hi = self._cast(off6, "Q", n6)
+        self._v6_start_lo = self._cast(off6 + 8 * n6, "Q", n6)
+        self._v6_end_hi = self._cast(off6 + 16 * n6, "Q", n6)
+        self._v6_end_lo = self._cast(off6 + 24 * n6, "Q", n6)
+
+    def _cast(self, offset, typecode, count):
+        size = array(typecode).itemsize
+        chunk = self._view[offset:offset + size * count]
+        if sys.byteorder == "little":
+            # Zero-copy: bisect runs directly over the mapped pages.
+            return chunk.cast(typecode)
+        column = array(typecode, chunk.tobytes())
+        column.byteswap()
+        return column
+
+    def contains_ipv4(self, address):
+        i = bisect.bisect_right(self._v4_start, address) - 1
+        return i >= 0 and address <= self._v4_end[i]
+
+    def contains_ipv6(self, address):
+        hi = address >> 64
+        lo = address & LOW64
+        first = bisect.bisect_left(self._v6_start_hi, hi)
+        last = bisect.bisect_right(self._v6_start_hi, hi, first)
+        i = bisect.bisect_right(self._v6_start_lo, lo, first, last) - 1
+        if i < 0:
+            return False
+        end_hi = self._v6_end_hi[i]
+        return hi < end_hi or (hi == end_hi and lo <= self._v6_end_lo[i])
+
+    def __contains__(self, address):
+        if isinstance(address, str):
+            if ":" in address:
+                return self.contains_ipv6(int.from_bytes(socket.inet_pton(socket.AF_INET6, address), "big"))
+            return self.contains_ipv4(int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big"))
+        if address.version == 6:
+            return self.contains_ipv6(int(address))
+        return self.contains_ipv4(int(address))
+
+    def close(self):
+        # Views must be released before the mapping can be closed.
+        for name in ("_v4_start", "_v4_end", "_v6_start_hi", "_v6_start_lo", "_v6_end_hi", "_v6_end_lo", "_view"):
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,21 +1,113 @@
-import ipaddress
 import os
 import sys
+from .instrument import NULL_STAGE
 from .osinfo import OSInfo
 
-try:
-    import yaml  # pip install pyyaml
-except ImportError:
-    yaml = None
+# Feature modules (cidrset, writer, addrindex, ...) are imported where they are used
+# to keep CLI startup and --help fast.
 
 
 class NIDSConfigurator():
-    def __init__(self, config_path="/etc/nids/nids-config.yml", non_interactive=False):
+    def __init__(self, config_path="/etc/nids/nids-config.yml", non_interactive=False, compact_networks=False,
+                 address_index=False, if_changed=False, scan_rules=False, rule_index=None,
+                 check_rule_sets=False, rule_manifest=False, rule_store=False, verify_rules=False,
+                 rule_checksums=None, check_interfaces=False, worker_layout=False, capture_method=None,
+                 plan_rings=False, burst_ms=None, max_ring_ram=None, sample_seconds=None, sample_interval_ms=None,
+                 capture_filter=False, capture_home_only=False, prune_rules=False, estimate_memory=False,
+                 memory_budget=None, instances=None, shard_by_numa=False, import_home=None, import_excluded=None,
+                 import_format=None, import_column=0, probe_syslog=False, probe_local=False, probe_messages=None,
+                 probe_message_size=None, alert_rate=None, rule_vars=None, metrics=None):
         self.non_interactive = non_interactive
         self.config_path = config_path
-        self.os_info = OSInfo()
+        self.compact_networks = compact_networks
+        self.address_index = address_index
+        self.if_changed = if_changed
+        self.scan_rules = scan_rules
+        self.rule_index = rule_index
+        self.rule_inventory = None
+        self.check_rule_sets = check_rule_sets
+        self.rule_manifest = rule_manifest
+        self.rule_store = rule_store
+        self.verify_rules = verify_rules
+        self.rule_checksums = rule_checksums
+        self.check_interfaces = check_interfaces
+        self.worker_layout = worker_layout
+        self.capture_method = capture_method
+        self.plan_rings = plan_rings
+        self.burst_ms = burst_ms
+        self.max_ring_ram = max_ring_ram
+        self.sample_seconds = sample_seconds
+        self.sample_interval_ms = sample_interval_ms
+        self.capture_filter = capture_filter
+        self.capture_home_only = capture_home_only
+        self.prune_rules = prune_rules
+        self.estimate_memory = estimate_memory
+        self.memory_budget = memory_budget
+        self.instances = instances
+        self.shard_by_numa = shard_by_numa
+        self.import_home = import_home
+        self.import_excluded = import_excluded
+        self.import_format = import_format
+        self.import_column = import_column
+        self.probe_syslog = probe_syslog
+        self.probe_local = probe_local
+        self.probe_messages = probe_messages
+        self.probe_message_size = probe_message_size
+        self.alert_rate = alert_rate
+        # Rule address variables ({"EXTERNAL_NET": "!$HOME_NET"}) used by rule pruning.
+        self.rule_vars = rule_vars
+        # instrument.Recorder collecting per-stage timings, or None when instrumentation is off.
+        self.metrics = metrics
+        self._os_info = None
+        self._net_interfaces = None
         self.config = self.default_config()
 
+    @property
+    def os_info(self):
+        # Detected on first use so --help and batch/argument parsing never touch /etc/os-release.
+        if self._os_info is None:
+            with self.stage("os_detect"):
+                self._os_info = OSInfo()
+        return self._os_info
+
+    @os_info.setter
+    def os_info(self, value):
+        self._os_info = value
+
+    def stage(self, name):
+        return NULL_STAGE if self.metrics is None else self.metrics.stage(name)
+
+    def run_stage(self, name, func, items=None):
+        # items() counts what the stage processed; it is only evaluated when instrumentation is on.
+        with self.stage(name) as stage:
+            result = func()
+            if items is not None and self.metrics is not None:
+                stage.items = items()
+        return result
+
+    def network_item_count(self):
+        network = self.config["network"]
+        return sum(len(network[key]) for key in ("ipv4_home_nets", "ipv4_excluded_nets", "ipv6_home_nets",
+                                                 "ipv6_excluded_nets"))
+
+    def rule_item_count(self):
+        if self.rule_inventory is not None:
+            return len(self.rule_inventory["files"])
+        rules = self.config["rules"]
+        return len(rules.get("rule_files") or rules["rule_paths"])
+
+    @property
+    def net_interfaces(self):
+        # sysfs interface inventory, read once on first use.
+        if self._net_interfaces is None:
+            from .netinfo import read_interfaces
+            self._net_interfaces = read_interfaces()
+        return self._net_interfaces
+
+    @net_interfaces.setter
+    def net_interfaces(self, value):
+        self._net_interfaces = value
+
     # noinspection PyMethodMayBeStatic
     def default_config(self):
         return {
@@ -92,18 +184,151 @@ class NIDSConfigurator():
         return items
 
     def validate_cidr_list(self, cidrs, ip_version):
+        from .cidrset import parse_cidr
         valid = []
-        for cidr in cidrs:
-            try:
-                if ip_version == 4:
-                    ipaddress.IPv4Network(cidr, strict=False)
-                else:
-                    ipaddress.IPv6Network(cidr, strict=False)
-                valid.append(cidr)
-            except ValueError:
-                print(f"Warning: '{cidr}' is not a valid IPv{ip_version} network; skipping.")
+        with self.stage("validate_cidr_list") as stage:
+            for cidr in cidrs:
+                try:
+                    parse_cidr(cidr, ip_version)
+                    valid.append(cidr)
+                except ValueError:
+                    print(f"Warning: '{cidr}' is not a valid IPv{ip_version} network; skipping.")
+            stage.items = len(cidrs)
         return valid
 
+    def optimize_networks(self, max_warnings=20):
+        from .cidrset import compact_network_config
+        conflicts = compact_network_config(self.config["network"])
+        for message in conflicts[:max_warnings]:
+            print(f"Warning: {message}")
+        if len(conflicts) > max_warnings:
+            print(f"Warning: ... and {len(conflicts) - max_warnings} more network conflicts")
+        return conflicts
+
+    def validate_interfaces(self, names):
+        from .netinfo import validate_interfaces
+        known, unknown = validate_interfaces(names, self.net_interfaces)
+        for name, suggestions in unknown.items():
+            hint = f" (did you mean: {', '.join(suggestions)}?)" if suggestions else ""
+            print(f"Warning: interface '{name}' does not exist on this system{hint}; skipping.")
+        return known
+
+    def import_network_lists(self):
+        from .cidrimport import import_networks
+        from .cidrset import CIDRSet
+        network = self.config["network"]
+        results = {}
+        for kind, paths in (("home", self.import_home), ("excluded", self.import_excluded)):
+            if not paths:
+                continue
+            try:
+                result = import_networks(paths, self.import_format, self.import_column)
+            except (OSError, ValueError, EOFError) as exc:
+                print(f"Error: cannot import {kind} networks: {exc}")
+                sys.exit(1)
+            print(f"{kind.capitalize()} network import:")
+            for line in result.report():
+                print(f"  {line}")
+            for v in (4, 6):
+                key = f"ipv{v}_{kind}_nets"
+                # Existing entries were validated already; errors=[] only guards hand-edited configs.
+                current = CIDRSet.from_cidrs(network.get(key, []), v, errors=[])
+                network[key] = current.union(result.networks(v)).to_cidrs()
+            results[kind] = result
+        return results
+
+    def check_network_interfaces(self):
+        from .netinfo import interface_details
+        network = self.config["network"]
+        known = self.validate_interfaces(network["interfaces"])
+        if len(known) != len(network["interfaces"]):
+            print("Error: unknown capture interfaces, see the warnings above.")
+            sys.exit(1)
+        network["interface_details"] = interface_details(known, self.net_interfaces)
+        return network["interface_details"]
+
+    def select_capture_method(self):
+        capabilities = self.os_info.capabilities()
+        supported = capabilities["capture_methods"]
+        method = self.capture_method
+        if method == "auto":
+            method = supported[0]
+        elif method not in supported:
+            print(f"Warning: capture method '{method}' is not supported by kernel {capabilities['kernel']} "
+                  f"(supported: {', '.join(supported)})")
+        print(f"Capture method: {method} (kernel {capabilities['kernel']})")
+        self.config["network"]["capture_method"] = method
+        return method
+
+    def plan_worker_layout(self, management_cores=1):
+        from .netinfo import interface_details
+        from .topology import plan_workers, read_topology
+        network = self.config["network"]
+        details = network.get("interface_details") or interface_details(network["interfaces"], self.net_interfaces)
+        section, warnings = plan_workers(read_topology(), network["interfaces"], details, management_cores)
+        for message in warnings:
+            print(f"Warning: {message}")
+        self.config["performance"] = section
+        return section
+
+    def plan_capture_rings(self, meminfo_path="/proc/meminfo"):
+        from .netinfo import interface_details
+        from .ringplan import DEFAULT_BURST_MS, DEFAULT_RAM_FRACTION, plan_rings, read_meminfo
+        network = self.config["network"]
+        performance = self.config.setdefault("performance", {})
+        details = network.get("interface_details") or interface_details(network["interfaces"], self.net_interfaces)
+        workers = performance.get("workers", {})
+        facts = {}
+        for name in network["interfaces"]:
+            info = details.get(name, {})
+            # One ring per capture thread: the worker layout if planned, else one per RX queue.
+            threads = workers.get(name, {}).get("threads") or info.get("rx_queues")
+            facts[name] = {"speed_mbps": info.get("speed_mbps"), "threads": threads}
+        try:
+            meminfo = read_meminfo(meminfo_path)
+        except OSError:
+            meminfo = {}
+        section, warnings = plan_rings(facts, meminfo, DEFAULT_BURST_MS if self.burst_ms is None else self.burst_ms,
+                                       DEFAULT_RAM_FRACTION if self.max_ring_ram is None else self.max_ring_ram)
+        for message in warnings:
+            print(f"Warning: {message}")
+        performance["rings"] = section
+        return section
+
+    def sample_traffic(self, net_dev_path=None):
+        from .netinfo import interface_details
+        from .ringplan import DEFAULT_BURST_MS
+        from .sampler import DEFAULT_INTERVAL_MS, PROC_NET_DEV, format_stats, recommend, take_snapshots, traffic_stats
+        network = self.config["network"]
+        interval_ms = DEFAULT_INTERVAL_MS if self.sample_interval_ms is None else self.sample_interval_ms
+        burst_ms = DEFAULT_BURST_MS if self.burst_ms is None else self.burst_ms
+        print(f"\nSampling {', '.join(network['interfaces'])} for {self.sample_seconds} s every {interval_ms} ms...")
+        try:
+            snapshots = take_snapshots(network["interfaces"], self.sample_seconds, interval_ms,
+                                       net_dev_path or PROC_NET_DEV)
+        except OSError as exc:
+            # No procfs (containers with a restricted /proc, non-Linux hosts).
+            print(f"Error: cannot sample traffic counters: {exc}")
+            sys.exit(1)
+        details = network.get("interface_details") or interface_details(network["interfaces"], self.net_interfaces)
+        sampled = {}
+        for name, stats in traffic_stats(snapshots).items():
+            recommendation = recommend(stats, details.get(name, {}).get("rx_queues"), burst_ms)
+            print(format_stats(name, stats, recommendation))
+            sampled[name] = dict(stats, recommended=recommendation)
+        for name in network["interfaces"]:
+            if name not in sampled:
+                print(f"Warning: no traffic counters for interface '{name}' in /proc/net/dev")
+        self.config.setdefault("performance", {})["sampled"] = sampled
+        return sampled
+
+    def build_capture_filter(self):
+        from .bpffilter import compile_filter
+        capture_filter = compile_filter(self.config["network"], home_only=self.capture_home_only)
+        print("\n".join(capture_filter.report()))
+        self.config["network"]["capture_filter"] = capture_filter.expression
+        return capture_filter
+
     def validate_paths(self, paths):
         valid = []
         for p in paths:
@@ -114,6 +339,34 @@ class NIDSConfigurator():
                 valid.append(p)
         return valid
 
+    def scan_rule_paths(self):
+        from .rulescan import RuleScanner, format_inventory
+        inventory = RuleScanner(self.rule_index).scan(self.config["rules"]["rule_paths"])
+        print("\nRule inventory:")
+        print("\n".join(format_inventory(inventory)))
+        self.rule_inventory = inventory
+        return inventory
+
+    def current_rule_inventory(self):
+        if self.rule_inventory is None:
+            from .rulescan import RuleScanner
+            self.rule_inventory = RuleScanner(self.rule_index).scan(self.config["rules"]["rule_paths"])
+        return self.rule_inventory
+
+    def resolve_rule_sets(self):
+        from .rulesets import RuleSetError, RuleSetIndex
+        rules = self.config["rules"]
+        index = RuleSetIndex.from_inventory(self.current_rule_inventory())
+        try:
+            rule_files = index.resolve(rules["enabled_rule_sets"], rules["disabled_rule_sets"])
+        except RuleSetError as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+        print(f"Resolved {len(rule_files)} rule files from {len(index)} known rule sets.")
+        if self.rule_manifest:
+            rules["rule_files"] = rule_files
+        return rule_files
+
     def configure_general(self):
         print("\n=== General settings ===")
         if self.non_interactive:
@@ -127,7 +380,15 @@ class NIDSConfigurator():
         if self.non_interactive:
             return
         network = self.config["network"]
-        interfaces = self.prompt_list("Network interfaces to monitor (e.g. eth0, ens33)", allow_empty=False)
+        if self.net_interfaces:
+            from .netinfo import format_interface
+            print("Available interfaces:")
+            for name, info in self.net_interfaces.items():
+                print(f"  {format_interface(name, info)}")
+        interfaces = []
+        while not interfaces:
+            interfaces = self.prompt_list("Network interfaces to monitor (e.g. eth0, ens33)", allow_empty=False)
+            interfaces = self.validate_interfaces(interfaces)
         network["interfaces"] = interfaces
 
         ipv4_home = self.prompt_list("IPv4 home networks in CIDR (e.g. 192.168.0.0/24)")
@@ -189,14 +450,214 @@ class NIDSConfigurator():
         logging_cfg["log_level"] = log_level
 
     def save_config_yaml(self, path):
-        if yaml is None:
+        from . import writer
+        if writer.require_yaml() is None:
             print("Error: PyYAML is not installed. Install it with:")
             print("  pip install pyyaml")
             sys.exit(1)
-        with open(path, "w", encoding="utf-8") as config_file:
-            yaml.safe_dump(self.config, config_file, sort_keys=False)
+        writer.write_config_yaml(path, self.config)
         print("\nConfiguration saved to:", path)
 
+    def save_config_if_changed(self, path):
+        from . import writer
+        from .changes import format_diff, write_if_changed
+        if writer.require_yaml() is None:
+            print("Error: PyYAML is not installed. Install it with:")
+            print("  pip install pyyaml")
+            sys.exit(1)
+        changed, diff = write_if_changed(path, self.config)
+        if changed:
+            print("\nConfiguration changed, saved to:", path)
+            print("\n".join(format_diff(diff)))
+        else:
+            print("\nConfiguration unchanged, not rewriting:", path)
+        return changed
+
+    def save_address_index(self, config_path):
+        from .addrindex import index_path_for, write_config_index
+        path = index_path_for(config_path)
+        size = write_config_index(path, self.config["network"])
+        print(f"Address index saved to: {path} ({size} bytes)")
+        return path
+
+    def verify_rule_integrity(self):
+        from .integrity import ChecksumManifestError, IntegrityChecker, read_checksum_manifest
+        expected = None
+        if self.rule_checksums:
+            try:
+                expected = read_checksum_manifest(self.rule_checksums)
+            except (ChecksumManifestError, OSError) as exc:
+                print(f"Error: cannot read rule checksum manifest: {exc}")
+                sys.exit(1)
+        report = IntegrityChecker().verify(self.current_rule_inventory(), expected)
+        print(f"Rule integrity: {report['files']} files, {report['hashed']} hashed, tree {report['tree_digest']}")
+        for path in report["unlisted"]:
+            print(f"Warning: rule file '{path}' is not in the checksum manifest")
+        if not report["ok"]:
+            for path in report["mismatched"]:
+                print(f"Error: checksum mismatch for '{path}'")
+            for path in report["missing"]:
+                print(f"Error: '{path}' from the checksum manifest is missing")
+            sys.exit(1)
+        self.config["rules"]["rule_tree_digest"] = report["tree_digest"]
+        return report
+
+    def prune_dead_rules(self, config_path):
+        from .ruleprune import RulePruner, disabled_sids_path_for, write_disabled_sids
+        rules = self.config["rules"]
+        rule_files = rules.get("rule_files") or sorted(self.current_rule_inventory()["files"])
+        report = RulePruner(self.config["network"], home_only=self.capture_home_only,
+                            variables=self.rule_vars).prune(rule_files)
+        path = disabled_sids_path_for(config_path)
+        write_disabled_sids(path, report["dead"])
+        print(f"Rule pruning: {len(report['dead'])} of {report['checked']} enabled rules can never match, "
+              f"~{report['memory_saved'] >> 20} MiB engine memory saved; disabled sids written to {path}")
+        rules["disabled_sids_file"] = path
+        return report
+
+    def estimate_engine_memory(self, disabled_rules=0):
+        from .memestimate import estimate_memory, format_estimate
+        inventory = self.current_rule_inventory() if self.config["rules"]["rule_paths"] else None
+        estimate = estimate_memory(self.config, inventory, disabled_rules=disabled_rules)
+        for line in format_estimate(estimate, self.memory_budget):
+            print(line)
+        if self.memory_budget is not None and estimate["total"] > self.memory_budget:
+            print(f"Error: estimated engine memory ({estimate['total'] >> 20} MiB) exceeds the budget "
+                  f"({self.memory_budget >> 20} MiB)")
+            sys.exit(1)
+        return estimate
+
+    def save_rule_store(self, config_path):
+        from .rulestore import build_store, store_path_for
+        rules = self.config["rules"]
+        rule_files = rules.get("rule_files")
+        if rule_files is None:
+            rule_files = sorted(self.current_rule_inventory()["files"])
+        path = store_path_for(config_path)
+        stats = build_store(path, rule_files)
+        print(f"Rule store saved to: {path} ({stats['rules']} rules from {stats['files']} files, "
+              f"{stats['reparsed']} files parsed, {stats['size']} bytes)")
+        return path
+
+    def save_instance_configs(self, config_path):
+        from .sharding import plan_shards, write_shards
+        try:
+            shards, warnings = plan_shards(self.config, self.instances, by_numa=self.shard_by_numa)
+        except ValueError as exc:
+            print(f"Error: cannot shard the configuration: {exc}")
+            sys.exit(1)
+        for message in warnings:
+            print(f"Warning: {message}")
+        path = write_shards(self.config, config_path, shards, if_changed=self.if_changed)
+        print(f"Instance configs saved: {len(shards)} instances, index {path}")
+        for shard in shards:
+            node = "" if shard["numa_node"] is None else f" (NUMA node {shard['numa_node']})"
+            print(f"  {shard['name']}: {', '.join(shard['interfaces'])}{node}")
+        return shards
+
+    def process_network(self):
+        # Optional stages run on the network settings once they are final.
+        if self.import_home or self.import_excluded:
+            self.import_network_lists()
+        if self.check_interfaces:
+            self.check_network_interfaces()
+        if self.capture_method:
+            self.select_capture_method()
+        if self.sample_seconds:
+            self.sample_traffic()
+        if self.worker_layout:
+            self.plan_worker_layout()
+        if self.plan_rings:
+            self.plan_capture_rings()
+        if self.compact_networks:
+            self.optimize_networks()
+        if self.capture_filter or self.capture_home_only:
+            self.build_capture_filter()
+
+    def process_logging(self):
+        # Optional stages run on the logging settings once they are final.
+        if self.probe_syslog:
+            self.probe_syslog_target()
+
+    def process_rules(self):
+        # Optional stages run on the rule settings once they are final.
+        if self.scan_rules:
+            self.scan_rule_paths()
+        if self.check_rule_sets or self.rule_manifest:
+            self.resolve_rule_sets()
+        if self.verify_rules or self.rule_checksums:
+            self.verify_rule_integrity()
+
+    def probe_syslog_target(self):
+        from .syslogprobe import (DEFAULT_ALERT_RATE, DEFAULT_MESSAGE_SIZE, DEFAULT_MESSAGES, ProbeError,
+                                  SyslogReceiver, format_probe, parse_target, probe_target, recommend, resolve_target)
+        logging_cfg = self.config["logging"]
+        if logging_cfg["mode"] not in ("syslog", "both"):
+            print("Syslog probe skipped: logging mode is 'file'")
+            return None
+        try:
+            addresses = resolve_target(*parse_target(logging_cfg["syslog_target"]))
+        except ProbeError as exc:
+            print(f"Error: invalid syslog target: {exc}")
+            sys.exit(1)
+        count = self.probe_messages or DEFAULT_MESSAGES
+        size = self.probe_message_size or DEFAULT_MESSAGE_SIZE
+        alert_rate = self.alert_rate or DEFAULT_ALERT_RATE
+        if self.probe_local:
+            # The bundled receiver stands in for the collector, so loss and delivery latency can be measured.
+            with SyslogReceiver() as receiver:
+                print(f"Probing local stand-in receiver {receiver.target} ({count} messages of {size} bytes)")
+                trials = probe_target(*receiver.address, count=count, size=size, receiver=receiver)
+        else:
+            family, sockaddr = addresses[0]
+            print(f"Probing syslog target {logging_cfg['syslog_target']} ({sockaddr[0]}, {count} messages of "
+                  f"{size} bytes)")
+            trials = probe_target(family, sockaddr, count=count, size=size)
+        recommendation = recommend(trials, alert_rate)
+        for line in format_probe(trials, recommendation):
+            print(line)
+        if recommendation is None:
+            print(f"Error: syslog target {logging_cfg['syslog_target']} accepts neither UDP nor TCP")
+            sys.exit(1)
+        if self.probe_local:
+            # The stand-in receiver says nothing about the real collector, so its results are only reported.
+            print("Local probe: the recommendation is not written to the config")
+            return recommendation
+        logging_cfg.update(recommendation["settings"])
+        return recommendation
+
+    def default_save_path(self):
+        if self.os_info.family in ("ubuntu", "rhel"):
+            return self.config_path
+        return "./nids-config.yml"
+
+    def save_outputs(self, save_path):
+        """Write the config and every enabled side file; returns whether the config file changed."""
+        dead_rules = 0
+        if self.prune_rules:
+            # Written before the config, which points at the generated disable list.
+            dead_rules = len(self.run_stage("prune_dead_rules", lambda: self.prune_dead_rules(save_path))["dead"])
+        if self.estimate_memory or self.memory_budget is not None:
+            # A config over budget is not written at all.
+            self.run_stage("estimate_engine_memory", lambda: self.estimate_engine_memory(dead_rules))
+        with self.stage("save_config_yaml") as stage:
+            if self.if_changed:
+                changed = self.save_config_if_changed(save_path)
+            else:
+                self.save_config_yaml(save_path)
+                changed = True
+            if self.metrics is not None:
+                stage.items = os.path.getsize(save_path)
+                self.metrics.set("config_bytes", stage.items)
+        if self.address_index and changed:
+            self.run_stage("save_address_index", lambda: self.save_address_index(save_path))
+        if self.rule_store:
+            # Rule files change independently of the config, so the store is refreshed on every run.
+            self.run_stage("save_rule_store", lambda: self.save_rule_store(save_path))
+        if self.shard_by_numa or (self.instances or 1) > 1:
+            self.run_stage("save_instance_configs", lambda: self.save_instance_configs(save_path))
+        return changed
+
     def run(self):
         print("============================================")
         print("        NIDS Configuration Application      ")
@@ -214,22 +675,23 @@ class NIDSConfigurator():
             print("\nWARNING: You are not running as root.")
             print("   Saving to system locations like /etc/nids may fail due to permissions.\n")
 
-        self.configure_general()
-        self.configure_network()
-        self.configure_rules()
-        self.configure_logging()
-
-        if self.os_info.family in ("ubuntu", "rhel"):
-            save_path = self.config_path
-        else:
-            save_path = "./nids-config.yml"
+        self.run_stage("configure_general", self.configure_general)
+        self.run_stage("configure_network", self.configure_network, self.network_item_count)
+        self.run_stage("process_network", self.process_network, self.network_item_count)
+        self.run_stage("configure_rules", self.configure_rules, self.rule_item_count)
+        self.run_stage("process_rules", self.process_rules, self.rule_item_count)
+        self.run_stage("configure_logging", self.configure_logging)
+        self.run_stage("process_logging", self.process_logging)
 
         print("\n=== Save configuration ===")
-        save_path = self.prompt_str("Path to save configuration", save_path)
-        self.save_config_yaml(save_path)
+        save_path = self.default_save_path()
+        if not self.non_interactive:
+            save_path = self.prompt_str("Path to save configuration", save_path)
+        changed = self.save_outputs(save_path)
 
         print("\nDone. This file can now be consumed by your NIDS engine.")
         print("Note: This application does not start or manage the NIDS process itself.")
+        return changed
 
 
 # def main():
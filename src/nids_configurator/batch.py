@@ -0,0 +1,266 @@
+import copy
+import csv
+import json
+import os
+import sys
+
+from .changes import write_if_changed
+from .cidrset import compact_network_config, parse_cidr
+from .memestimate import estimate_memory
+from .writer import require_yaml, write_config_yaml
+
+
+# Manifest column -> (config section, config key, kind).
+# Column names match the argparse destinations used by apply_args_to_config.
+MANIFEST_FIELDS = {
+    "nids_name": ("general", "nids_name", "str"),
+    "config_version": ("general", "config_version", "int"),
+    "enabled": ("general", "enabled", "bool"),
+    "interfaces": ("network", "interfaces", "list"),
+    "ipv4_home_nets": ("network", "ipv4_home_nets", "ipv4"),
+    "ipv4_excluded_nets": ("network", "ipv4_excluded_nets", "ipv4"),
+    "ipv6_home_nets": ("network", "ipv6_home_nets", "ipv6"),
+    "ipv6_excluded_nets": ("network", "ipv6_excluded_nets", "ipv6"),
+    "rule_paths": ("rules", "rule_paths", "list"),
+    "enabled_rule_sets": ("rules", "enabled_rule_sets", "list"),
+    "disabled_rule_sets": ("rules", "disabled_rule_sets", "list"),
+    "log_mode": ("logging", "mode", "str"),
+    "log_file": ("logging", "log_file", "str"),
+    "syslog_target": ("logging", "syslog_target", "str"),
+    "log_level": ("logging", "log_level", "str"),
+}
+
+CHOICES = {
+    "log_mode": ("file", "syslog", "both"),
+    "log_level": ("DEBUG", "INFO", "WARNING", "ERROR"),
+}
+
+CHUNK_SIZE = 256
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if ext in (".yml", ".yaml"):
+        return "yaml"
+    raise ManifestError(f"cannot guess manifest format of '{path}', use --manifest-format")
+
+
+def _iter_csv(stream):
+    reader = csv.DictReader(stream)
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except csv.Error as exc:
+        raise ManifestError(f"invalid CSV manifest at line {reader.line_num}: {exc}") from None
+
+
+def _iter_jsonl(stream):
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_no, ManifestError(f"invalid JSON: {exc}")
+            continue
+        yield line_no, row
+
+
+def _iter_yaml(stream):
+    yaml = require_yaml()
+    if yaml is None:
+        raise ManifestError("PyYAML is required for YAML manifests")
+    row_no = 0
+    try:
+        for doc in yaml.safe_load_all(stream):
+            for row in (doc if isinstance(doc, list) else [doc]):
+                row_no += 1
+                if row is not None:
+                    yield row_no, row
+    except yaml.YAMLError as exc:
+        raise ManifestError(f"invalid YAML manifest: {exc}") from None
+
+
+MANIFEST_READERS = {"csv": _iter_csv, "jsonl": _iter_jsonl, "yaml": _iter_yaml}
+
+
+def iter_manifest(stream, fmt):
+    # Yields (row number, row dict) without reading the whole manifest.
+    if fmt not in MANIFEST_READERS:
+        raise ManifestError(f"unknown manifest format '{fmt}'")
+    return MANIFEST_READERS[fmt](stream)
+
+
+def _to_list(value):
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    parts = [item.strip() for item in str(value).split(",")]
+    return [p for p in parts if p]
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    v = str(value).strip().lower()
+    if v in ("1", "true", "yes", "y", "on"):
+        return True
+    if v in ("0", "false", "no", "n", "off"):
+        return False
+    raise ValueError(f"'{value}' is not a boolean")
+
+
+def _to_cidrs(value, ip_version):
+    cidrs = _to_list(value)
+    for cidr in cidrs:
+        try:
+            parse_cidr(cidr, ip_version)
+        except ValueError:
+            raise ValueError(f"'{cidr}' is not a valid IPv{ip_version} network") from None
+    return cidrs
+
+
+def apply_overrides(config, row):
+    for field, value in row.items():
+        if field == "host" or value is None or value == "":
+            continue
+        if field not in MANIFEST_FIELDS:
+            raise ValueError(f"unknown field '{field}'")
+        section, key, kind = MANIFEST_FIELDS[field]
+        try:
+            if kind == "int":
+                value = int(value)
+            elif kind == "bool":
+                value = _to_bool(value)
+            elif kind == "list":
+                value = _to_list(value)
+            elif kind == "ipv4":
+                value = _to_cidrs(value, 4)
+            elif kind == "ipv6":
+                value = _to_cidrs(value, 6)
+            else:
+                value = str(value)
+        except ValueError as exc:
+            raise ValueError(f"{field}: {exc}") from None
+        if field in CHOICES and value not in CHOICES[field]:
+            raise ValueError(f"{field}: '{value}' is not one of {'/'.join(CHOICES[field])}")
+        config[section][key] = value
+    return config
+
+
+def host_output_path(output_dir, host):
+    host = str(host).strip()
+    if not host or host.startswith(".") or "/" in host or os.sep in host:
+        raise ValueError(f"invalid host name '{host}'")
+    return os.path.join(output_dir, f"{host}.yml")
+
+
+def check_memory_budget(config, memory_budget, rule_count=None):
+    estimate = estimate_memory(config, rule_count=rule_count or 0)
+    if estimate["total"] > memory_budget:
+        raise ValueError(f"estimated engine memory ({estimate['total'] >> 20} MiB) exceeds the budget "
+                         f"({memory_budget >> 20} MiB)")
+
+
+def render_host(base_config, row, output_dir, compact_networks=False, if_changed=False, memory_budget=None,
+                rule_count=None):
+    # Returns True when the host file was (re)written.
+    if not isinstance(row, dict):
+        raise ValueError("row is not a mapping")
+    path = host_output_path(output_dir, row.get("host") or "")
+    config = apply_overrides(copy.deepcopy(base_config), row)
+    if compact_networks:
+        compact_network_config(config["network"])
+    if memory_budget is not None:
+        check_memory_budget(config, memory_budget, rule_count)
+    # Output directory is a staging area: no backups, and one fsync per host would dominate the run.
+    if if_changed:
+        changed, _ = write_if_changed(path, config, backup=False, fsync=False)
+        return changed
+    write_config_yaml(path, config, backup=False, fsync=False)
+    return True
+
+
+def render_chunk(base_config, rows, output_dir, compact_networks=False, if_changed=False, memory_budget=None,
+                 rule_count=None):
+    # Runs inside a worker process; never raises so one bad host cannot sink the chunk.
+    results = []
+    for row_no, row in rows:
+        host = row.get("host") if isinstance(row, dict) else None
+        try:
+            if isinstance(row, Exception):
+                raise row
+            changed = render_host(base_config, row, output_dir, compact_networks, if_changed, memory_budget,
+                                  rule_count)
+            results.append((row_no, host, changed, None))
+        except (ValueError, OSError) as exc:
+            results.append((row_no, host, None, str(exc)))
+    return results
+
+
+def _chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _report(results, summary):
+    for row_no, host, changed, error in results:
+        if error is None:
+            summary["rendered" if changed else "unchanged"] += 1
+        else:
+            summary["failed"] += 1
+            print(f"Error: row {row_no} (host '{host}'): {error}", file=sys.stderr)
+
+
+def run_batch(manifest, base_config, output_dir, manifest_format=None, jobs=None, chunk_size=CHUNK_SIZE,
+              compact_networks=False, if_changed=False, memory_budget=None, rule_count=None):
+    if require_yaml() is None:
+        print("Error: PyYAML is not installed. Install it with:")
+        print("  pip install pyyaml")
+        sys.exit(1)
+    fmt = manifest_format or detect_format(manifest)
+    jobs = jobs or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    summary = {"rendered": 0, "unchanged": 0, "failed": 0}
+    options = (output_dir, compact_networks, if_changed, memory_budget, rule_count)
+
+    stream = sys.stdin if manifest == "-" else open(manifest, newline="", encoding="utf-8")
+    try:
+        chunks = _chunked(iter_manifest(stream, fmt), chunk_size)
+        if jobs == 1:
+            for chunk in chunks:
+                _report(render_chunk(base_config, chunk, *options), summary)
+        else:
+            from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+            # Keep a bounded number of chunks in flight so huge manifests stream through.
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                pending = set()
+                for chunk in chunks:
+                    pending.add(pool.submit(render_chunk, base_config, chunk, *options))
+                    if len(pending) >= jobs * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            _report(future.result(), summary)
+                for future in pending:
+                    _report(future.result(), summary)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    print(f"Batch finished: {summary['rendered']} rendered, {summary['unchanged']} unchanged, "
+          f"{summary['failed']} failed (output: {output_dir})")
+    return summary
@@ -0,0 +1,127 @@
+import math
+
+from .cidrset import CIDRSet, format_address, merge_intervals
+
+# Compiles home/excluded networks into a pcap-filter expression so excluded traffic is dropped in
+# the kernel. Instruction counts are estimates of libpcap's optimized output on Ethernet:
+#
+#   per family   ldh [12] + jeq ethertype                                     2
+#   IPv4 net     ld + [and #mask] + jeq, for source and destination           4-6
+#   IPv6 net     ld + jeq per 32-bit word of the prefix (+ and for a partial  2 per word and side
+#                last word), for source and destination
+#   program      ret #snaplen + ret #0                                        2
+
+BPF_MAXINSNS = 4096
+FAMILY_KEYWORDS = {4: "ip", 6: "ip6"}
+
+
+def prefix_instructions(ip_version, length):
+    if ip_version == 4:
+        return 2 * (2 + (length < 32))
+    return 2 * (2 * math.ceil(length / 32) + (length % 32 != 0))
+
+
+def coarsen(cidr_set, max_length):
+    # Widens every prefix longer than max_length to its /max_length supernet: a superset of the input.
+    shift = cidr_set.bits - max_length
+    low = (1 << shift) - 1
+    widened = [(start & ~low, end | low) for start, end in cidr_set.intervals]
+    return CIDRSet(cidr_set.ip_version, merge_intervals(widened))
+
+
+def _prefixes(cidr_set):
+    return [(cidr_set.ip_version, start, length) for start, length in cidr_set.prefixes()]
+
+
+def _cost(prefixes):
+    return sum(prefix_instructions(v, length) for v, _start, length in prefixes)
+
+
+def _match(prefixes):
+    return " or ".join(f"net {format_address(start, v)}/{length}" for v, start, length in prefixes)
+
+
+class CaptureFilter:
+    def __init__(self, expression, instructions, cost, left_to_engine=0, widened=False, unrestricted=()):
+        self.expression = expression
+        self.instructions = instructions
+        # Worst-case instructions run per packet: a packet matching nothing walks every compare of its family.
+        self.cost = cost
+        self.left_to_engine = left_to_engine
+        self.widened = widened
+        self.unrestricted = unrestricted
+
+    def report(self):
+        lines = [f"Capture filter: {len(self.expression)} bytes, ~{self.instructions} BPF instructions, "
+                 f"~{self.cost} instructions per packet worst case"]
+        if self.widened:
+            lines.append("  home networks were widened to fit the instruction limit")
+        for v in self.unrestricted:
+            lines.append(f"  IPv{v} home networks do not fit even as /8 supernets, IPv{v} traffic is not restricted")
+        if self.left_to_engine:
+            lines.append(f"  {self.left_to_engine} small excluded prefixes did not fit and are left to the engine")
+        return lines
+
+
+def _fit_home(home, budget):
+    # Home matches must stay complete, so prefixes that do not fit are widened, never cut. A family that
+    # is still over budget at /8 is left unrestricted, which passes all of its traffic to the engine.
+    fitted, widened, unrestricted = {}, False, []
+    for v, cidr_set in home.items():
+        length = cidr_set.bits
+        narrowed = cidr_set
+        while _cost(_prefixes(narrowed)) > budget // len(home) and length > 8:
+            length -= 1 if v == 4 else 4
+            narrowed = coarsen(cidr_set, length)
+            widened = True
+        if _cost(_prefixes(narrowed)) > budget // len(home):
+            unrestricted.append(v)
+        else:
+            fitted[v] = narrowed
+    return fitted, widened, unrestricted
+
+
+def compile_filter(network, home_only=False, max_instructions=BPF_MAXINSNS):
+    """Build the capture filter for a config "network" section.
+
+    Drops traffic to or from the excluded networks; with home_only also traffic that touches no home network.
+    """
+    home = {v: CIDRSet.from_cidrs(network.get(f"ipv{v}_home_nets", []), v, errors=[]) for v in (4, 6)}
+    excluded = {v: CIDRSet.from_cidrs(network.get(f"ipv{v}_excluded_nets", []), v, errors=[]) for v in (4, 6)}
+    home = {v: cidr_set for v, cidr_set in home.items() if home_only and cidr_set}
+    families = {v for v in (4, 6) if excluded[v] or v in home}
+    budget = max_instructions - 2 - 2 * len(families)
+
+    # At most half of the budget goes to home matches; the rest to excluded ones.
+    fitted, widened, unrestricted = _fit_home(home, budget // 2) if home else ({}, False, [])
+    # Excluded space outside (widened) home is already dropped by the home match.
+    excluded = {v: cidr_set.intersection(fitted[v]) if v in fitted else cidr_set for v, cidr_set in excluded.items()}
+    families = {v for v in (4, 6) if excluded[v] or v in fitted}
+    home_prefixes = [p for v in sorted(fitted) for p in _prefixes(fitted[v])]
+
+    # Excluded matches can be cut, whatever is left out is still dropped by the engine. Larger
+    # prefixes drop more traffic per instruction, so they are kept first.
+    remaining = budget - _cost(home_prefixes)
+    candidates = sorted((p for v in (4, 6) for p in _prefixes(excluded[v])), key=lambda p: p[2])
+    excluded_prefixes = []
+    for prefix in candidates:
+        size = prefix_instructions(prefix[0], prefix[2])
+        if size <= remaining:
+            excluded_prefixes.append(prefix)
+            remaining -= size
+    excluded_prefixes.sort()
+
+    terms = []
+    if home_prefixes:
+        # A family without home networks is not restricted.
+        passthrough = [FAMILY_KEYWORDS[v] for v in (4, 6) if v not in fitted]
+        terms.append(f"({' or '.join([_match(home_prefixes)] + passthrough)})")
+    if excluded_prefixes:
+        terms.append(f"not ({_match(excluded_prefixes)})")
+    if not terms:
+        return CaptureFilter("", 0, 0, unrestricted=unrestricted)
+
+    instructions = 2 + 2 * len(families) + _cost(home_prefixes) + _cost(excluded_prefixes)
+    cost = max(3 + _cost([p for p in home_prefixes + excluded_prefixes if p[0] == v]) for v in families)
+    return CaptureFilter(" and ".join(terms), instructions, cost, len(candidates) - len(excluded_prefixes), widened,
+                         unrestricted)
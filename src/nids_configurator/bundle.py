@@ -0,0 +1,65 @@
+import argparse
+import importlib.util
+import marshal
+import os
+import time
+import zipfile
+
+# Builds a single-file zipapp of the package with precompiled bytecode next to each
+# source file. zipimport loads the .pyc directly when it matches the running interpreter
+# and silently falls back to the bundled source otherwise, so a bundle built with a
+# different Python version is slower but never broken.
+
+MAIN = "from nids_configurator.__main__ import main\nmain()\n"
+
+
+def _dos_date_time(mtime):
+    # Zip timestamps have a 2 second resolution; zipimport compares the .pyc mtime against it.
+    date_time = time.localtime(mtime)[:6]
+    return date_time[:5] + (date_time[5] - date_time[5] % 2,)
+
+
+def _pyc(source, filename, date_time, optimize):
+    code = compile(source, filename, "exec", dont_inherit=True, optimize=optimize)
+    mtime = int(time.mktime(date_time + (0, 0, -1)))
+    header = importlib.util.MAGIC_NUMBER + (0).to_bytes(4, "little")
+    header += (mtime & 0xFFFFFFFF).to_bytes(4, "little") + (len(source) & 0xFFFFFFFF).to_bytes(4, "little")
+    return header + marshal.dumps(code)
+
+
+def build_bundle(output, package_dir=None, optimize=-1):
+    package_dir = package_dir or os.path.dirname(os.path.abspath(__file__))
+    package = os.path.basename(package_dir.rstrip(os.sep))
+    tmp_output = f"{output}.{os.getpid()}.tmp"
+    modules = 0
+    # Stored, not deflated: nothing to decompress at startup.
+    with zipfile.ZipFile(tmp_output, "w", compression=zipfile.ZIP_STORED) as bundle:
+        bundle.writestr("__main__.py", MAIN)
+        for name in sorted(os.listdir(package_dir)):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(package_dir, name)
+            with open(path, "rb") as source_file:
+                source = source_file.read()
+            date_time = _dos_date_time(os.stat(path).st_mtime)
+            arcname = f"{package}/{name}"
+            bundle.writestr(zipfile.ZipInfo(arcname, date_time), source)
+            bundle.writestr(zipfile.ZipInfo(arcname + "c", date_time), _pyc(source, arcname, date_time, optimize))
+            modules += 1
+    os.chmod(tmp_output, 0o755)
+    os.replace(tmp_output, output)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python3 -m nids_configurator.bundle",
+                                     description="Build a precompiled single-file nids-configurator bundle")
+    parser.add_argument("output", help="Path of the .pyz file to write")
+    parser.add_argument("--package-dir", default=None, help="Package directory to bundle (default: this package)")
+    args = parser.parse_args()
+    modules = build_bundle(args.output, args.package_dir)
+    print(f"Bundled {modules} modules into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import json
+import os
+
+# On-disk caches (rule index, digests, probe results) live in one directory:
+# NDIS_CACHE_DIR if set, /var/cache/nids-configurator for root, ~/.cache/nids-configurator otherwise.
+
+SYSTEM_CACHE_DIR = "/var/cache/nids-configurator"
+
+
+def cache_dir():
+    path = os.environ.get("NDIS_CACHE_DIR")
+    if not path:
+        if os.geteuid() == 0:
+            path = SYSTEM_CACHE_DIR
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            path = os.path.join(base, "nids-configurator")
+    return path
+
+
+def cache_path(name):
+    return os.path.join(cache_dir(), name)
+
+
+def load_json(path, version):
+    # A missing, unreadable or outdated cache is simply treated as empty.
+    try:
+        with open(path, encoding="utf-8") as cache_file:
+            data = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    return data
+
+
+def save_json(path, data):
+    from .writer import atomic_write
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        atomic_write(path, json.dumps(data, separators=(",", ":")), backup=False, fsync=False)
+    except OSError as exc:
+        print(f"Warning: could not write cache '{path}': {exc}")
+        return False
+    return True
@@ -0,0 +1,66 @@
+import json
+
+from .writer import require_yaml, write_config_yaml
+
+
+def canonical_digest(config):
+    # Key order and YAML formatting do not matter, only the semantic content.
+    import hashlib
+    canonical = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_config_yaml(path):
+    yaml = require_yaml()
+    loader = getattr(yaml, "CSafeLoader", None) or yaml.SafeLoader
+    try:
+        with open(path, encoding="utf-8") as config_file:
+            data = yaml.load(config_file, Loader=loader)
+    except FileNotFoundError:
+        return None
+    except yaml.YAMLError as exc:
+        print(f"Warning: existing config '{path}' is not valid YAML ({exc}); it will be replaced.")
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _changed_keys(old_section, new_section):
+    if not isinstance(old_section, dict) or not isinstance(new_section, dict):
+        return []
+    missing = object()
+    return sorted(key for key in set(old_section) | set(new_section)
+                  if old_section.get(key, missing) != new_section.get(key, missing))
+
+
+def diff_sections(old, new):
+    old = old or {}
+    diff = {}
+    for section in list(new) + [s for s in old if s not in new]:
+        if section not in old:
+            keys = sorted(new[section]) if isinstance(new[section], dict) else []
+            diff[section] = {"status": "added", "keys": keys}
+        elif section not in new:
+            diff[section] = {"status": "removed", "keys": []}
+        elif old[section] != new[section]:
+            diff[section] = {"status": "changed", "keys": _changed_keys(old[section], new[section])}
+    return diff
+
+
+def format_diff(diff):
+    if not diff:
+        return ["  (no changes)"]
+    lines = []
+    for section, change in diff.items():
+        keys = f" ({', '.join(change['keys'])})" if change["keys"] else ""
+        lines.append(f"  {section}: {change['status']}{keys}")
+    return lines
+
+
+def write_if_changed(path, config, backup=True, fsync=True):
+    # Returns (changed, section diff); the file and its mtime are left alone when nothing changed.
+    existing = load_config_yaml(path)
+    if existing is not None and canonical_digest(existing) == canonical_digest(config):
+        return False, {}
+    diff = diff_sections(existing, config)
+    write_config_yaml(path, config, backup=backup, fsync=fsync)
+    return True, diff
@@ -0,0 +1,231 @@
+import bisect
+import socket
+
+# Networks are held as inclusive integer intervals (start, end) so that merging,
+# subtraction and membership are plain integer comparisons on sorted lists.
+
+FAMILIES = {4: (socket.AF_INET, 32), 6: (socket.AF_INET6, 128)}
+
+
+# Host-bit masks indexed by prefix length.
+HOST_MASKS = {version: [(1 << (bits - length)) - 1 for length in range(bits + 1)]
+              for version, (_, bits) in FAMILIES.items()}
+
+
+def _parse_cidr_slow(text, ip_version):
+    # Keeps the exact ipaddress semantics (netmask notation, error messages) for odd input.
+    import ipaddress
+    if ip_version == 4:
+        net = ipaddress.IPv4Network(text, strict=False)
+    else:
+        net = ipaddress.IPv6Network(text, strict=False)
+    return int(net.network_address), int(net.broadcast_address)
+
+
+def iter_parse_cidrs(cidrs, ip_version, errors=None):
+    # Yields (text, start, end); invalid entries raise ValueError or are appended to `errors`.
+    family = FAMILIES[ip_version][0]
+    masks = HOST_MASKS[ip_version]
+    inet_pton = socket.inet_pton
+    from_bytes = int.from_bytes
+    for text in cidrs:
+        addr, sep, prefix = text.strip().partition("/")
+        try:
+            value = from_bytes(inet_pton(family, addr), "big")
+            if not sep:
+                host_mask = 0
+            elif prefix.isdigit() and prefix.isascii():
+                host_mask = masks[int(prefix)]
+            else:
+                raise ValueError(prefix)
+        except (OSError, ValueError, IndexError):
+            try:
+                start, end = _parse_cidr_slow(text, ip_version)
+            except ValueError:
+                if errors is None:
+                    raise
+                errors.append(text)
+                continue
+            yield text, start, end
+            continue
+        start = value & ~host_mask
+        yield text, start, start | host_mask
+
+
+def parse_cidr(text, ip_version):
+    for _, start, end in iter_parse_cidrs((text,), ip_version):
+        return start, end
+
+
+def format_address(value, ip_version):
+    family, bits = FAMILIES[ip_version]
+    return socket.inet_ntop(family, value.to_bytes(bits // 8, "big"))
+
+
+def merge_intervals(intervals):
+    # One tuple per merged run, no intermediate lists: this is the hot loop of bulk imports.
+    merged = []
+    append = merged.append
+    run_start, run_end = None, -2
+    for start, end in sorted(intervals):
+        if start <= run_end + 1:
+            if end > run_end:
+                run_end = end
+        else:
+            if run_start is not None:
+                append((run_start, run_end))
+            run_start, run_end = start, end
+    if run_start is not None:
+        append((run_start, run_end))
+    return merged
+
+
+def subtract_intervals(left, right):
+    # Both inputs must be merged (sorted, disjoint, non-adjacent).
+    result = []
+    j = 0
+    for start, end in left:
+        while j < len(right) and right[j][1] < start:
+            j += 1
+        k = j
+        while k < len(right) and right[k][0] <= end:
+            cut_start, cut_end = right[k]
+            if cut_start > start:
+                result.append((start, cut_start - 1))
+            start = cut_end + 1
+            if start > end:
+                break
+            k += 1
+        if start <= end:
+            result.append((start, end))
+    return result
+
+
+def intersect_intervals(left, right):
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        start = max(left[i][0], right[j][0])
+        end = min(left[i][1], right[j][1])
+        if start <= end:
+            result.append((start, end))
+        if left[i][1] < right[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def interval_to_prefixes(start, end, bits):
+    size = end - start + 1
+    if not size & (size - 1) and not start & (size - 1):
+        return [(start, bits - size.bit_length() + 1)]
+    prefixes = []
+    while start <= end:
+        # Largest aligned block starting at `start` that does not run past `end`.
+        size = (start & -start).bit_length() - 1 if start else bits
+        span = (end - start + 1).bit_length() - 1
+        size = min(size, span)
+        prefixes.append((start, bits - size))
+        start += 1 << size
+    return prefixes
+
+
+class CIDRSet:
+    def __init__(self, ip_version, intervals=()):
+        if ip_version not in FAMILIES:
+            raise ValueError(f"unsupported IP version {ip_version}")
+        self.ip_version = ip_version
+        self.bits = FAMILIES[ip_version][1]
+        self.intervals = merge_intervals(intervals)
+        self._ends = None
+
+    @classmethod
+    def from_cidrs(cls, cidrs, ip_version, errors=None):
+        return cls(ip_version, [(start, end) for _, start, end in iter_parse_cidrs(cidrs, ip_version, errors)])
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def __bool__(self):
+        return bool(self.intervals)
+
+    def __eq__(self, other):
+        return isinstance(other, CIDRSet) and (self.ip_version, self.intervals) == (other.ip_version, other.intervals)
+
+    def _locate(self, address):
+        # Index of the first interval ending at or after `address`.
+        if self._ends is None or len(self._ends) != len(self.intervals):
+            self._ends = [end for _, end in self.intervals]
+        return bisect.bisect_left(self._ends, address)
+
+    def __contains__(self, address):
+        i = self._locate(address)
+        return i < len(self.intervals) and self.intervals[i][0] <= address
+
+    def covers(self, start, end):
+        i = self._locate(start)
+        return i < len(self.intervals) and self.intervals[i][0] <= start and end <= self.intervals[i][1]
+
+    def overlaps(self, start, end):
+        i = self._locate(start)
+        return i < len(self.intervals) and self.intervals[i][0] <= end
+
+    def union(self, other):
+        return CIDRSet(self.ip_version, self.intervals + other.intervals)
+
+    def difference(self, other):
+        result = CIDRSet(self.ip_version)
+        result.intervals = subtract_intervals(self.intervals, other.intervals)
+        return result
+
+    def intersection(self, other):
+        result = CIDRSet(self.ip_version)
+        result.intervals = intersect_intervals(self.intervals, other.intervals)
+        return result
+
+    def address_count(self):
+        return sum(end - start + 1 for start, end in self.intervals)
+
+    def prefixes(self):
+        for start, end in self.intervals:
+            yield from interval_to_prefixes(start, end, self.bits)
+
+    def to_cidrs(self):
+        family, bits = FAMILIES[self.ip_version]
+        inet_ntop = socket.inet_ntop
+        width = bits // 8
+        return [f"{inet_ntop(family, start.to_bytes(width, 'big'))}/{length}" for start, length in self.prefixes()]
+
+
+def compact_network_config(network):
+    # Collapses the home/excluded lists of a config "network" section in place and
+    # adds the minimal home-minus-excluded lists. Returns a list of conflict messages.
+    conflicts = []
+    for ip_version in (4, 6):
+        home_key = f"ipv{ip_version}_home_nets"
+        excl_key = f"ipv{ip_version}_excluded_nets"
+        parsed = {}
+        for key in (home_key, excl_key):
+            errors = []
+            parsed[key] = list(iter_parse_cidrs(network.get(key, []), ip_version, errors))
+            conflicts.extend(f"'{cidr}' in {key} is not a valid IPv{ip_version} network; dropped" for cidr in errors)
+        home = CIDRSet(ip_version, [(start, end) for _, start, end in parsed[home_key]])
+        excluded = CIDRSet(ip_version, [(start, end) for _, start, end in parsed[excl_key]])
+
+        for cidr, start, end in parsed[home_key]:
+            if excluded.covers(start, end):
+                conflicts.append(f"IPv{ip_version} home network '{cidr}' is fully covered by {excl_key}")
+        if home:
+            for cidr, start, end in parsed[excl_key]:
+                if not home.overlaps(start, end):
+                    conflicts.append(f"IPv{ip_version} excluded network '{cidr}' is outside every home network")
+
+        effective = home.difference(excluded)
+        if home and not effective:
+            conflicts.append(f"IPv{ip_version} home networks are entirely excluded")
+
+        network[home_key] = home.to_cidrs()
+        network[excl_key] = excluded.to_cidrs()
+        network[f"ipv{ip_version}_effective_home_nets"] = effective.to_cidrs()
+    return conflicts
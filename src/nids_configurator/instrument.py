@@ -0,0 +1,156 @@
+import os
+import time
+
+# Per-stage instrumentation: wall time, CPU time, peak RSS and item counts for each stage of a run.
+# Disabled runs use NULL_STAGE, so an instrumented call site costs one attribute check; `resource`
+# and the exporters are only loaded when a recorder exists.
+
+METRIC_PREFIX = "nids_configurator"
+
+
+class NullStage:
+    # Stand-in when instrumentation is off; item counts set on it are ignored.
+    items = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+def peak_rss_bytes():
+    """High-water mark of this process's resident set; ru_maxrss is in KiB on Linux, bytes on macOS."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class Stage:
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+        self.items = None
+
+    def __enter__(self):
+        self.rss = peak_rss_bytes()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        rss = peak_rss_bytes()
+        self.recorder.add(self.name, wall, cpu, rss, rss - self.rss, self.items)
+        return False
+
+
+class Recorder:
+    """Collects stage measurements; a stage entered several times (one per CIDR list) is summed."""
+
+    def __init__(self):
+        self.stages = {}
+        self.gauges = {}
+        self.started = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+    def stage(self, name):
+        return Stage(self, name)
+
+    def add(self, name, wall, cpu, peak_rss, rss_growth, items=None):
+        stage = self.stages.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                              "peak_rss_bytes": 0, "rss_growth_bytes": 0, "items": None})
+        stage["calls"] += 1
+        stage["wall_seconds"] += wall
+        stage["cpu_seconds"] += cpu
+        stage["peak_rss_bytes"] = max(stage["peak_rss_bytes"], peak_rss)
+        stage["rss_growth_bytes"] += rss_growth
+        if items is not None:
+            stage["items"] = (stage["items"] or 0) + items
+
+    def set(self, name, value):
+        # Run-level values such as the size of the written config.
+        self.gauges[name] = value
+
+    def report(self, labels=None, exit_code=0):
+        return {
+            "labels": dict(labels or {}),
+            "started": self.started,
+            "wall_seconds": time.perf_counter() - self.wall,
+            "cpu_seconds": time.process_time() - self.cpu,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "exit_code": exit_code,
+            "gauges": dict(self.gauges),
+            "stages": {name: dict(stage) for name, stage in self.stages.items()},
+        }
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    # repr keeps full precision (timestamps); "%g" would round to six digits.
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+RUN_METRICS = (
+    ("render_duration_seconds", "wall_seconds", "Wall time of the whole run."),
+    ("render_cpu_seconds", "cpu_seconds", "CPU time of the whole run."),
+    ("peak_rss_bytes", "peak_rss_bytes", "Peak resident set size of the run."),
+    ("exit_code", "exit_code", "Exit code of the run."),
+    ("last_run_timestamp_seconds", "started", "Start of the run as a Unix timestamp."),
+)
+GAUGE_HELP = {
+    "config_bytes": "Size of the written config file.",
+}
+STAGE_METRICS = (
+    ("stage_duration_seconds", "wall_seconds", "Wall time spent in a stage."),
+    ("stage_cpu_seconds", "cpu_seconds", "CPU time spent in a stage."),
+    ("stage_peak_rss_bytes", "peak_rss_bytes", "Peak resident set size at the end of a stage."),
+    ("stage_rss_growth_bytes", "rss_growth_bytes", "Growth of the peak resident set size during a stage."),
+    ("stage_items", "items", "Items a stage processed (prefixes, rule paths, bytes written)."),
+    ("stage_calls", "calls", "Times a stage ran."),
+)
+
+
+def format_prometheus(report):
+    """Render a report in the Prometheus text exposition format, for node_exporter's textfile collector."""
+    labels = report["labels"]
+    lines = []
+    for metric, key, help_text in RUN_METRICS:
+        lines += [f"# HELP {METRIC_PREFIX}_{metric} {help_text}", f"# TYPE {METRIC_PREFIX}_{metric} gauge",
+                  f"{METRIC_PREFIX}_{metric}{_labels(labels)} {_number(report[key])}"]
+    for name, value in sorted(report["gauges"].items()):
+        if name in GAUGE_HELP:
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {GAUGE_HELP[name]}")
+        lines += [f"# TYPE {METRIC_PREFIX}_{name} gauge", f"{METRIC_PREFIX}_{name}{_labels(labels)} {_number(value)}"]
+    for metric, key, help_text in STAGE_METRICS:
+        samples = [(name, stage[key]) for name, stage in report["stages"].items() if stage[key] is not None]
+        if not samples:
+            continue
+        lines += [f"# HELP {METRIC_PREFIX}_{metric} {help_text}", f"# TYPE {METRIC_PREFIX}_{metric} gauge"]
+        for name, value in samples:
+            lines.append(f"{METRIC_PREFIX}_{metric}{_labels(dict(labels, stage=name))} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(report, json_path=None, prom_path=None):
+    from .writer import atomic_write
+    if json_path:
+        import json
+        atomic_write(json_path, json.dumps(report, indent=2, sort_keys=True) + "\n", backup=False, fsync=False)
+    if prom_path:
+        # The textfile collector may read at any time, so the file is replaced atomically.
+        atomic_write(prom_path, format_prometheus(report), backup=False, fsync=False)
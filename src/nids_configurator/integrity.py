@@ -0,0 +1,132 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import cache_path, load_json, save_json
+
+DIGEST_CACHE_VERSION = 1
+DIGEST_CACHE_NAME = "rule-digests.json"
+READ_SIZE = 1 << 20
+
+# Per-file cache entry: [size, mtime_ns, inode, sha256 hex digest]
+SIZE, MTIME, INODE, DIGEST = range(4)
+
+
+class ChecksumManifestError(ValueError):
+    pass
+
+
+def default_digest_cache_path():
+    return cache_path(DIGEST_CACHE_NAME)
+
+
+def hash_file(path):
+    # hashlib drops the GIL while digesting large buffers, so pool threads hash in parallel.
+    digest = hashlib.sha256()
+    buffer = bytearray(READ_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as source:
+        while True:
+            size = source.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+    return digest.hexdigest()
+
+
+def read_checksum_manifest(path):
+    """Read a sha256sum-style manifest; relative paths are taken from the manifest's directory."""
+    base = os.path.dirname(os.path.abspath(path))
+    expected = {}
+    with open(path, encoding="utf-8") as manifest:
+        for line_no, line in enumerate(manifest, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            digest, sep, name = line.partition(" ")
+            name = name.strip().lstrip("*")
+            if not sep or not name or len(digest) != 64:
+                raise ChecksumManifestError(f"{path}:{line_no}: expected '<sha256>  <path>'")
+            try:
+                int(digest, 16)
+            except ValueError:
+                raise ChecksumManifestError(f"{path}:{line_no}: invalid sha256 digest") from None
+            expected[os.path.normpath(os.path.join(base, name))] = digest.lower()
+    return expected
+
+
+def tree_digest(digests):
+    tree = hashlib.sha256()
+    for path in sorted(digests):
+        tree.update(f"{digests[path]}  {path}\n".encode("utf-8", "surrogateescape"))
+    return "sha256:" + tree.hexdigest()
+
+
+class IntegrityChecker:
+    def __init__(self, cache_path=None, workers=None):
+        self.cache_path = cache_path or default_digest_cache_path()
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+
+    def _stat(self, paths):
+        stats = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        return stats
+
+    def digests(self, stats, roots=()):
+        """Return {path: hex digest} for stats {path: (size, mtime_ns, inode)}, hashing only changed files.
+
+        Cached entries below roots that are not in stats belong to deleted files and are dropped.
+        """
+        cache = load_json(self.cache_path, DIGEST_CACHE_VERSION) or {"version": DIGEST_CACHE_VERSION, "files": {}}
+        cached = cache["files"]
+        prefixes = tuple(root.rstrip(os.sep) + os.sep for root in roots)
+        gone = [path for path in cached if path not in stats and (path in roots or path.startswith(prefixes))]
+        for path in gone:
+            del cached[path]
+        digests, stale = {}, []
+        for path, (size, mtime_ns, inode) in stats.items():
+            entry = cached.get(path)
+            if entry and entry[SIZE] == size and entry[MTIME] == mtime_ns and entry[INODE] == inode:
+                digests[path] = entry[DIGEST]
+            else:
+                stale.append(path)
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for path, digest in zip(stale, pool.map(self._hash, stale)):
+                    if digest is None:
+                        continue
+                    digests[path] = digest
+                    cached[path] = list(stats[path]) + [digest]
+        if stale or gone:
+            save_json(self.cache_path, cache)
+        self.hashed = len(stale)
+        return digests
+
+    def _hash(self, path):
+        try:
+            return hash_file(path)
+        except OSError as exc:
+            print(f"Warning: cannot read '{path}': {exc}")
+            return None
+
+    def verify(self, inventory, expected=None):
+        """Hash the rule files of a rule inventory and compare them against expected {path: digest}."""
+        stats = {path: tuple(entry[:3]) for path, entry in inventory["files"].items()}
+        expected = expected or {}
+        stats.update(self._stat(path for path in expected if path not in stats))
+        digests = self.digests(stats, tuple(inventory["roots"]))
+        report = {
+            "files": len(digests),
+            "hashed": self.hashed,
+            "tree_digest": tree_digest(digests),
+            "mismatched": sorted(p for p, d in expected.items() if p in digests and digests[p] != d),
+            "missing": sorted(p for p in expected if p not in digests),
+            "unlisted": sorted(p for p in digests if expected and p not in expected),
+        }
+        report["ok"] = not report["mismatched"] and not report["missing"]
+        return report
@@ -0,0 +1,123 @@
+from .ringplan import DEFAULT_BURST_MS, DEFAULT_SPEED_MBPS, plan_ring
+
+# Engine memory estimate from a rendered config. Figures are per-component rules of thumb for a
+# Suricata-style engine; they are meant to catch configs that cannot fit, not to predict RSS exactly.
+
+MIB = 1 << 20
+# Rough engine cost of one loaded signature and of each content byte in the pattern matcher.
+RULE_OVERHEAD_BYTES = 2048
+PATTERN_BYTES_PER_BYTE = 48
+ENGINE_BASE_BYTES = 96 * MIB
+THREAD_BYTES = 8 * MIB
+# Average content bytes per rule in stock rule sets.
+AVG_CONTENT_BYTES = 24
+# Radix tree node plus bookkeeping per address prefix.
+PREFIX_BYTES = 96
+FLOW_BYTES = 320
+FLOW_BUCKET_BYTES = 16
+DEFAULT_FLOWS = 131072
+# Concurrent flows from packet rate: flows live ~60 s and carry ~20 packets on average.
+FLOW_LIFETIME_S = 60
+PACKETS_PER_FLOW = 20
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(text):
+    """Parse "512M", "4G", "4GiB" or a plain byte count."""
+    value = str(text).strip().upper()
+    if value.endswith("IB"):
+        value = value[:-2]
+    elif value.endswith("B"):
+        value = value[:-1]
+    unit = value[-1:] if value[-1:] in ("K", "M", "G", "T") else ""
+    try:
+        size = int(float(value[:len(value) - len(unit)]) * SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"invalid size '{text}'") from None
+    if size < 0:
+        raise ValueError(f"invalid size '{text}'")
+    return size
+
+
+def count_active_rules(rules_cfg, inventory):
+    if not inventory:
+        return 0
+    files = inventory["files"]
+    selected = rules_cfg.get("rule_files") or files
+    # Index entry: [size, mtime, inode, active rules, commented-out rules]
+    return sum(files[path][3] for path in selected if path in files)
+
+
+def _prefix_count(network):
+    from .cidrset import CIDRSet
+    count = 0
+    for v in (4, 6):
+        for key in (f"ipv{v}_home_nets", f"ipv{v}_excluded_nets"):
+            count += len(CIDRSet.from_cidrs(network.get(key, []), v, errors=[]))
+    return count
+
+
+def _ring_bytes(network, performance):
+    rings = performance.get("rings")
+    if rings:
+        return rings["memory_bytes"]
+    details = network.get("interface_details", {})
+    total = 0
+    for name in network.get("interfaces", []):
+        info = details.get(name, {})
+        threads = performance.get("workers", {}).get(name, {}).get("threads") or info.get("rx_queues") or 1
+        total += plan_ring(info.get("speed_mbps") or DEFAULT_SPEED_MBPS, threads, DEFAULT_BURST_MS)["memory_bytes"]
+    return total
+
+
+def _threads(network, performance):
+    workers = performance.get("workers")
+    if workers:
+        return sum(worker["threads"] for worker in workers.values())
+    details = network.get("interface_details", {})
+    return sum(details.get(name, {}).get("rx_queues") or 1 for name in network.get("interfaces", []))
+
+
+def _flows(performance):
+    sampled = performance.get("sampled", {})
+    pps = sum(stats["p99_pps"] for stats in sampled.values())
+    return max(DEFAULT_FLOWS, pps * FLOW_LIFETIME_S // PACKETS_PER_FLOW)
+
+
+def estimate_memory(config, inventory=None, rule_count=None, pattern_bytes=None, disabled_rules=0):
+    """Estimate engine memory per component for a config; returns {"components": {...}, "total": bytes}.
+
+    rule_count defaults to the active rules of the inventory (minus disabled_rules, e.g. pruned ones);
+    pattern_bytes (total content bytes) to an average per rule. Only config values are read, so an
+    estimate costs well under a millisecond once the inventory is known.
+    """
+    network = config.get("network", {})
+    performance = config.get("performance", {})
+    if rule_count is None:
+        rule_count = count_active_rules(config.get("rules", {}), inventory)
+    rules = max(0, rule_count - disabled_rules)
+    if pattern_bytes is None:
+        pattern_bytes = rules * AVG_CONTENT_BYTES
+    flows = _flows(performance)
+    threads = _threads(network, performance)
+    components = {
+        "engine": ENGINE_BASE_BYTES + THREAD_BYTES * threads,
+        "rules": rules * RULE_OVERHEAD_BYTES,
+        # Every detection thread shares one matcher; its state grows with the pattern bytes.
+        "pattern_matcher": pattern_bytes * PATTERN_BYTES_PER_BYTE,
+        "address_tables": _prefix_count(network) * PREFIX_BYTES,
+        "ring_buffers": _ring_bytes(network, performance),
+        "flow_table": flows * FLOW_BYTES + flows * FLOW_BUCKET_BYTES,
+    }
+    return {"rules": rules, "threads": threads, "flows": flows, "components": components,
+            "total": sum(components.values())}
+
+
+def format_estimate(estimate, budget=None):
+    lines = [f"Estimated engine memory: {estimate['total'] / MIB:.0f} MiB "
+             f"({estimate['rules']} rules, {estimate['threads']} capture threads, {estimate['flows']} flows)"]
+    for name, size in sorted(estimate["components"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {name:<16} {size / MIB:10.1f} MiB")
+    if budget is not None:
+        lines.append(f"  {'budget':<16} {budget / MIB:10.1f} MiB")
+    return lines
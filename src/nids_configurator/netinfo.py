@@ -0,0 +1,98 @@
+import difflib
+import os
+
+# Interface inventory straight from sysfs: a handful of small attribute reads per
+# interface, no subprocesses and no netlink.
+
+SYSFS_NET = "/sys/class/net"
+
+
+def _read(path):
+    try:
+        with open(path, "rb", buffering=0) as attr:
+            return attr.read(256).decode("ascii", "replace").strip()
+    except OSError:
+        # Some attributes (speed, duplex) raise EINVAL while the link is down.
+        return None
+
+
+def _read_int(path):
+    value = _read(path)
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 0 else None
+
+
+def _count_queues(path):
+    rx = tx = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith("rx-"):
+                    rx += 1
+                elif entry.name.startswith("tx-"):
+                    tx += 1
+    except OSError:
+        pass
+    return rx, tx
+
+
+def read_interface(path):
+    device = os.path.join(path, "device")
+    driver = os.path.join(device, "driver")
+    rx_queues, tx_queues = _count_queues(os.path.join(path, "queues"))
+    return {
+        "operstate": _read(os.path.join(path, "operstate")) or "unknown",
+        "speed_mbps": _read_int(os.path.join(path, "speed")),
+        "mtu": _read_int(os.path.join(path, "mtu")),
+        "driver": os.path.basename(os.readlink(driver)) if os.path.islink(driver) else None,
+        "rx_queues": rx_queues,
+        "tx_queues": tx_queues,
+        "numa_node": _read_int(os.path.join(device, "numa_node")),
+        # Virtual interfaces (lo, bridges, veth, bonds, ...) have no backing device.
+        "virtual": not os.path.exists(device),
+    }
+
+
+def read_interfaces(root=SYSFS_NET):
+    interfaces = {}
+    try:
+        with os.scandir(root) as entries:
+            names = sorted(entry.name for entry in entries)
+    except OSError:
+        return interfaces
+    for name in names:
+        interfaces[name] = read_interface(os.path.join(root, name))
+    return interfaces
+
+
+def suggest_interface(name, inventory, limit=3):
+    return difflib.get_close_matches(name, inventory.keys(), n=limit, cutoff=0.5)
+
+
+def validate_interfaces(names, inventory):
+    # Returns (known names, {unknown name: suggestions}); an empty inventory validates nothing.
+    if not inventory:
+        return list(names), {}
+    known = [name for name in names if name in inventory]
+    unknown = {name: suggest_interface(name, inventory) for name in names if name not in inventory}
+    return known, unknown
+
+
+def format_interface(name, info):
+    speed = f"{info['speed_mbps']} Mb/s" if info["speed_mbps"] else "speed unknown"
+    driver = info["driver"] or ("virtual" if info["virtual"] else "no driver")
+    return (f"{name} ({info['operstate']}, {speed}, {driver}, "
+            f"{info['rx_queues']} rx / {info['tx_queues']} tx queues)")
+
+
+def interface_details(names, inventory):
+    # Capture-relevant facts recorded in the config for the engine and later tuning.
+    details = {}
+    for name in names:
+        info = inventory.get(name)
+        if info is not None:
+            details[name] = {key: info[key] for key in ("speed_mbps", "rx_queues", "tx_queues", "numa_node", "mtu")}
+    return details
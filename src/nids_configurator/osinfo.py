@@ -1,15 +1,130 @@
-# import os
+import os
 import platform
 
+# Capture methods, fastest first, with the kernel each needs at minimum.
+CAPTURE_METHODS = ("af_xdp", "af_packet_v3", "af_packet_v2", "pcap")
+TPACKET_V3_KERNEL = (3, 2)
+XDP_KERNEL = (4, 18)
+AF_XDP_KERNEL = (5, 4)
+
+NET_CORE_LIMITS = ("rmem_default", "rmem_max", "wmem_max", "optmem_max", "netdev_max_backlog", "netdev_budget",
+                   "bpf_jit_enable")
+PROBE_VERSION = 1
+PROBE_CACHE_NAME = "capabilities.json"
+
+
+def parse_kernel_version(release):
+    # "5.14.0-362.el9.x86_64" -> (5, 14, 0)
+    numbers = []
+    for part in release.split("-", 1)[0].split(".")[:3]:
+        digits = ""
+        for char in part:
+            if not char.isdigit():
+                break
+            digits += char
+        if not digits:
+            break
+        numbers.append(int(digits))
+    return tuple(numbers + [0] * (3 - len(numbers)))
+
+
+def _read(path):
+    try:
+        with open(path) as proc_file:
+            return proc_file.read().strip()
+    except OSError:
+        return None
+
+
+def read_hugepages(proc="/proc", sys_root="/sys"):
+    meminfo = {}
+    for line in (_read(os.path.join(proc, "meminfo")) or "").splitlines():
+        key, _, value = line.partition(":")
+        if key.startswith("HugePages_") or key == "Hugepagesize":
+            meminfo[key] = int(value.split()[0])
+    sizes = []
+    try:
+        with os.scandir(os.path.join(sys_root, "kernel", "mm", "hugepages")) as entries:
+            sizes = sorted(int(e.name[len("hugepages-"):-2]) for e in entries
+                           if e.name.startswith("hugepages-") and e.name.endswith("kB"))
+    except (OSError, ValueError):
+        pass
+    return {
+        "total": meminfo.get("HugePages_Total", 0),
+        "free": meminfo.get("HugePages_Free", 0),
+        "size_kb": meminfo.get("Hugepagesize"),
+        "sizes_kb": sizes,
+    }
+
+
+def probe_capabilities(kernel, proc="/proc", sys_root="/sys"):
+    """Probe packet capture support from /proc and /sys only; no sockets are opened."""
+    version = parse_kernel_version(kernel)
+    net_core = {}
+    for name in NET_CORE_LIMITS:
+        value = _read(os.path.join(proc, "sys", "net", "core", name))
+        if value is not None and value.lstrip("-").isdigit():
+            net_core[name] = int(value)
+    af_packet = os.path.exists(os.path.join(proc, "net", "packet"))
+    # XDP programs need the bpf filesystem and the BPF JIT knob, i.e. a kernel built with eBPF.
+    xdp = version >= XDP_KERNEL and os.path.isdir(os.path.join(sys_root, "fs", "bpf")) and "bpf_jit_enable" in net_core
+    supported = {
+        "af_xdp": xdp and version >= AF_XDP_KERNEL,
+        "af_packet_v3": af_packet and version >= TPACKET_V3_KERNEL,
+        "af_packet_v2": af_packet,
+        "pcap": True,
+    }
+    return {
+        "kernel": kernel,
+        "kernel_version": list(version),
+        "af_packet": af_packet,
+        "tpacket_v3": supported["af_packet_v3"],
+        "xdp": xdp,
+        "bpf_jit": bool(net_core.get("bpf_jit_enable")),
+        "hugepages": read_hugepages(proc, sys_root),
+        "net_core": net_core,
+        "capture_methods": [method for method in CAPTURE_METHODS if supported[method]],
+    }
+
+
+def load_capabilities(kernel, proc="/proc", sys_root="/sys", use_cache=True):
+    # Results only change across reboots (new kernel, modules, sysctl defaults), so they are cached per boot_id.
+    from .cache import cache_path, load_json, save_json
+    boot_id = _read(os.path.join(proc, "sys", "kernel", "random", "boot_id"))
+    path = cache_path(PROBE_CACHE_NAME)
+    if use_cache and boot_id:
+        cached = load_json(path, PROBE_VERSION)
+        if cached and cached.get("boot_id") == boot_id and cached["capabilities"].get("kernel") == kernel:
+            return cached["capabilities"]
+    capabilities = probe_capabilities(kernel, proc, sys_root)
+    if use_cache and boot_id:
+        save_json(path, {"version": PROBE_VERSION, "boot_id": boot_id, "capabilities": capabilities})
+    return capabilities
+
 
 class OSInfo:
     def __init__(self):
         self.name = None
         self.version = None
         self.family = None
+        self.kernel = None
+        self._capabilities = None
         self.detect()
 
+    def capabilities(self, use_cache=True):
+        # Probed on first use only; detect() itself stays a single read of /etc/os-release.
+        if self._capabilities is None:
+            if platform.system() != "Linux":
+                self._capabilities = {"kernel": self.kernel, "capture_methods": ["pcap"]}
+            else:
+                self._capabilities = load_capabilities(self.kernel, use_cache=use_cache)
+        return self._capabilities
+
+    def best_capture_method(self):
+        return self.capabilities()["capture_methods"][0]
+
     def detect(self):
+        self.kernel = platform.release()
         sys_name = platform.system()
         if sys_name != "Linux":
             self.name = sys_name
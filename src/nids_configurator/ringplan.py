@@ -0,0 +1,72 @@
+# Capture ring sizing. plan_rings() is a pure function of link facts and memory figures so it can be
+# checked anywhere; read_meminfo() is the only part that touches the system.
+
+DEFAULT_BURST_MS = 100
+DEFAULT_RAM_FRACTION = 0.25
+DEFAULT_SPEED_MBPS = 1000
+MIN_BLOCK_SIZE = 1 << 16
+MAX_BLOCK_SIZE = 1 << 22
+MIN_BLOCKS = 8
+# A ring is cut into at least this many blocks, so one slow block never stalls the whole ring.
+TARGET_BLOCKS = 64
+
+
+def read_meminfo(path="/proc/meminfo"):
+    # Values in bytes, e.g. {"MemTotal": ..., "MemAvailable": ...}
+    meminfo = {}
+    with open(path) as meminfo_file:
+        for line in meminfo_file:
+            key, _, value = line.partition(":")
+            fields = value.split()
+            if fields and fields[0].isdigit():
+                meminfo[key] = int(fields[0]) * (1024 if fields[1:2] == ["kB"] else 1)
+    return meminfo
+
+
+def _pow2_at_least(value):
+    return 1 << max(0, (int(value) - 1).bit_length())
+
+
+def plan_ring(speed_mbps, threads, burst_ms):
+    """Size one TPACKET_V3 ring per capture thread to hold burst_ms of line-rate traffic."""
+    burst_bytes = speed_mbps * 1000000 // 8 * burst_ms // 1000
+    per_thread = max(1, burst_bytes // threads)
+    block_size = min(MAX_BLOCK_SIZE, max(MIN_BLOCK_SIZE, _pow2_at_least(per_thread // TARGET_BLOCKS)))
+    blocks = max(MIN_BLOCKS, -(-per_thread // block_size))
+    ring_bytes = block_size * blocks
+    return {
+        "threads": threads,
+        "block_size": block_size,
+        "blocks": blocks,
+        "ring_bytes": ring_bytes,
+        "memory_bytes": ring_bytes * threads,
+    }
+
+
+def plan_rings(interfaces, meminfo, burst_ms=DEFAULT_BURST_MS, max_ram_fraction=DEFAULT_RAM_FRACTION):
+    """Plan rings for {interface: {"speed_mbps": s, "threads": t}}; returns (rings section, warnings)."""
+    warnings = []
+    rings = {}
+    for name, facts in interfaces.items():
+        speed = facts.get("speed_mbps")
+        if not speed:
+            warnings.append(f"interface {name}: link speed unknown, sizing for {DEFAULT_SPEED_MBPS} Mb/s")
+            speed = DEFAULT_SPEED_MBPS
+        rings[name] = plan_ring(speed, max(1, facts.get("threads") or 1), burst_ms)
+
+    total = sum(ring["memory_bytes"] for ring in rings.values())
+    mem_total = meminfo.get("MemTotal", 0)
+    budget = int(mem_total * max_ram_fraction)
+    if mem_total and total > budget:
+        covered = burst_ms * budget // total
+        warnings.append(f"capture rings need {total >> 20} MiB, more than {max_ram_fraction:.0%} of RAM "
+                        f"({budget >> 20} MiB); that budget only covers ~{covered} ms bursts")
+    available = meminfo.get("MemAvailable")
+    if available is not None and total > available:
+        warnings.append(f"capture rings need {total >> 20} MiB but only {available >> 20} MiB are available")
+    section = {
+        "burst_ms": burst_ms,
+        "memory_bytes": total,
+        "interfaces": rings,
+    }
+    return section, warnings
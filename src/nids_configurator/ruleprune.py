@@ -0,0 +1,254 @@
+import os
+import re
+
+from .cidrset import CIDRSet, iter_parse_cidrs
+from .memestimate import PATTERN_BYTES_PER_BYTE, RULE_OVERHEAD_BYTES
+from .rulescan import RULE_ACTIONS
+from .rulestore import logical_lines
+
+# Finds enabled rules whose source/destination addresses can never match the traffic the
+# engine sees: packets to or from excluded networks are dropped, and with a home-only capture
+# filter at least one side of every packet is a home address.
+
+CONTENT_RE = re.compile(r'(?<![\w-])content\s*:\s*!?\s*"((?:[^"\\]|\\.)*)"')
+SID_RE = re.compile(r"[(;]\s*sid\s*:\s*(\d+)")
+ACTIONS = frozenset(RULE_ACTIONS)
+
+
+def content_bytes(rule):
+    total = 0
+    for pattern in CONTENT_RE.findall(rule):
+        # |41 42| hex blocks count one byte per hex pair.
+        for i, part in enumerate(pattern.split("|")):
+            total += len(part.split()) if i % 2 else len(part)
+    return total
+
+
+def estimate_rule_memory(rule):
+    return RULE_OVERHEAD_BYTES + PATTERN_BYTES_PER_BYTE * content_bytes(rule)
+
+
+class AddressSpace:
+    # An IPv4 and an IPv6 CIDRSet.
+    def __init__(self, v4=None, v6=None):
+        self.v4 = v4 or CIDRSet(4)
+        self.v6 = v6 or CIDRSet(6)
+
+    @classmethod
+    def everything(cls):
+        return cls(CIDRSet(4, [(0, (1 << 32) - 1)]), CIDRSet(6, [(0, (1 << 128) - 1)]))
+
+    @classmethod
+    def from_cidrs(cls, cidrs):
+        v4, v6 = [], []
+        for cidr in cidrs:
+            (v6 if ":" in cidr else v4).append(cidr)
+        return cls(CIDRSet.from_cidrs(v4, 4, errors=[]), CIDRSet.from_cidrs(v6, 6, errors=[]))
+
+    def family(self, ip_version):
+        return self.v4 if ip_version == 4 else self.v6
+
+    def union(self, other):
+        return AddressSpace(self.v4.union(other.v4), self.v6.union(other.v6))
+
+    def difference(self, other):
+        return AddressSpace(self.v4.difference(other.v4), self.v6.difference(other.v6))
+
+    def intersection(self, other):
+        return AddressSpace(self.v4.intersection(other.v4), self.v6.intersection(other.v6))
+
+
+class AddressExpressionError(ValueError):
+    pass
+
+
+def _split_group(text):
+    items, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            items.append(text[start:i].strip())
+            start = i + 1
+    items.append(text[start:].strip())
+    return [item for item in items if item]
+
+
+class AddressResolver:
+    # resolve() returns a superset of the addresses an expression can stand for, so that disjoint
+    # spaces prove a rule dead. Variables that are not defined (EXTERNAL_NET and *_SERVERS included,
+    # which deployments set to anything from "any" to a single host) resolve to everything, and
+    # negating or subtracting such a superset is skipped since the result would not be one.
+    def __init__(self, home, variables=None):
+        # home is None when no home networks are configured and $HOME_NET could be anything.
+        self.home = home
+        self.variables = dict(variables or {})
+        self._cache = {}
+        self._expanding = set()
+
+    def variable(self, name):
+        """Return (space, exact) for $name."""
+        if name in self.variables:
+            if name in self._expanding:
+                raise AddressExpressionError(f"variable '{name}' refers to itself")
+            self._expanding.add(name)
+            try:
+                return self._lookup(self.variables[name])
+            finally:
+                self._expanding.discard(name)
+        if name == "HOME_NET" and self.home is not None:
+            return self.home, True
+        return AddressSpace.everything(), False
+
+    def resolve(self, text):
+        return self._lookup(text)[0]
+
+    def _lookup(self, text):
+        text = text.strip()
+        resolved = self._cache.get(text)
+        if resolved is None:
+            resolved = self._cache[text] = self._resolve(text)
+        return resolved
+
+    def _resolve(self, text):
+        if text.startswith("!"):
+            space, exact = self._lookup(text[1:])
+            if not exact:
+                return AddressSpace.everything(), False
+            return AddressSpace.everything().difference(space), True
+        if text.startswith("["):
+            if not text.endswith("]"):
+                raise AddressExpressionError(f"unbalanced address group '{text}'")
+            items = _split_group(text[1:-1])
+            included = [self._lookup(item) for item in items if not item.startswith("!")]
+            excluded = [self._lookup(item[1:]) for item in items if item.startswith("!")]
+            space = AddressSpace() if included else AddressSpace.everything()
+            exact = True
+            for part, part_exact in included:
+                space = space.union(part)
+                exact = exact and part_exact
+            for part, part_exact in excluded:
+                if part_exact:
+                    space = space.difference(part)
+                else:
+                    exact = False
+            return space, exact
+        if text == "any":
+            return AddressSpace.everything(), True
+        if text.startswith("$"):
+            return self.variable(text[1:])
+        errors = []
+        ip_version = 6 if ":" in text else 4
+        intervals = [(start, end) for _, start, end in iter_parse_cidrs([text], ip_version, errors)]
+        if errors:
+            raise AddressExpressionError(f"invalid address '{text}'")
+        space = AddressSpace(CIDRSet(4, intervals)) if ip_version == 4 else AddressSpace(v6=CIDRSet(6, intervals))
+        return space, True
+
+
+def split_header(rule):
+    # "alert tcp $HOME_NET any -> [1.2.3.4, 5.6.7.8] 80 (...)" -> whitespace-separated fields,
+    # keeping bracketed groups with spaces together.
+    header = rule.split("(", 1)[0]
+    if "[" not in header:
+        return header.split()
+    fields, depth, current = [], 0, []
+    for char in header:
+        if char.isspace() and depth == 0:
+            if current:
+                fields.append("".join(current))
+                current = []
+            continue
+        depth += (char == "[") - (char == "]")
+        current.append(char)
+    if current:
+        fields.append("".join(current))
+    return fields
+
+
+class RulePruner:
+    def __init__(self, network, home_only=False, variables=None):
+        home = AddressSpace.from_cidrs(network.get("ipv4_home_nets", []) + network.get("ipv6_home_nets", []))
+        excluded = AddressSpace.from_cidrs(network.get("ipv4_excluded_nets", [])
+                                           + network.get("ipv6_excluded_nets", []))
+        # Without any home network $HOME_NET is undefined and could be anything.
+        self.resolver = AddressResolver(home if home.v4 or home.v6 else None, variables)
+        self.reachable = AddressSpace.everything().difference(excluded)
+        # Families without home networks are not restricted by a home-only capture filter.
+        self.home_only = {v for v in (4, 6) if home_only and home.family(v)}
+        self.home = home
+        self._verdicts = {}
+
+    def can_match(self, source, destination):
+        key = (source, destination)
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            verdict = self._verdicts[key] = self._can_match(source, destination)
+        return verdict
+
+    def _can_match(self, source, destination):
+        src = self.resolver.resolve(source).intersection(self.reachable)
+        dst = self.resolver.resolve(destination).intersection(self.reachable)
+        for v in (4, 6):
+            if not src.family(v) or not dst.family(v):
+                continue
+            if v not in self.home_only:
+                return True
+            home = self.home.family(v)
+            if src.family(v).intersection(home) or dst.family(v).intersection(home):
+                return True
+        return False
+
+    def check_rule(self, rule):
+        """Return True if the rule can match, False if it is dead; unparsable headers count as live."""
+        fields = split_header(rule)
+        if len(fields) < 7 or fields[0] not in ACTIONS:
+            return True
+        try:
+            # <> is symmetric, and the verdict does not depend on the order of the two sides.
+            return self.can_match(fields[2], fields[5])
+        except AddressExpressionError:
+            return True
+
+    def prune(self, rule_files):
+        """Check the enabled rules of rule_files; returns {"checked", "dead": [(sid, file)], "memory_saved"}."""
+        report = {"checked": 0, "dead": [], "memory_saved": 0}
+        for path in rule_files:
+            try:
+                with open(path, "rb") as rule_file:
+                    data = rule_file.read()
+            except OSError as exc:
+                print(f"Warning: cannot read rule file '{path}': {exc}")
+                continue
+            for _offset, _length, line in logical_lines(data):
+                rule = line.decode("utf-8", "replace").strip()
+                if not rule or rule.startswith("#"):
+                    continue
+                report["checked"] += 1
+                if self.check_rule(rule):
+                    continue
+                sid = SID_RE.search(rule)
+                if sid is None:
+                    continue
+                report["dead"].append((int(sid.group(1)), path))
+                report["memory_saved"] += estimate_rule_memory(rule)
+        return report
+
+
+def disabled_sids_path_for(config_path):
+    return os.path.splitext(config_path)[0] + ".disable.conf"
+
+
+def write_disabled_sids(path, dead):
+    # suricata-update disable.conf format: one sid per line, grouped under a comment per rule file.
+    from .writer import atomic_write
+    lines = ["# Rules that can never match the configured home/excluded networks (generated)"]
+    by_file = {}
+    for sid, source in dead:
+        by_file.setdefault(source, []).append(sid)
+    for source in sorted(by_file):
+        lines.append(f"# {source}")
+        lines.extend(str(sid) for sid in sorted(by_file[source]))
+    return atomic_write(path, "\n".join(lines) + "\n", backup=False)
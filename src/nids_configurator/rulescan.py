@@ -0,0 +1,137 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import cache_path, load_json, save_json
+
+INDEX_VERSION = 1
+INDEX_NAME = "rule-index.json"
+RULE_SUFFIXES = (".rules",)
+RULE_ACTIONS = ("alert", "drop", "reject", "pass", "rejectsrc", "rejectdst", "rejectboth", "log", "sdrop")
+
+# Per-file index entry: [size, mtime_ns, inode, active rules, commented-out rules]
+SIZE, MTIME, INODE, RULES, DISABLED = range(5)
+
+
+def default_index_path():
+    return cache_path(INDEX_NAME)
+
+
+def count_rules(path):
+    active = disabled = 0
+    with open(path, "rb") as rule_file:
+        for line in rule_file:
+            line = line.strip()
+            if not line:
+                continue
+            if line[:1] == b"#":
+                word = line[1:].lstrip().split(b" ", 1)[0].decode("ascii", "replace")
+                if word in RULE_ACTIONS:
+                    disabled += 1
+            else:
+                active += 1
+    return active, disabled
+
+
+class RuleScanner:
+    def __init__(self, index_path=None, workers=None, suffixes=RULE_SUFFIXES):
+        self.index_path = index_path or default_index_path()
+        # Threads mostly wait on scandir/stat/read syscalls, which release the GIL.
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.suffixes = suffixes
+
+    def _list_dir(self, directory):
+        files, subdirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.endswith(self.suffixes) and entry.is_file():
+                            st = entry.stat()
+                            files.append((entry.path, st.st_size, st.st_mtime_ns, st.st_ino))
+                    except OSError:
+                        continue
+        except OSError as exc:
+            print(f"Warning: cannot scan rule directory '{directory}': {exc}")
+        return files, subdirs
+
+    def _walk(self, pool, roots):
+        # Directories are listed concurrently; each finished listing schedules its subdirectories.
+        # The caller thread does the scheduling, so pool threads never wait on each other.
+        found = {root: [] for root in roots}
+        pending = [(root, pool.submit(self._list_dir, root)) for root in roots]
+        while pending:
+            root, future = pending.pop()
+            files, subdirs = future.result()
+            found[root].extend(files)
+            pending.extend((root, pool.submit(self._list_dir, subdir)) for subdir in subdirs)
+        return found
+
+    def _examine(self, path, size, mtime_ns, inode):
+        try:
+            active, disabled = count_rules(path)
+        except OSError as exc:
+            print(f"Warning: cannot read rule file '{path}': {exc}")
+            active = disabled = 0
+        return [size, mtime_ns, inode, active, disabled]
+
+    def _stat_roots(self, pool, roots):
+        found = self._walk(pool, [root for root in roots if os.path.isdir(root)])
+        for root in roots:
+            if root not in found and os.path.isfile(root) and root.endswith(self.suffixes):
+                st = os.stat(root)
+                found[root] = [(root, st.st_size, st.st_mtime_ns, st.st_ino)]
+        return found
+
+    def scan(self, paths):
+        index = load_json(self.index_path, INDEX_VERSION) or {"version": INDEX_VERSION, "files": {}}
+        old_files = index["files"]
+        roots = list(dict.fromkeys(os.path.abspath(p) for p in paths))
+        inventory = {"roots": {}, "files": {}}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            found = self._stat_roots(pool, roots)
+            rescans = {}
+            for root in roots:
+                summary = {"exists": root in found, "files": 0, "rules": 0, "disabled": 0, "rescanned": 0}
+                inventory["roots"][root] = summary
+                for path, size, mtime_ns, inode in found.get(root, []):
+                    old = old_files.get(path)
+                    if old and old[SIZE] == size and old[MTIME] == mtime_ns and old[INODE] == inode:
+                        inventory["files"][path] = old
+                    elif path not in rescans:
+                        rescans[path] = pool.submit(self._examine, path, size, mtime_ns, inode)
+                        summary["rescanned"] += 1
+                    summary["files"] += 1
+            for path, future in rescans.items():
+                inventory["files"][path] = future.result()
+
+        for root in roots:
+            summary = inventory["roots"][root]
+            for path, _size, _mtime_ns, _inode in found.get(root, []):
+                summary["rules"] += inventory["files"][path][RULES]
+                summary["disabled"] += inventory["files"][path][DISABLED]
+
+        self._save(old_files, inventory["files"], roots)
+        return inventory
+
+    def _save(self, old_files, new_files, roots):
+        # Entries of rule paths outside this scan are kept, so several configs can share one index.
+        prefixes = tuple(root.rstrip(os.sep) + os.sep for root in roots)
+        files = {path: entry for path, entry in old_files.items()
+                 if path not in roots and not path.startswith(prefixes)}
+        files.update(new_files)
+        if files != old_files:
+            save_json(self.index_path, {"version": INDEX_VERSION, "files": files})
+
+
+def format_inventory(inventory):
+    lines = []
+    for root, summary in inventory["roots"].items():
+        if not summary["exists"]:
+            lines.append(f"  {root}: missing")
+            continue
+        lines.append(f"  {root}: {summary['files']} files, {summary['rules']} rules "
+                     f"({summary['disabled']} commented out, {summary['rescanned']} files re-examined)")
+    return lines
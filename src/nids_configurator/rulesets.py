@@ -0,0 +1,83 @@
+import difflib
+import os
+
+from .rulescan import RULE_SUFFIXES
+
+# Logical rule-set names for a file <root>/et/open/malware.rules:
+#   "malware"          - the file stem
+#   "et", "et/open"    - every directory below the rule root, selecting all files inside it
+#   "et/open/malware"  - the relative path without suffix, to pick one file when stems clash
+
+
+class RuleSetError(ValueError):
+    def __init__(self, unknown):
+        self.unknown = unknown
+        parts = []
+        for name, suggestions in unknown.items():
+            hint = f" (did you mean: {', '.join(suggestions)}?)" if suggestions else ""
+            parts.append(f"'{name}'{hint}")
+        super().__init__(f"Unknown rule set(s): {', '.join(parts)}")
+
+
+def _strip_suffix(name, suffixes):
+    for suffix in suffixes:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def rule_set_names(root, path, suffixes=RULE_SUFFIXES):
+    relative = os.path.relpath(path, root) if path != root else os.path.basename(path)
+    parts = relative.split(os.sep)
+    stem = _strip_suffix(parts[-1], suffixes)
+    names = {stem, "/".join(parts[:-1] + [stem])}
+    for depth in range(1, len(parts)):
+        names.add("/".join(parts[:depth]))
+    return names
+
+
+class RuleSetIndex:
+    def __init__(self, sets=None):
+        # name -> list of files, files kept in scan order
+        self.sets = sets or {}
+        self.files = list(dict.fromkeys(path for paths in self.sets.values() for path in paths))
+
+    @classmethod
+    def from_inventory(cls, inventory, suffixes=RULE_SUFFIXES):
+        roots = sorted(inventory["roots"], key=len, reverse=True)
+        sets = {}
+        for path in sorted(inventory["files"]):
+            root = next((r for r in roots if path == r or path.startswith(r.rstrip(os.sep) + os.sep)), None)
+            if root is None:
+                continue
+            for name in rule_set_names(root, path, suffixes):
+                sets.setdefault(name, []).append(path)
+        return cls(sets)
+
+    def __contains__(self, name):
+        return name in self.sets
+
+    def __len__(self):
+        return len(self.sets)
+
+    def suggest(self, name, limit=3):
+        return difflib.get_close_matches(name, self.sets.keys(), n=limit, cutoff=0.6)
+
+    def check(self, names):
+        unknown = {name: self.suggest(name) for name in names if name not in self.sets}
+        if unknown:
+            raise RuleSetError(unknown)
+
+    def resolve(self, enabled, disabled=()):
+        # An empty enabled list means every rule file found under the rule paths.
+        self.check(list(enabled) + list(disabled))
+        if enabled:
+            selected = {}
+            for name in enabled:
+                selected.update(dict.fromkeys(self.sets[name]))
+        else:
+            selected = dict.fromkeys(self.files)
+        for name in disabled:
+            for path in self.sets[name]:
+                selected.pop(path, None)
+        return sorted(selected)
@@ -0,0 +1,261 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+
+from .rulescan import RULE_ACTIONS
+from .writer import atomic_write
+
+# On-disk layout (all integers little-endian):
+#
+#   header (64 bytes)  magic, version, flags, file count, rule count, file table, rule columns and meta offsets,
+#                      crc32 of the body
+#   file table         sha256 u8[32] + rule count u32 + reserved u32, per source file
+#   rule columns       text offset u64[n], sid u32[n], rev u32[n], file u32[n], text length u32[n],
+#                      action u8[n], protocol u8[n], enabled u8[n]
+#   meta               JSON: source file paths and the protocol name table
+#
+# Rules are sorted by sid, so a sid lookup is one bisect over the sid column. The text offset
+# and length point into the source file, which consumers read only for the rules they need.
+
+MAGIC = b"NIDSRULE"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIIQQQI")
+HEADER_SIZE = 64
+FILE_ENTRY = struct.Struct("<32sII")
+COLUMNS = (("offset", "Q"), ("sid", "I"), ("rev", "I"), ("file", "I"), ("length", "I"),
+           ("action", "B"), ("proto", "B"), ("enabled", "B"))
+RULE_SIZE = sum(array(typecode).itemsize for _, typecode in COLUMNS)
+MAX_U32 = 0xFFFFFFFF
+
+ACTION_CODES = {action.encode(): code for code, action in enumerate(RULE_ACTIONS)}
+SID_RE = re.compile(rb"[(;]\s*sid\s*:\s*(\d+)")
+REV_RE = re.compile(rb"[(;]\s*rev\s*:\s*(\d+)")
+
+
+class RuleStoreError(ValueError):
+    pass
+
+
+def store_path_for(config_path):
+    return os.path.splitext(config_path)[0] + ".rulestore"
+
+
+def logical_lines(data):
+    # Yields (offset, length, text) per rule line, joining backslash continuations.
+    pos = 0
+    size = len(data)
+    while pos < size:
+        end = data.find(b"\n", pos)
+        if end < 0:
+            end = size
+        start = pos
+        while end < size and data[start:end].rstrip(b"\r").endswith(b"\\"):
+            nxt = data.find(b"\n", end + 1)
+            end = size if nxt < 0 else nxt
+        yield start, end - start, data[start:end]
+        pos = end + 1
+
+
+def parse_rules(data):
+    # Returns (offset, sid, rev, length, action, protocol, enabled) per rule, commented-out rules included.
+    rules = []
+    for offset, length, line in logical_lines(data):
+        text = line.strip()
+        enabled = 1
+        if text[:1] == b"#":
+            text = text[1:].lstrip()
+            enabled = 0
+        words = text.split(None, 2)
+        if len(words) < 2 or words[0] not in ACTION_CODES:
+            continue
+        sid = SID_RE.search(text)
+        if sid is None:
+            continue
+        rev = REV_RE.search(text)
+        rules.append((offset, int(sid.group(1)), int(rev.group(1)) if rev else 0, length,
+                      ACTION_CODES[words[0]], words[1].decode("ascii", "replace").lower(), enabled))
+    return rules
+
+
+def _column(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _load_previous(path):
+    # Parsed rules of the previous store, keyed by source file digest.
+    try:
+        store = RuleStore(path)
+    except (OSError, RuleStoreError):
+        return {}
+    with store:
+        return store.rules_by_digest()
+
+
+def build_store(path, files, previous=None):
+    """Parse the rule files into a store at path, reusing rules of files whose content is unchanged."""
+    previous = _load_previous(path) if previous is None else previous
+    stored, entries, records = [], [], []
+    reparsed = 0
+    for source in files:
+        try:
+            with open(source, "rb") as rule_file:
+                data = rule_file.read()
+        except OSError as exc:
+            # Deleted or replaced by a rule update since the scan; the next run picks up the new tree.
+            print(f"Warning: skipping rule file '{source}': {exc.strerror or exc}")
+            continue
+        digest = hashlib.sha256(data).digest()
+        rules = previous.get(digest)
+        if rules is None:
+            rules = parse_rules(data)
+            reparsed += 1
+            in_range = [rule for rule in rules if rule[1] <= MAX_U32 and rule[2] <= MAX_U32]
+            if len(in_range) < len(rules):
+                print(f"Warning: skipping {len(rules) - len(in_range)} rules in '{source}' with a sid or rev "
+                      f"above {MAX_U32}")
+                rules = in_range
+        index = len(stored)
+        stored.append(source)
+        entries.append((digest, len(rules)))
+        records.extend((sid, index, offset, rev, length, action, proto, enabled)
+                       for offset, sid, rev, length, action, proto, enabled in rules)
+    records.sort()
+
+    protocols = sorted({record[6] for record in records})
+    if len(protocols) > 255:
+        raise RuleStoreError(f"too many distinct protocols ({len(protocols)})")
+    proto_codes = {proto: code for code, proto in enumerate(protocols)}
+    file_table = b"".join(FILE_ENTRY.pack(digest, count, 0) for digest, count in entries)
+    columns = b"".join([
+        _column("Q", [r[2] for r in records]),
+        _column("I", [r[0] for r in records]),
+        _column("I", [r[3] for r in records]),
+        _column("I", [r[1] for r in records]),
+        _column("I", [r[4] for r in records]),
+        bytes(r[5] for r in records),
+        bytes(proto_codes[r[6]] for r in records),
+        bytes(r[7] for r in records),
+    ])
+    meta = json.dumps({"files": stored, "protocols": protocols, "actions": list(RULE_ACTIONS)}).encode()
+    body = file_table + columns + meta
+    rules_off = HEADER_SIZE + len(file_table)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(entries), len(records), HEADER_SIZE, rules_off,
+                         rules_off + len(columns), zlib.crc32(body))
+    # Readers keep the old file mapped, so the new one must replace it by rename, never in place.
+    size = atomic_write(path, header.ljust(HEADER_SIZE, b"\0") + body, backup=False)
+    return {"files": len(entries), "rules": len(records), "reparsed": reparsed, "size": size}
+
+
+class RuleStore:
+    def __init__(self, path, verify=True):
+        self.path = path
+        with open(path, "rb") as store_file:
+            size = os.fstat(store_file.fileno()).st_size
+            if size < HEADER_SIZE:
+                raise RuleStoreError(f"{path}: file too short for a rule store")
+            self._map = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load(verify)
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self, verify):
+        magic, version, _flags, nfiles, nrules, files_off, rules_off, meta_off, crc = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise RuleStoreError(f"{self.path}: not a rule store")
+        if version != VERSION:
+            raise RuleStoreError(f"{self.path}: unsupported store version {version}")
+        if files_off + FILE_ENTRY.size * nfiles > rules_off or rules_off + RULE_SIZE * nrules > meta_off \
+                or meta_off > len(self._map):
+            raise RuleStoreError(f"{self.path}: truncated store")
+        self._view = memoryview(self._map)
+        if verify and zlib.crc32(self._view[HEADER_SIZE:]) != crc:
+            raise RuleStoreError(f"{self.path}: checksum mismatch")
+        meta = json.loads(bytes(self._view[meta_off:]))
+        self.files = meta["files"]
+        self.protocols = meta["protocols"]
+        self.actions = meta["actions"]
+        self.digests = [FILE_ENTRY.unpack_from(self._map, files_off + FILE_ENTRY.size * i)[0]
+                        for i in range(nfiles)]
+        self.rule_count = nrules
+        offset = rules_off
+        for name, typecode in COLUMNS:
+            column = self._cast(offset, typecode, nrules)
+            setattr(self, "_" + name, column)
+            offset += array(typecode).itemsize * nrules
+
+    def _cast(self, offset, typecode, count):
+        size = array(typecode).itemsize
+        chunk = self._view[offset:offset + size * count]
+        if sys.byteorder == "little" or size == 1:
+            # Zero-copy: lookups run directly over the mapped pages.
+            return chunk.cast(typecode)
+        column = array(typecode, chunk.tobytes())
+        column.byteswap()
+        return column
+
+    def __len__(self):
+        return self.rule_count
+
+    def rule(self, i):
+        return {
+            "sid": self._sid[i],
+            "rev": self._rev[i],
+            "action": self.actions[self._action[i]],
+            "proto": self.protocols[self._proto[i]],
+            "enabled": bool(self._enabled[i]),
+            "file": self.files[self._file[i]],
+            "offset": self._offset[i],
+            "length": self._length[i],
+        }
+
+    def find(self, sid):
+        first = bisect.bisect_left(self._sid, sid)
+        last = bisect.bisect_right(self._sid, sid, first)
+        return [self.rule(i) for i in range(first, last)]
+
+    def rule_text(self, i):
+        with open(self.files[self._file[i]], "rb") as rule_file:
+            rule_file.seek(self._offset[i])
+            return rule_file.read(self._length[i]).decode("utf-8", "replace")
+
+    def rules_by_digest(self):
+        # Identical files share one digest; only the first copy's rules are kept.
+        owner = {}
+        for index, digest in enumerate(self.digests):
+            owner.setdefault(digest, index)
+        rules = {digest: [] for digest in owner}
+        for i in range(self.rule_count):
+            file_index = self._file[i]
+            digest = self.digests[file_index]
+            if owner[digest] != file_index:
+                continue
+            rules[digest].append((
+                self._offset[i], self._sid[i], self._rev[i], self._length[i], self._action[i],
+                self.protocols[self._proto[i]], self._enabled[i]))
+        return rules
+
+    def close(self):
+        # Views must be released before the mapping can be closed.
+        for name in ["_" + name for name, _ in COLUMNS] + ["_view"]:
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,132 @@
+import math
+import os
+import time
+
+from .ringplan import DEFAULT_BURST_MS, plan_ring
+
+# Traffic sampling from /proc/net/dev for measured sensor sizing.
+
+PROC_NET_DEV = "/proc/net/dev"
+DEFAULT_INTERVAL_MS = 100
+# Packets per second one capture worker handles with a typical rule set; sizing rule of thumb.
+PPS_PER_WORKER = 250000
+# Rings are sized for this much more than the measured peak.
+HEADROOM = 1.5
+
+
+def parse_net_dev(data, names):
+    """Return {name: (rx_bytes, rx_packets, rx_dropped)} for the given interfaces from /proc/net/dev content.
+
+    Only the lines of the requested interfaces are split, so a read stays cheap on hosts with
+    hundreds of (virtual) interfaces.
+    """
+    counters = {}
+    for name in names:
+        key = name.encode() + b":"
+        pos = data.find(key)
+        # Names are right-aligned after a newline; make sure "eth1:" does not match inside "veth1:".
+        while pos > 0 and data[pos - 1] not in b" \n":
+            pos = data.find(key, pos + 1)
+        if pos < 0:
+            continue
+        end = data.find(b"\n", pos)
+        fields = data[pos + len(key):end if end >= 0 else len(data)].split(None, 4)
+        counters[name] = (int(fields[0]), int(fields[1]), int(fields[3]))
+    return counters
+
+
+class NetDevReader:
+    # Keeps /proc/net/dev open; each snapshot is one lseek + one read.
+    def __init__(self, path=PROC_NET_DEV):
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self):
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        chunks = []
+        while True:
+            chunk = os.read(self.fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def close(self):
+        os.close(self.fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def take_snapshots(names, duration_s, interval_ms=DEFAULT_INTERVAL_MS, path=PROC_NET_DEV):
+    """Sample counters every interval_ms for duration_s; returns [(monotonic time, counters)]."""
+    interval = interval_ms / 1000.0
+    snapshots = []
+    with NetDevReader(path) as reader:
+        deadline = time.monotonic()
+        stop = deadline + duration_s
+        while True:
+            snapshots.append((time.monotonic(), parse_net_dev(reader.read(), names)))
+            deadline += interval
+            if deadline > stop:
+                break
+            # Sleep to an absolute deadline so parsing time does not stretch the interval.
+            time.sleep(max(0.0, deadline - time.monotonic()))
+    return snapshots
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile of an unsorted list.
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)]
+
+
+def traffic_stats(snapshots):
+    """Per-interface rates between consecutive snapshots: peak, p99 and mean of pps and bps, plus drops."""
+    rates = {}
+    for (t0, before), (t1, after) in zip(snapshots, snapshots[1:]):
+        elapsed = t1 - t0
+        if elapsed <= 0:
+            continue
+        for name, (rx_bytes, rx_packets, rx_dropped) in after.items():
+            previous = before.get(name)
+            # Counters reset when a driver reloads; such an interval is skipped.
+            if previous is None or rx_bytes < previous[0] or rx_packets < previous[1]:
+                continue
+            series = rates.setdefault(name, {"pps": [], "bps": [], "dropped": 0})
+            series["pps"].append((rx_packets - previous[1]) / elapsed)
+            series["bps"].append((rx_bytes - previous[0]) * 8 / elapsed)
+            series["dropped"] += max(0, rx_dropped - previous[2])
+    stats = {}
+    for name, series in rates.items():
+        stats[name] = {
+            "samples": len(series["pps"]),
+            "peak_pps": int(max(series["pps"])),
+            "p99_pps": int(percentile(series["pps"], 99)),
+            "mean_pps": int(sum(series["pps"]) / len(series["pps"])),
+            "peak_bps": int(max(series["bps"])),
+            "p99_bps": int(percentile(series["bps"], 99)),
+            "mean_bps": int(sum(series["bps"]) / len(series["bps"])),
+            "dropped": series["dropped"],
+        }
+    return stats
+
+
+def recommend(stats, rx_queues=None, burst_ms=DEFAULT_BURST_MS):
+    """Derive worker count and ring size from measured rates of one interface."""
+    workers = max(1, math.ceil(stats["p99_pps"] * HEADROOM / PPS_PER_WORKER))
+    if rx_queues:
+        workers = min(workers, rx_queues)
+    speed_mbps = max(1, math.ceil(stats["peak_bps"] * HEADROOM / 1000000))
+    return {"threads": workers, "ring": plan_ring(speed_mbps, workers, burst_ms)}
+
+
+def format_stats(name, stats, recommendation):
+    ring = recommendation["ring"]
+    return (f"  {name}: peak {stats['peak_pps']} pps / {stats['peak_bps'] // 1000000} Mb/s, "
+            f"p99 {stats['p99_pps']} pps / {stats['p99_bps'] // 1000000} Mb/s, {stats['dropped']} dropped -> "
+            f"{recommendation['threads']} workers, {ring['blocks']} x {ring['block_size'] >> 10} KiB blocks")
@@ -0,0 +1,312 @@
+import asyncio
+import copy
+import json
+import os
+import signal
+import socket
+from collections import OrderedDict
+
+from .batch import apply_overrides
+from .changes import canonical_digest, diff_sections, format_diff
+from .cidrset import compact_network_config
+from .writer import dump_yaml, require_yaml
+
+# Long-running config service: the base config (defaults + CLI/env), OS detection and PyYAML stay loaded,
+# and renders are cached, so a request costs a JSON round trip instead of an interpreter start.
+#
+# Protocol: one JSON object per line in each direction over a Unix socket, e.g.
+#
+#   {"id": 1, "op": "render", "overrides": {"nids_name": "s1", "ipv4_home_nets": "10.0.0.0/8"}}
+#   {"id": 1, "ok": true, "cached": false, "config": {...}, "yaml": "general:\n..."}
+#
+# ops: render, validate, diff (against "current" config or "path" of an existing file), stats, ping.
+# Overrides use the batch manifest fields. The optional HTTP listener takes the same objects as
+# POST /<op> bodies.
+
+DEFAULT_CACHE_SIZE = 256
+MAX_REQUEST_BYTES = 64 << 20
+OPS = ("render", "validate", "diff", "stats", "ping")
+
+
+class RequestError(ValueError):
+    pass
+
+
+def _read_config(path):
+    # Unlike changes.load_config_yaml, a missing or broken file is an error here, not a config to replace.
+    yaml = require_yaml()
+    loader = getattr(yaml, "CSafeLoader", None) or yaml.SafeLoader
+    try:
+        with open(path, encoding="utf-8") as config_file:
+            return yaml.load(config_file, Loader=loader)
+    except OSError as exc:
+        raise RequestError(f"cannot read '{path}': {exc.strerror or exc}") from None
+    except yaml.YAMLError as exc:
+        raise RequestError(f"'{path}' is not valid YAML: {exc}") from None
+
+
+class RenderCache:
+    # LRU of rendered configs keyed by a digest of the overrides and options.
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {"size": len(self.entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+class ConfigService:
+    def __init__(self, base_config, os_info=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.base_config = base_config
+        self.os_info = os_info
+        self.cache = RenderCache(cache_size)
+        self.requests = 0
+
+    def render(self, overrides, compact_networks=False):
+        """Return (cache entry, cached); an entry holds the config, network conflicts and its YAML text."""
+        if not isinstance(overrides, dict):
+            raise RequestError("overrides must be an object")
+        key = canonical_digest({"overrides": overrides, "compact_networks": bool(compact_networks)})
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry, True
+        config = apply_overrides(copy.deepcopy(self.base_config), overrides)
+        conflicts = compact_network_config(config["network"]) if compact_networks else []
+        entry = {"config": config, "conflicts": conflicts, "yaml": dump_yaml(config)}
+        self.cache.put(key, entry)
+        return entry, False
+
+    def handle(self, request):
+        """Answer one decoded request; errors are returned, never raised."""
+        self.requests += 1
+        response = {"id": request.get("id")} if isinstance(request, dict) else {"id": None}
+        try:
+            if not isinstance(request, dict) or request.get("op") not in OPS:
+                raise RequestError(f"op must be one of {', '.join(OPS)}")
+            response.update(getattr(self, f"op_{request['op']}")(request))
+            response["ok"] = True
+        except (ValueError, OSError) as exc:
+            response.update(ok=False, error=str(exc))
+        return response
+
+    def op_ping(self, request):
+        return {}
+
+    def op_stats(self, request):
+        os_info = None
+        if self.os_info is not None:
+            os_info = {"name": self.os_info.name, "family": self.os_info.family, "version": self.os_info.version}
+        return {"requests": self.requests, "cache": self.cache.stats(), "os": os_info}
+
+    def op_render(self, request):
+        entry, cached = self.render(request.get("overrides", {}), request.get("compact_networks", False))
+        response = {"cached": cached, "conflicts": entry["conflicts"]}
+        if request.get("format", "yaml") in ("yaml", "both"):
+            response["yaml"] = entry["yaml"]
+        if request.get("format", "yaml") in ("json", "both"):
+            response["config"] = entry["config"]
+        return response
+
+    def op_validate(self, request):
+        # A render with compaction reports every network conflict; bad fields raise like in batch mode.
+        entry, cached = self.render(request.get("overrides", {}), True)
+        return {"cached": cached, "valid": True, "conflicts": entry["conflicts"]}
+
+    def op_diff(self, request):
+        entry, cached = self.render(request.get("overrides", {}), request.get("compact_networks", False))
+        if "current" in request:
+            current = request["current"]
+        elif "path" in request:
+            current = _read_config(request["path"])
+        else:
+            raise RequestError("diff needs 'current' or 'path'")
+        if not isinstance(current, dict):
+            raise RequestError("the current config must be a mapping of sections")
+        diff = diff_sections(current, entry["config"])
+        return {"cached": cached, "changed": bool(diff), "diff": diff, "lines": format_diff(diff)}
+
+
+def _encode(response):
+    return json.dumps(response, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+def _answer(service, data):
+    try:
+        request = json.loads(data)
+    except ValueError as exc:
+        return {"id": None, "ok": False, "error": f"invalid JSON: {exc}"}
+    return service.handle(request)
+
+
+async def _serve_stream(service, reader, writer):
+    # Clients may pipeline: each line is answered in order on the same connection.
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                writer.write(_encode({"id": None, "ok": False, "error": "request too large"}))
+                break
+            if not line:
+                break
+            if line.strip():
+                writer.write(_encode(_answer(service, line)))
+                await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def _answer_http(service, target, body):
+    # The path names the op, the body carries its parameters.
+    try:
+        request = json.loads(body)
+    except ValueError as exc:
+        return {"id": None, "ok": False, "error": f"invalid JSON: {exc}"}
+    if not isinstance(request, dict):
+        return {"id": None, "ok": False, "error": "body must be a JSON object"}
+    request["op"] = target.split("?", 1)[0].strip("/")
+    return service.handle(request)
+
+
+async def _serve_http(service, reader, writer):
+    # Minimal HTTP/1.1 for localhost callers: POST /<op> with a JSON body, GET /stats; one request per connection.
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if len(request_line) < 2:
+            return
+        method, target = request_line[0], request_line[1]
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            status, response = "413 Payload Too Large", {"id": None, "ok": False, "error": "request too large"}
+        elif method not in ("GET", "POST"):
+            status, response = "405 Method Not Allowed", {"id": None, "ok": False, "error": "use GET or POST"}
+        else:
+            response = _answer_http(service, target, await reader.readexactly(length) if length else b"{}")
+            status = "200 OK" if response["ok"] else "400 Bad Request"
+        payload = _encode(response)
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                     f"Connection: close\r\n\r\n".encode("latin-1") + payload)
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_servers(service, socket_path=None, http_port=None, http_host="127.0.0.1"):
+    servers = []
+    if socket_path:
+        if os.path.exists(socket_path):
+            # A socket left by a crashed daemon; a live one would still accept connections.
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.unlink(socket_path)
+            else:
+                raise OSError(f"another service is listening on {socket_path}")
+            finally:
+                probe.close()
+        servers.append(await asyncio.start_unix_server(
+            lambda r, w: _serve_stream(service, r, w), path=socket_path, limit=MAX_REQUEST_BYTES))
+        os.chmod(socket_path, 0o660)
+    if http_port is not None:
+        try:
+            servers.append(await asyncio.start_server(
+                lambda r, w: _serve_http(service, r, w), host=http_host, port=http_port, limit=MAX_REQUEST_BYTES))
+        except OSError:
+            for server in servers:
+                server.close()
+            if socket_path:
+                os.unlink(socket_path)
+            raise
+    return servers
+
+
+def run_service(base_config, socket_path=None, http_port=None, os_info=None, cache_size=DEFAULT_CACHE_SIZE):
+    """Serve until interrupted; returns the process exit code."""
+    if require_yaml() is None:
+        print("Error: PyYAML is not installed. Install it with:")
+        print("  pip install pyyaml")
+        return 1
+    service = ConfigService(base_config, os_info, cache_size)
+
+    async def main():
+        servers = await start_servers(service, socket_path, http_port)
+        where = [f"unix:{socket_path}"] if socket_path else []
+        if http_port is not None:
+            where.append(f"http://127.0.0.1:{servers[-1].sockets[0].getsockname()[1]}")
+        print(f"Config service listening on {', '.join(where)}", flush=True)
+        # Stop cleanly on SIGTERM (service managers) as well as SIGINT, so the socket file is removed.
+        stop = asyncio.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+        try:
+            await stop.wait()
+        finally:
+            for server in servers:
+                server.close()
+            if socket_path and os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    try:
+        asyncio.run(main())
+    except OSError as exc:
+        print(f"Error: {exc}")
+        return 1
+    return 0
+
+
+class ServiceClient:
+    """Blocking client for the Unix socket; also what tests and scripts use as a stand-in orchestrator."""
+
+    def __init__(self, socket_path, timeout=30.0):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self.stream = self.sock.makefile("rb")
+        self.next_id = 0
+
+    def request(self, op, **params):
+        self.next_id += 1
+        self.sock.sendall(_encode(dict(params, id=self.next_id, op=op)))
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("service closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
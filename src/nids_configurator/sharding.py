@@ -0,0 +1,149 @@
+import copy
+import os
+
+from .changes import write_if_changed
+from .writer import write_config_yaml
+
+# Splits one rendered config into per-instance configs for engines that run one process per NUMA
+# node or interface group. Pieces every instance shares are written once as include files:
+#
+#   nids-config.instances.yml        index: instance name -> config file, interfaces, NUMA node
+#   nids-config.d/address-groups.yml network home/excluded lists
+#   nids-config.d/rules.yml          rules section (paths, rule sets, manifest, digests)
+#   nids-config.d/instance-0.yml     instance config, "include" lists the two files above
+
+ADDRESS_KEYS = ("ipv4_home_nets", "ipv4_excluded_nets", "ipv6_home_nets", "ipv6_excluded_nets")
+INCLUDE_FILES = ("address-groups.yml", "rules.yml")
+# Per-interface entries that move with their interface into the instance config.
+PER_INTERFACE = (("network", "interface_details"), ("performance", "workers"), ("performance", "sampled"))
+
+
+def shard_dir_for(config_path):
+    return os.path.splitext(config_path)[0] + ".d"
+
+
+def index_path_for(config_path):
+    return os.path.splitext(config_path)[0] + ".instances.yml"
+
+
+def _numa_node(config, name):
+    worker = config.get("performance", {}).get("workers", {}).get(name) or {}
+    details = config["network"].get("interface_details", {}).get(name) or {}
+    node = worker.get("numa_node", details.get("numa_node"))
+    return node if isinstance(node, int) and node >= 0 else None
+
+
+def _weight(config, name):
+    # Capture threads of an interface, so instances end up with similar load, not similar interface counts.
+    worker = config.get("performance", {}).get("workers", {}).get(name) or {}
+    details = config["network"].get("interface_details", {}).get(name) or {}
+    return worker.get("threads") or details.get("rx_queues") or 1
+
+
+def plan_shards(config, instances=None, by_numa=False):
+    """Group network.interfaces into instances; returns ([{"name", "interfaces", "numa_node"}], warnings).
+
+    by_numa gives every NUMA node with capture interfaces its own instance, otherwise interfaces are
+    spread over `instances` groups, heaviest first onto the least loaded group.
+    """
+    interfaces = list(config["network"]["interfaces"])
+    if not interfaces:
+        raise ValueError("no capture interfaces to shard")
+    warnings = []
+    if by_numa:
+        groups = {}
+        for name in interfaces:
+            node = _numa_node(config, name)
+            if node is None:
+                warnings.append(f"interface {name}: NUMA node unknown, placing it with node 0")
+                node = 0
+            groups.setdefault(node, []).append(name)
+        return [{"name": f"node{node}", "interfaces": names, "numa_node": node}
+                for node, names in sorted(groups.items())], warnings
+
+    count = instances or 1
+    if count > len(interfaces):
+        warnings.append(f"{count} instances requested but only {len(interfaces)} interfaces, "
+                        f"using {len(interfaces)}")
+        count = len(interfaces)
+    loads = [0] * count
+    members = [[] for _ in range(count)]
+    for name in sorted(interfaces, key=lambda n: -_weight(config, n)):
+        target = loads.index(min(loads))
+        loads[target] += _weight(config, name)
+        members[target].append(name)
+    shards = []
+    for index, names in enumerate(members):
+        names.sort(key=interfaces.index)
+        nodes = {_numa_node(config, name) for name in names}
+        shards.append({"name": str(index), "interfaces": names,
+                       "numa_node": nodes.pop() if len(nodes) == 1 else None})
+    return shards, warnings
+
+
+def instance_log_file(log_file, name):
+    stem, ext = os.path.splitext(log_file)
+    return f"{stem}-{name}{ext}"
+
+
+def instance_config(config, shard):
+    """Config for one instance: its own interfaces, log file and name, shared pieces replaced by includes."""
+    result = copy.deepcopy(config)
+    names = shard["interfaces"]
+    network = result["network"]
+    network["interfaces"] = list(names)
+    for key in ADDRESS_KEYS:
+        network.pop(key, None)
+    result.pop("rules", None)
+    for section, key in PER_INTERFACE:
+        entries = result.get(section, {}).get(key)
+        if entries is not None:
+            result[section][key] = {name: entries[name] for name in names if name in entries}
+    rings = result.get("performance", {}).get("rings")
+    if rings:
+        rings["interfaces"] = {name: ring for name, ring in rings["interfaces"].items() if name in names}
+        rings["memory_bytes"] = sum(ring["memory_bytes"] for ring in rings["interfaces"].values())
+    result["general"]["nids_name"] = f"{config['general']['nids_name']}-{shard['name']}"
+    result["logging"]["log_file"] = instance_log_file(config["logging"]["log_file"], shard["name"])
+    return {"include": list(INCLUDE_FILES), **result}
+
+
+def write_shards(config, config_path, shards, if_changed=False):
+    """Write the include files, one config per instance and the index; returns the index path.
+
+    With if_changed unchanged files keep their mtime, so only instances whose config changed need a reload.
+    Instance configs of an earlier run with more instances are removed.
+    """
+    shard_dir = shard_dir_for(config_path)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    def write(path, data):
+        if if_changed:
+            write_if_changed(path, data, backup=False)
+        else:
+            write_config_yaml(path, data, backup=False)
+
+    addresses = {key: config["network"].get(key, []) for key in ADDRESS_KEYS}
+    write(os.path.join(shard_dir, INCLUDE_FILES[0]), {"network": addresses})
+    write(os.path.join(shard_dir, INCLUDE_FILES[1]), {"rules": config["rules"]})
+
+    index, current = {}, set()
+    for shard in shards:
+        file_name = f"instance-{shard['name']}.yml"
+        current.add(file_name)
+        instance = instance_config(config, shard)
+        write(os.path.join(shard_dir, file_name), instance)
+        index[shard["name"]] = {
+            "config": os.path.join(os.path.basename(shard_dir), file_name),
+            "interfaces": shard["interfaces"],
+            "numa_node": shard["numa_node"],
+            "log_file": instance["logging"]["log_file"],
+        }
+    for entry in os.listdir(shard_dir):
+        if entry.startswith("instance-") and entry.endswith(".yml") and entry not in current:
+            os.unlink(os.path.join(shard_dir, entry))
+
+    path = index_path_for(config_path)
+    write(path, {"includes": [os.path.join(os.path.basename(shard_dir), name) for name in INCLUDE_FILES],
+                 "instances": index})
+    return path
@@ -0,0 +1,405 @@
+import math
+import os
+import socket
+import threading
+import time
+
+# Syslog target probe: sends bursts of synthetic RFC 5424 messages to logging.syslog_target over UDP and TCP
+# (RFC 6587 octet-counted frames, in batches of several sizes) and recommends transport and batching settings
+# for the logging section.
+#
+# Against an arbitrary collector only the sender side is visible: the achieved rate and how long handing a
+# datagram or batch to the kernel took (TCP backpressure shows up there). Against a cooperating receiver
+# (SyslogReceiver, e.g. --probe-local) loss and delivery latency are measured too: each message carries its
+# sequence number and send time in a structured data element.
+
+DEFAULT_PORT = 514
+DEFAULT_MESSAGES = 10000
+DEFAULT_MESSAGE_SIZE = 512
+DEFAULT_ALERT_RATE = 1000
+BATCH_SIZES = (1, 8, 32, 128)
+# A transport must sustain this multiple of the expected alert rate, and lose at most MAX_LOSS of it.
+HEADROOM = 2.0
+MAX_LOSS = 0.001
+# The sender queue should absorb an alert flood of this length instead of blocking the engine.
+FLOOD_SECONDS = 10
+MAX_FLUSH_MS = 1000
+CONNECT_TIMEOUT_S = 5.0
+DRAIN_TIMEOUT_S = 10.0
+DRAIN_IDLE_S = 0.5
+PRI = 16 * 8 + 4  # local0.warning
+SD_ID = "nidsprobe@32473"  # 32473 is the private enterprise number reserved for documentation (RFC 5612)
+
+
+class ProbeError(ValueError):
+    pass
+
+
+def parse_target(target, default_port=DEFAULT_PORT):
+    """Split "host:port", "[v6]:port", a bare host or a bare IPv6 address into (host, port)."""
+    target = (target or "").strip()
+    if not target:
+        raise ProbeError("syslog target is empty")
+    if target.startswith("["):
+        host, sep, rest = target[1:].partition("]")
+        if not sep or (rest and not rest.startswith(":")):
+            raise ProbeError(f"'{target}' is not [address]:port")
+        port = rest[1:] or None
+    elif target.count(":") > 1:
+        host, port = target, None
+    else:
+        host, _, port = target.partition(":")
+        port = port or None
+    if not host or any(char.isspace() or char in "/@" for char in host):
+        raise ProbeError(f"'{target}' has no valid host name")
+    if port is None:
+        return host, default_port
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise ProbeError(f"'{port}' is not a valid port in '{target}'")
+    return host, int(port)
+
+
+def resolve_target(host, port):
+    """Return the distinct (family, sockaddr) pairs the target resolves to."""
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as exc:
+        raise ProbeError(f"cannot resolve '{host}': {exc.strerror}") from None
+    addresses = []
+    for family, _type, _proto, _name, sockaddr in infos:
+        if (family, sockaddr) not in addresses:
+            addresses.append((family, sockaddr))
+    return addresses
+
+
+def message_prefix(hostname=None, app_name="nids-configurator"):
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return f"<{PRI}>1 {timestamp} {hostname or socket.gethostname() or '-'} {app_name} {os.getpid()} probe "
+
+
+def build_message(prefix, seq, sent_ns, size):
+    text = f'{prefix}[{SD_ID} seq="{seq}" sent="{sent_ns}"] synthetic alert'
+    return (text + "." * (size - len(text))).encode("utf-8")
+
+
+def frame(message):
+    # RFC 6587 octet counting, which unlike newline framing is safe for any message content.
+    return b"%d %s" % (len(message), message)
+
+
+def percentiles_ms(values_s):
+    if not values_s:
+        return None
+    values = sorted(values_s)
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 3)
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": round(values[-1] * 1000, 3)}
+
+
+def _trial(transport, batch, sent, seconds, send_latencies, receiver, error=None):
+    trial = {"transport": transport, "batch": batch, "sent": sent, "seconds": seconds,
+             "rate": sent / seconds if seconds > 0 else 0.0, "received": None, "loss": None,
+             "latency_ms": percentiles_ms(send_latencies), "latency": "send", "error": error}
+    if receiver is not None and sent:
+        received, latencies = receiver.wait(sent)
+        trial.update(received=received, loss=1 - received / sent, latency_ms=percentiles_ms(latencies),
+                     latency="delivery")
+    return trial
+
+
+def probe_udp(family, sockaddr, count, size, prefix, receiver=None):
+    if receiver is not None:
+        receiver.reset()
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    latencies = []
+    sent = 0
+    start = time.perf_counter()
+    try:
+        sock.connect(sockaddr)
+        for seq in range(count):
+            message = build_message(prefix, seq, time.time_ns(), size)
+            before = time.perf_counter()
+            sock.send(message)
+            latencies.append(time.perf_counter() - before)
+            sent += 1
+    except ConnectionRefusedError:
+        # Connected UDP sockets report the collector's ICMP port unreachable on a later send.
+        return _trial("udp", 1, sent, time.perf_counter() - start, latencies, None, "port unreachable")
+    except OSError as exc:
+        return _trial("udp", 1, sent, time.perf_counter() - start, latencies, None, str(exc))
+    finally:
+        sock.close()
+    return _trial("udp", 1, sent, time.perf_counter() - start, latencies, receiver)
+
+
+def probe_tcp(family, sockaddr, count, size, batch, prefix, receiver=None):
+    if receiver is not None:
+        receiver.reset()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT_S)
+    latencies = []
+    sent = 0
+    try:
+        sock.connect(sockaddr)
+        start = time.perf_counter()
+        for first in range(0, count, batch):
+            sent_ns = time.time_ns()
+            data = b"".join(frame(build_message(prefix, seq, sent_ns, size))
+                            for seq in range(first, min(first + batch, count)))
+            before = time.perf_counter()
+            sock.sendall(data)
+            latencies.append(time.perf_counter() - before)
+            sent = min(first + batch, count)
+        seconds = time.perf_counter() - start
+    except OSError as exc:
+        return _trial("tcp", batch, 0, 0.0, [], None, exc.strerror or str(exc))
+    finally:
+        sock.close()
+    return _trial("tcp", batch, sent, seconds, latencies, receiver)
+
+
+def probe_target(family, sockaddr, count=DEFAULT_MESSAGES, size=DEFAULT_MESSAGE_SIZE, batch_sizes=BATCH_SIZES,
+                 receiver=None):
+    """Send one UDP burst and one TCP burst per batch size; returns a list of trial results."""
+    prefix = message_prefix()
+    trials = [probe_udp(family, sockaddr, count, size, prefix, receiver)]
+    for batch in batch_sizes:
+        trial = probe_tcp(family, sockaddr, count, size, batch, prefix, receiver)
+        trials.append(trial)
+        if trial["error"]:
+            # Nothing listens on TCP; the other batch sizes would fail the same way.
+            break
+    return trials
+
+
+def recommend(trials, alert_rate=DEFAULT_ALERT_RATE, headroom=HEADROOM, max_loss=MAX_LOSS):
+    """Pick transport and batching from probe trials; None when the target was not reachable at all."""
+    needed = alert_rate * headroom
+    reachable = [trial for trial in trials if trial["error"] is None and trial["sent"]]
+    if not reachable:
+        return None
+    notes = []
+    # Unmeasured TCP is lossless: the stream delivers or the trial fails. Unmeasured UDP is not, since
+    # datagrams can be dropped without any sign on the sending side.
+    lossless = [trial for trial in reachable
+                if (trial["transport"] == "tcp" if trial["loss"] is None else trial["loss"] <= max_loss)]
+    fast = [trial for trial in lossless if trial["rate"] >= needed]
+    # TCP first: a slow collector pushes back instead of silently dropping; then the smallest batch that keeps
+    # up, because a message can wait for its batch to fill.
+    fast.sort(key=lambda trial: (trial["transport"] != "tcp", trial["batch"]))
+    if fast:
+        choice, ok = fast[0], True
+    else:
+        # Without a fast enough transport, a lossless one beats a faster lossy one.
+        choice, ok = max(lossless or reachable, key=lambda trial: trial["rate"]), False
+        notes.append(f"no transport sustained {needed:.0f} msgs/s ({headroom:g}x the expected {alert_rate} alerts/s) "
+                     f"without loss; keep mode 'both' so alerts also reach the local file")
+    if choice["transport"] == "udp":
+        if not any(trial["transport"] == "tcp" and trial["error"] is None for trial in trials):
+            notes.append("the target does not accept TCP")
+        if choice["loss"] is None:
+            notes.append("UDP loss was not measured (no cooperating receiver); a busy collector drops datagrams "
+                         "silently")
+    batch = choice["batch"]
+    flush_ms = 0 if batch == 1 else min(MAX_FLUSH_MS, max(1, math.ceil(batch * 1000 / alert_rate)))
+    settings = {
+        "syslog_transport": choice["transport"],
+        "syslog_batch_size": batch,
+        "syslog_flush_ms": flush_ms,
+        # A full queue drops alerts instead of stalling the engine's output path.
+        "syslog_queue_size": max(batch, math.ceil(alert_rate * FLOOD_SECONDS)),
+    }
+    return {"ok": ok, "settings": settings, "trial": choice, "needed_rate": needed, "notes": notes}
+
+
+def format_probe(trials, recommendation=None):
+    lines = [f"{'transport':<9} {'batch':>5} {'msgs/s':>10} {'loss':>8} {'latency':>9} "
+             f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+    for trial in trials:
+        if trial["error"]:
+            lines.append(f"{trial['transport']:<9} {trial['batch']:>5} failed: {trial['error']}")
+            continue
+        loss = "-" if trial["loss"] is None else f"{trial['loss']:.2%}"
+        latency = trial["latency_ms"] or {"p50": 0, "p99": 0, "max": 0}
+        lines.append(f"{trial['transport']:<9} {trial['batch']:>5} {trial['rate']:>10.0f} {loss:>8} "
+                     f"{trial['latency']:>9} {latency['p50']:>8.3f} {latency['p99']:>8.3f} {latency['max']:>8.3f}")
+    if recommendation is not None:
+        settings = recommendation["settings"]
+        lines.append(f"Recommended: {settings['syslog_transport']}, batches of {settings['syslog_batch_size']} "
+                     f"flushed after {settings['syslog_flush_ms']} ms, queue of {settings['syslog_queue_size']} "
+                     f"messages")
+        lines.extend(f"Warning: {note}" for note in recommendation["notes"])
+    return lines
+
+
+def _sd_param(message, name):
+    start = message.find(b'%s="' % name)
+    if start < 0:
+        return None
+    start += len(name) + 2
+    try:
+        return int(message[start:message.find(b'"', start)])
+    except ValueError:
+        return None
+
+
+def _parse_probe_fields(message):
+    # (seq, sent_ns) from the structured data element, or None for other traffic.
+    if message.find(SD_ID.encode()) < 0:
+        return None
+    seq, sent_ns = _sd_param(message, b"seq"), _sd_param(message, b"sent")
+    if seq is None or sent_ns is None:
+        return None
+    return seq, sent_ns
+
+
+class SyslogReceiver:
+    """Stand-in collector on localhost for tests and --probe-local.
+
+    Listens on the same port for UDP datagrams and TCP streams (octet-counted or newline framed), counts probe
+    messages since the last reset() and records their delivery latency from the embedded send time. A sequence
+    number seen twice (a retransmitted or duplicated message) is counted once.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, rcvbuf=4 << 20):
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        for _attempt in range(10):
+            self.tcp = socket.socket(family, socket.SOCK_STREAM)
+            self.tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.tcp.bind((host, port))
+            self.udp = socket.socket(family, socket.SOCK_DGRAM)
+            try:
+                self.udp.bind((host, self.tcp.getsockname()[1]))
+                break
+            except OSError:
+                # The ephemeral TCP port is taken for UDP; try another one.
+                self.tcp.close()
+                self.udp.close()
+                if port:
+                    raise
+        else:
+            raise OSError("no free port for both UDP and TCP")
+        self.udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        self.tcp.listen(16)
+        self.address = (family, self.tcp.getsockname())
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.threads = []
+        self.reset()
+
+    @property
+    def target(self):
+        host, port = self.address[1][:2]
+        return f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+
+    def start(self):
+        for target in (self._serve_udp, self._serve_tcp):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def reset(self):
+        with self.lock:
+            self.received = 0
+            self.latencies = []
+            self.seen = set()
+            self.last_seen = time.monotonic()
+
+    def _record(self, message):
+        fields = _parse_probe_fields(message)
+        if fields is None:
+            return
+        seq, sent_ns = fields
+        latency = (time.time_ns() - sent_ns) / 1e9
+        with self.lock:
+            if seq in self.seen:
+                return
+            self.seen.add(seq)
+            self.received += 1
+            self.latencies.append(latency)
+            self.last_seen = time.monotonic()
+
+    def _serve_udp(self):
+        self.udp.settimeout(0.2)
+        while not self.stopping.is_set():
+            try:
+                data = self.udp.recv(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self._record(data)
+
+    def _serve_tcp(self):
+        self.tcp.settimeout(0.2)
+        while not self.stopping.is_set():
+            try:
+                conn, _peer = self.tcp.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            thread = threading.Thread(target=self._serve_connection, args=(conn,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _serve_connection(self, conn):
+        buffer = b""
+        conn.settimeout(0.2)
+        with conn:
+            while not self.stopping.is_set():
+                try:
+                    data = conn.recv(262144)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                if not data:
+                    break
+                buffer = self._consume(buffer + data)
+
+    def _consume(self, buffer):
+        # Returns the incomplete tail of the stream.
+        while buffer:
+            space = buffer.find(b" ")
+            if buffer[:1].isdigit() and 0 < space and buffer[:space].isdigit():
+                end = space + 1 + int(buffer[:space])
+                if len(buffer) < end:
+                    return buffer
+                self._record(buffer[space + 1:end])
+                buffer = buffer[end:]
+            else:
+                line, newline, rest = buffer.partition(b"\n")
+                if not newline:
+                    return buffer
+                self._record(line)
+                buffer = rest
+        return buffer
+
+    def wait(self, expected, timeout=DRAIN_TIMEOUT_S, idle=DRAIN_IDLE_S):
+        """Wait until `expected` messages arrived or none came for `idle` seconds; returns (count, latencies)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                received, last_seen = self.received, self.last_seen
+            now = time.monotonic()
+            if received >= expected or now >= deadline or now - last_seen >= idle:
+                break
+            time.sleep(0.01)
+        with self.lock:
+            return self.received, list(self.latencies)
+
+    def close(self):
+        self.stopping.set()
+        self.udp.close()
+        self.tcp.close()
+        for thread in self.threads:
+            thread.join(1)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,131 @@
+import os
+
+# CPU/NUMA topology from sysfs and the capture worker layout derived from it.
+
+SYSFS_SYSTEM = "/sys/devices/system"
+
+
+def parse_cpu_list(text):
+    # Kernel cpulist format: "0-3,8,10-11"
+    cpus = []
+    for part in (text or "").strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def format_cpu_list(cpus):
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def _read(path):
+    try:
+        with open(path) as attr:
+            return attr.read().strip()
+    except OSError:
+        return None
+
+
+def read_topology(root=SYSFS_SYSTEM):
+    """Return {"nodes": {node: [cpus]}, "siblings": {cpu: [SMT siblings]}} for the online CPUs."""
+    online = parse_cpu_list(_read(os.path.join(root, "cpu", "online")))
+    if not online:
+        online = list(range(os.cpu_count() or 1))
+    nodes = {}
+    try:
+        with os.scandir(os.path.join(root, "node")) as entries:
+            for entry in entries:
+                if entry.name.startswith("node") and entry.name[4:].isdigit():
+                    cpus = parse_cpu_list(_read(os.path.join(entry.path, "cpulist")))
+                    nodes[int(entry.name[4:])] = [cpu for cpu in cpus if cpu in online]
+    except OSError:
+        pass
+    # Kernels without NUMA support have no node directory: one node holds every CPU.
+    if not nodes or not any(nodes.values()):
+        nodes = {0: list(online)}
+    siblings = {}
+    for cpu in online:
+        text = _read(os.path.join(root, "cpu", f"cpu{cpu}", "topology", "thread_siblings_list"))
+        siblings[cpu] = [c for c in parse_cpu_list(text) if c in online] or [cpu]
+    return {"nodes": {node: cpus for node, cpus in sorted(nodes.items()) if cpus}, "siblings": siblings}
+
+
+def _cores(cpus, siblings):
+    # Groups CPUs into physical cores, each listed as (first thread, all threads on the node).
+    cores, seen = [], set()
+    for cpu in sorted(cpus):
+        if cpu in seen:
+            continue
+        threads = [c for c in siblings.get(cpu, [cpu]) if c in cpus]
+        seen.update(threads)
+        cores.append((cpu, threads))
+    return cores
+
+
+def plan_workers(topology, interfaces, details, management_cores=1):
+    """Spread capture workers of each interface over the physical cores of its NUMA node.
+
+    details is {interface: {"numa_node": n, "rx_queues": q}} as recorded by --check-interfaces; unknown
+    values fall back to the first node and one worker per free core. Workers get one thread per physical
+    core; SMT siblings stay idle so two capture threads never compete for one core.
+    Returns (performance section, warnings).
+    """
+    nodes = topology["nodes"]
+    siblings = topology["siblings"]
+    warnings = []
+    free = {node: _cores(cpus, siblings) for node, cpus in nodes.items()}
+
+    def node_of(name):
+        node = (details.get(name) or {}).get("numa_node")
+        if node not in nodes:
+            if node is not None:
+                warnings.append(f"interface {name}: NUMA node {node} has no online CPUs, using node "
+                                f"{min(nodes)}")
+            node = min(nodes)
+        return node
+
+    placement = {name: node_of(name) for name in interfaces}
+
+    # Management threads go to the node with the fewest capture interfaces, on its lowest cores
+    # (where the kernel also runs most housekeeping), with their SMT siblings kept off the hot path.
+    management_node = min(nodes, key=lambda n: (sum(1 for v in placement.values() if v == n), n))
+    management = []
+    for _ in range(min(management_cores, len(free[management_node]) - 1)):
+        management.extend(free[management_node].pop(0)[1])
+    if not management:
+        warnings.append("not enough cores to keep a management core off the capture workers")
+
+    workers = {}
+    for node in nodes:
+        on_node = [name for name in interfaces if placement[name] == node]
+        cores = free[node]
+        for index, name in enumerate(on_node):
+            # Cores left on the node are shared evenly by the interfaces still to be placed.
+            share = max(1, len(cores) // (len(on_node) - index))
+            queues = (details.get(name) or {}).get("rx_queues") or share
+            count = min(queues, share)
+            assigned = cores[:count]
+            cores = cores[count:]
+            if not assigned:
+                # No free core left: share one on the node rather than crossing to a remote node.
+                warnings.append(f"interface {name}: no free core on NUMA node {node}, sharing CPU {nodes[node][0]}")
+                assigned = [(nodes[node][0], [])]
+            elif count < queues:
+                warnings.append(f"interface {name}: {queues} RX queues but only {count} cores on NUMA node {node}")
+            cpus = sorted(cpu for cpu, _threads in assigned)
+            workers[name] = {"numa_node": node, "threads": len(cpus), "cpu_affinity": format_cpu_list(cpus)}
+        free[node] = cores
+
+    section = {
+        "management_cpus": format_cpu_list(management),
+        "workers": workers,
+    }
+    return section, warnings
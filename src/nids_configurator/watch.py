@@ -0,0 +1,358 @@
+import copy
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# --watch: re-render when an input changes. Inputs are grouped by the part of the run they feed:
+#
+#   env       the env file sourced by the wrapper     -> everything is rebuilt from scratch
+#   manifest  the batch manifest                      -> batch render (unchanged hosts are skipped)
+#   network   --import-home/--import-excluded files   -> network stages, then the save stages
+#   rules     rule_paths directories, checksum file   -> rule stages, then the save stages
+#
+# inotify is used through libc (no dependency); where it is missing or out of watches, file stats are polled.
+
+DEFAULT_DEBOUNCE_MS = 1000
+DEFAULT_POLL_INTERVAL_MS = 2000
+# A change storm (a rule update unpacking 10k files) is cut off after this long, so renders still happen.
+MAX_DELAY_S = 30.0
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT = struct.Struct("iIII")
+
+
+def read_env_file(path):
+    """Parse a shell env file of KEY=VALUE lines ("export" and quotes allowed); a missing file is empty."""
+    values = {}
+    try:
+        with open(path, encoding="utf-8") as env_file:
+            lines = env_file.readlines()
+    except FileNotFoundError:
+        return values
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[7:].lstrip()
+        key, sep, value = line.partition("=")
+        if not sep or not key.replace("_", "").isalnum():
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        values[key] = value
+    return values
+
+
+class EnvFile:
+    # Applies an env file to os.environ; keys dropped from the file get their original value back.
+    def __init__(self, path):
+        self.path = path
+        self.original = {}
+
+    def load(self):
+        values = read_env_file(self.path)
+        for key in list(self.original):
+            if key not in values:
+                self._restore(key)
+        for key, value in values.items():
+            self.original.setdefault(key, os.environ.get(key))
+            os.environ[key] = value
+        return values
+
+    def _restore(self, key):
+        value = self.original.pop(key)
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+def watch_targets(configurator, env_file=None, manifest=None):
+    """Return [(group, path, recursive)] for the inputs of a run; missing paths are watched through their parent."""
+    targets = []
+    if env_file:
+        targets.append(("env", env_file, False))
+    if manifest and manifest != "-":
+        targets.append(("manifest", manifest, False))
+    for path in (configurator.import_home or []) + (configurator.import_excluded or []):
+        if path != "-":
+            targets.append(("network", path, False))
+    for path in configurator.config["rules"]["rule_paths"]:
+        targets.append(("rules", path, True))
+    if configurator.rule_checksums:
+        targets.append(("rules", configurator.rule_checksums, False))
+    return targets
+
+
+def _walk_dirs(root):
+    yield root
+    try:
+        with os.scandir(root) as entries:
+            subdirs = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return
+    for path in subdirs:
+        yield from _walk_dirs(path)
+
+
+class InotifyWatcher:
+    def __init__(self, targets):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # watch descriptor -> [(group, directory, file name or None for the whole tree)]
+        self.watches = {}
+        self.groups = {group for group, _path, _recursive in targets}
+        try:
+            for group, path, recursive in targets:
+                if recursive and os.path.isdir(path):
+                    for directory in _walk_dirs(path):
+                        self._add(group, directory, None)
+                else:
+                    parent = os.path.dirname(os.path.abspath(path))
+                    if os.path.isdir(parent):
+                        self._add(group, parent, os.path.basename(path))
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, group, directory, name):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            # ENOSPC here means fs.inotify.max_user_watches is exhausted.
+            raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+        self.watches.setdefault(wd, []).append((group, directory, name))
+
+    def _read(self):
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def poll(self, timeout=None):
+        """Block up to timeout seconds (None: forever); returns the groups whose inputs changed."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = self._read()
+        changed = set()
+        offset = 0
+        while offset + EVENT.size <= len(data):
+            wd, mask, _cookie, length = EVENT.unpack_from(data, offset)
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0").decode(errors="replace")
+            offset += EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                return set(self.groups)
+            for group, directory, watched_name in self.watches.get(wd, ()):
+                if watched_name is not None and name != watched_name:
+                    continue
+                changed.add(group)
+                if watched_name is None and mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # New subdirectories (an unpacked rule archive) are watched as they appear.
+                    try:
+                        for subdir in _walk_dirs(os.path.join(directory, name)):
+                            self._add(group, subdir, None)
+                    except OSError as exc:
+                        print(f"Warning: {exc}; changes below it are only seen on the next render")
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _stat_tree(path, recursive):
+    state = {}
+    try:
+        info = os.stat(path)
+    except OSError:
+        return state
+    state[path] = (info.st_mtime_ns, info.st_size, info.st_ino)
+    if recursive and os.path.isdir(path):
+        for directory in _walk_dirs(path):
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        info = entry.stat(follow_symlinks=False)
+                        state[entry.path] = (info.st_mtime_ns, info.st_size, info.st_ino)
+            except OSError:
+                continue
+    return state
+
+
+class PollingWatcher:
+    # Fallback: compares stat snapshots every interval; costs one scandir per watched directory.
+    def __init__(self, targets, interval_s=DEFAULT_POLL_INTERVAL_MS / 1000.0):
+        self.targets = targets
+        self.interval_s = interval_s
+        self.state = self._snapshot()
+
+    def _snapshot(self):
+        state = {}
+        for group, path, recursive in self.targets:
+            state.setdefault(group, {}).update(_stat_tree(path, recursive))
+        return state
+
+    def poll(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval_s if deadline is None else min(self.interval_s, deadline - time.monotonic())
+            if wait > 0:
+                time.sleep(wait)
+            state = self._snapshot()
+            changed = {group for group in state if state[group] != self.state.get(group)}
+            self.state = state
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(targets, polling=False, poll_interval_s=DEFAULT_POLL_INTERVAL_MS / 1000.0):
+    if not polling:
+        try:
+            return InotifyWatcher(targets)
+        except OSError as exc:
+            print(f"Warning: {exc}; falling back to polling every {poll_interval_s:g} s")
+    return PollingWatcher(targets, poll_interval_s)
+
+
+def wait_for_changes(watcher, debounce_s, max_delay_s=MAX_DELAY_S):
+    """Wait for a change, then keep collecting until debounce_s pass without one (or max_delay_s in total)."""
+    changed = set()
+    while not changed:
+        changed = watcher.poll(None)
+    deadline = time.monotonic() + max_delay_s
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return changed
+        more = watcher.poll(min(debounce_s, remaining))
+        if not more:
+            return changed
+        changed |= more
+
+
+class WatchSession:
+    """Keeps the last run's state so a change only recomputes the stages fed by the changed inputs.
+
+    build() returns (configurator, args) from the current environment and command line, like main().
+    """
+
+    def __init__(self, build, env_file=None):
+        self.build = build
+        self.env = EnvFile(env_file) if env_file else None
+        self.configurator = None
+        self.args = None
+        self.base = None
+
+    def render_all(self):
+        if self.env:
+            self.env.load()
+        self.configurator, self.args = self.build()
+        configurator = self.configurator
+        # Watch runs unattended; unchanged outputs are not rewritten.
+        configurator.non_interactive = True
+        configurator.if_changed = True
+        if self.args.batch:
+            return self._render_batch()
+        self.base = copy.deepcopy(configurator.config)
+        configurator.run()
+        return {"env"}
+
+    def _render_batch(self):
+        from .batch import run_batch
+        args = self.args
+        run_batch(args.batch, self.configurator.config, args.output_dir, manifest_format=args.manifest_format,
+                  jobs=args.jobs, compact_networks=args.compact_networks, if_changed=True,
+                  memory_budget=args.memory_budget)
+        return {"manifest"}
+
+    def regenerate(self, changed):
+        """Re-render after changes to the given input groups; returns the groups that were recomputed."""
+        if "env" in changed:
+            return self.render_all()
+        if self.args.batch:
+            return self._render_batch() if "manifest" in changed else set()
+        configurator = self.configurator
+        if "network" in changed:
+            configurator.config["network"] = copy.deepcopy(self.base["network"])
+            if "performance" in self.base:
+                configurator.config["performance"] = copy.deepcopy(self.base["performance"])
+            else:
+                configurator.config.pop("performance", None)
+            configurator.process_network()
+        if "rules" in changed:
+            configurator.config["rules"] = copy.deepcopy(self.base["rules"])
+            configurator.rule_inventory = None
+            configurator.process_rules()
+        configurator.save_outputs(configurator.default_save_path())
+        return changed & {"network", "rules"}
+
+    def targets(self):
+        targets = watch_targets(self.configurator, self.env.path if self.env else None, self.args.batch)
+        # Existence is part of the key: a missing input is watched through its parent until it appears.
+        return [(target, os.path.exists(target[1])) for target in targets]
+
+
+def run_watch(build, env_file=None, debounce_ms=DEFAULT_DEBOUNCE_MS, poll_interval_ms=DEFAULT_POLL_INTERVAL_MS,
+              polling=False):
+    session = WatchSession(build, env_file)
+    session.render_all()
+    targets = session.targets()
+    watcher = make_watcher([target for target, _exists in targets], polling, poll_interval_ms / 1000.0)
+    print(f"Watching {len(targets)} inputs for changes (Ctrl-C to stop)", flush=True)
+    try:
+        while True:
+            changed = wait_for_changes(watcher, debounce_ms / 1000.0)
+            print(f"\nChange detected in: {', '.join(sorted(changed))}", flush=True)
+            try:
+                session.regenerate(changed)
+            except SystemExit as exc:
+                # A failing stage (budget, checksum mismatch) keeps the last good config and keeps watching.
+                print(f"Regeneration failed (exit code {exc.code}); keeping the previous configuration")
+            except (ValueError, OSError) as exc:
+                # A manifest caught mid-edit or replaced, or an output that cannot be written.
+                print(f"Error: {exc}")
+                print("Regeneration failed; keeping the previous configuration")
+            new_targets = session.targets()
+            if new_targets != targets:
+                # Rule paths or import files changed with the env file, or a missing input appeared.
+                watcher.close()
+                targets = new_targets
+                watcher = make_watcher([target for target, _exists in targets], polling, poll_interval_ms / 1000.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
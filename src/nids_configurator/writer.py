@@ -0,0 +1,98 @@
+import os
+import stat
+import tempfile
+
+# PyYAML is imported on first use: it is the slowest import of the package and
+# --help or batch workers that only read manifests should not pay for it.
+yaml = None
+
+
+def require_yaml():
+    global yaml
+    if yaml is None:
+        try:
+            import yaml as yaml_module  # pip install pyyaml
+        except ImportError:
+            return None
+        yaml = yaml_module
+    return yaml
+
+
+def yaml_dumper():
+    # libyaml's emitter is an order of magnitude faster on long address/rule lists.
+    require_yaml()
+    return getattr(yaml, "CSafeDumper", None) or yaml.SafeDumper
+
+
+def dump_yaml(data):
+    return require_yaml().dump(data, Dumper=yaml_dumper(), sort_keys=False, allow_unicode=True)
+
+
+def _fsync_dir(directory):
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def backup_path_for(path):
+    return path + ".bak"
+
+
+def _keep_backup(path):
+    # Hard link first so the live file is never missing; copy where links are not supported.
+    backup = backup_path_for(path)
+    link_tmp = f"{backup}.{os.getpid()}.tmp"
+    try:
+        os.link(path, link_tmp)
+        os.replace(link_tmp, backup)
+    except OSError:
+        if os.path.lexists(link_tmp):
+            os.unlink(link_tmp)
+        import shutil
+        shutil.copy2(path, backup)
+
+
+def atomic_write(path, data, backup=True, fsync=True, mode=0o644):
+    # Write to a temp file in the target directory and rename it over `path`, so readers
+    # only ever see the old or the new content, never a partial write.
+    directory = os.path.dirname(os.path.abspath(path))
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        current = None
+    if current is not None:
+        mode = stat.S_IMODE(current.st_mode)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+            tmp_file.flush()
+            if fsync:
+                os.fsync(tmp_file.fileno())
+        os.chmod(tmp_path, mode)
+        if backup and current is not None:
+            _keep_backup(path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if fsync:
+        _fsync_dir(directory)
+    return len(data)
+
+
+def write_config_yaml(path, config, backup=True, fsync=True):
+    return atomic_write(path, dump_yaml(config), backup=backup, fsync=fsync)
@@ -0,0 +1,78 @@
+import ipaddress
+import os
+import random
+import tempfile
+
+import pytest
+
+from src.nids_configurator.addrindex import (
+    AddressIndex, AddressIndexError, index_path_for, write_config_index, write_index
+)
+from src.nids_configurator.cidrset import CIDRSet
+
+
+@pytest.fixture
+def tmpdir():
+    with tempfile.TemporaryDirectory() as path:
+        yield path
+
+
+def test_index_path_sits_next_to_config():
+    assert index_path_for("/etc/nids/nids-config.yml") == "/etc/nids/nids-config.addridx"
+
+
+def test_lookups_match_cidrset_membership(tmpdir):
+    rng = random.Random(3)
+    v4 = CIDRSet.from_cidrs([f"{rng.randrange(1, 224)}.{rng.randrange(256)}.0.0/{rng.randrange(12, 25)}"
+                             for _ in range(300)], 4)
+    v6 = CIDRSet.from_cidrs([f"2001:db8:{rng.randrange(1 << 16):x}:{rng.randrange(1 << 16):x}::/{rng.randrange(40, 80)}"
+                             for _ in range(300)], 6)
+    path = os.path.join(tmpdir, "home.addridx")
+    write_index(path, v4, v6)
+    with AddressIndex(path) as index:
+        assert index.ipv4_count == len(v4)
+        assert index.ipv6_count == len(v6)
+        for _ in range(3000):
+            addr = rng.randrange(1 << 32)
+            assert index.contains_ipv4(addr) == (addr in v4)
+        for start, end in v6.intervals[:100]:
+            for addr in (start - 1, start, (start + end) // 2, end, end + 1):
+                assert index.contains_ipv6(addr) == (addr in v6)
+
+
+def test_contains_accepts_strings_and_ipaddress_objects(tmpdir):
+    path = os.path.join(tmpdir, "cfg.addridx")
+    network = {"ipv4_home_nets": ["10.0.0.0/8"], "ipv4_excluded_nets": ["10.1.0.0/16"],
+               "ipv6_home_nets": ["2001:db8::/32"], "ipv6_excluded_nets": []}
+    write_config_index(path, network)
+    with AddressIndex(path) as index:
+        assert "10.2.3.4" in index
+        assert "10.1.3.4" not in index
+        assert ipaddress.ip_address("2001:db8::1") in index
+        assert "2001:db9::1" not in index
+
+
+def test_empty_index_matches_nothing(tmpdir):
+    path = os.path.join(tmpdir, "empty.addridx")
+    write_index(path, CIDRSet(4), CIDRSet(6))
+    with AddressIndex(path) as index:
+        assert "10.0.0.1" not in index
+        assert "::1" not in index
+
+
+def test_corrupted_index_is_rejected(tmpdir):
+    path = os.path.join(tmpdir, "bad.addridx")
+    write_index(path, CIDRSet.from_cidrs(["10.0.0.0/8"], 4), CIDRSet(6))
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b"\xff")
+    with pytest.raises(AddressIndexError):
+        AddressIndex(path)
+
+
+def test_non_index_file_is_rejected(tmpdir):
+    path = os.path.join(tmpdir, "nids-config.yml")
+    with open(path, "w") as f:
+        f.write("general:\n  nids_name: x\n" * 10)
+    with pytest.raises(AddressIndexError):
+        AddressIndex(path)
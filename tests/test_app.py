@@ -1,9 +1,13 @@
 import pytest
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 import tempfile
 import os
+import yaml
 from src.nids_configurator.app import NIDSConfigurator
 
+ETH0 = {"operstate": "up", "speed_mbps": 10000, "mtu": 1500, "driver": "ixgbe", "rx_queues": 8, "tx_queues": 8,
+        "numa_node": 0, "virtual": False}
+
 
 class TestNIDSConfigurator:
 
@@ -125,10 +129,40 @@ class TestNIDSConfigurator:
 
     @patch('builtins.input', side_effect=['eth0', '', '192.168.1.0/24', '', '', '', '', ''])
     def test_configure_network_updates_network_config(self, mock_input, configurator):
+        configurator.net_interfaces = {"eth0": ETH0}
         configurator.configure_network()
         assert configurator.config["network"]["interfaces"] == ["eth0"]
         assert configurator.config["network"]["ipv4_home_nets"] == ["192.168.1.0/24"]
 
+    @patch('builtins.input', side_effect=['eht0', '', 'eth0', '', '', '', '', '', ''])
+    def test_configure_network_skips_unknown_interfaces(self, mock_input, configurator, capsys):
+        configurator.net_interfaces = {"eth0": ETH0}
+        configurator.configure_network()
+        assert configurator.config["network"]["interfaces"] == ["eth0"]
+        assert "did you mean: eth0" in capsys.readouterr().out
+
+    def test_check_network_interfaces_records_details(self, configurator):
+        configurator.net_interfaces = {"eth0": ETH0}
+        configurator.config["network"]["interfaces"] = ["eth0"]
+        details = configurator.check_network_interfaces()
+        assert details["eth0"]["speed_mbps"] == 10000
+        assert details["eth0"]["rx_queues"] == 8
+
+    def test_check_network_interfaces_exits_on_unknown_interface(self, configurator):
+        configurator.net_interfaces = {"eth0": ETH0}
+        configurator.config["network"]["interfaces"] = ["eth9"]
+        with pytest.raises(SystemExit):
+            configurator.check_network_interfaces()
+
+    def test_select_capture_method_auto_picks_fastest_supported(self, configurator):
+        with patch.object(configurator.os_info, "capabilities",
+                          return_value={"kernel": "5.14.0", "capture_methods": ["af_packet_v3", "pcap"]}):
+            configurator.capture_method = "auto"
+            assert configurator.select_capture_method() == "af_packet_v3"
+            configurator.capture_method = "af_xdp"
+            configurator.select_capture_method()
+        assert configurator.config["network"]["capture_method"] == "af_xdp"
+
     @patch('builtins.input', side_effect=['/etc/rules', '', 'ruleset1', '', '', ''])
     def test_configure_rules_updates_rules_config(self, mock_input, configurator):
         configurator.configure_rules()
@@ -155,14 +189,35 @@ class TestNIDSConfigurator:
         assert configurator.config["logging"]["log_file"] == "/var/log/test.log"
         assert configurator.config["logging"]["syslog_target"] == "remote:514"
 
-    @patch('yaml.safe_dump')
-    @patch('builtins.open', new_callable=mock_open)
-    def test_save_config_yaml_writes_config_to_file(self, mock_file, mock_yaml_dump, configurator):
-        configurator.save_config_yaml("/tmp/test.yml")
-        mock_file.assert_called_once_with("/tmp/test.yml", "w", encoding="utf-8")
-        mock_yaml_dump.assert_called_once()
+    def test_save_config_yaml_writes_config_to_file(self, configurator):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "test.yml")
+            configurator.save_config_yaml(path)
+            with open(path, encoding="utf-8") as f:
+                assert yaml.safe_load(f) == configurator.config
+            assert os.listdir(tmpdir) == ["test.yml"]
 
-    @patch('src.nids_configurator.app.yaml', None)
-    def test_save_config_yaml_exits_when_yaml_not_installed(self, configurator):
+    def test_save_config_yaml_keeps_previous_version_as_backup(self, configurator):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "test.yml")
+            configurator.save_config_yaml(path)
+            configurator.config["general"]["nids_name"] = "Changed"
+            configurator.save_config_yaml(path)
+            with open(path + ".bak", encoding="utf-8") as f:
+                assert yaml.safe_load(f)["general"]["nids_name"] == "MyNIDS"
+            with open(path, encoding="utf-8") as f:
+                assert yaml.safe_load(f)["general"]["nids_name"] == "Changed"
+
+    @patch('src.nids_configurator.writer.require_yaml', return_value=None)
+    def test_save_config_yaml_exits_when_yaml_not_installed(self, mock_require_yaml, configurator):
         with pytest.raises(SystemExit):
             configurator.save_config_yaml("/tmp/test.yml")
+
+    def test_optimize_networks_collapses_lists_and_returns_conflicts(self, configurator):
+        network = configurator.config["network"]
+        network["ipv4_home_nets"] = ["10.0.0.0/24", "10.0.1.0/24"]
+        network["ipv4_excluded_nets"] = ["10.0.1.0/24"]
+        conflicts = configurator.optimize_networks()
+        assert network["ipv4_home_nets"] == ["10.0.0.0/23"]
+        assert network["ipv4_effective_home_nets"] == ["10.0.0.0/24"]
+        assert conflicts == ["IPv4 home network '10.0.1.0/24' is fully covered by ipv4_excluded_nets"]
@@ -0,0 +1,111 @@
+import io
+import os
+import tempfile
+
+import pytest
+import yaml
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.batch import (
+    ManifestError, apply_overrides, detect_format, iter_manifest, render_chunk, run_batch
+)
+
+
+class TestBatch:
+
+    @pytest.fixture
+    def base_config(self):
+        return NIDSConfigurator().default_config()
+
+    @pytest.fixture
+    def output_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield tmpdir
+
+    def test_detect_format_uses_extension(self):
+        assert detect_format("hosts.csv") == "csv"
+        assert detect_format("hosts.jsonl") == "jsonl"
+        assert detect_format("hosts.yaml") == "yaml"
+
+    def test_detect_format_rejects_unknown_extension(self):
+        with pytest.raises(ManifestError):
+            detect_format("hosts.txt")
+
+    def test_iter_manifest_streams_csv_rows(self):
+        stream = io.StringIO("host,nids_name\nh1,a\nh2,b\n")
+        rows = list(iter_manifest(stream, "csv"))
+        assert [row["host"] for _, row in rows] == ["h1", "h2"]
+
+    def test_iter_manifest_reports_bad_jsonl_lines(self):
+        stream = io.StringIO('{"host": "h1"}\nnot json\n')
+        rows = list(iter_manifest(stream, "jsonl"))
+        assert rows[0] == (1, {"host": "h1"})
+        assert rows[1][0] == 2
+        assert isinstance(rows[1][1], ManifestError)
+
+    def test_iter_manifest_expands_yaml_lists(self):
+        stream = io.StringIO("- host: h1\n- host: h2\n---\nhost: h3\n")
+        rows = list(iter_manifest(stream, "yaml"))
+        assert [row["host"] for _, row in rows] == ["h1", "h2", "h3"]
+
+    def test_iter_manifest_wraps_parse_errors(self):
+        with pytest.raises(ManifestError, match="invalid YAML manifest"):
+            list(iter_manifest(io.StringIO("- host: h1\n- [unclosed\n"), "yaml"))
+        # Fields over csv.field_size_limit() make the reader raise csv.Error.
+        with pytest.raises(ManifestError, match="invalid CSV manifest"):
+            list(iter_manifest(io.StringIO("host,nids_name\nh1," + "x" * 200000 + "\n"), "csv"))
+
+    def test_apply_overrides_converts_field_types(self, base_config):
+        row = {"host": "h1", "config_version": "3", "enabled": "no", "interfaces": "eth0, eth1",
+               "ipv4_home_nets": ["10.0.0.0/8"], "log_level": "DEBUG", "log_mode": ""}
+        config = apply_overrides(base_config, row)
+        assert config["general"]["config_version"] == 3
+        assert config["general"]["enabled"] is False
+        assert config["network"]["interfaces"] == ["eth0", "eth1"]
+        assert config["network"]["ipv4_home_nets"] == ["10.0.0.0/8"]
+        assert config["logging"]["log_level"] == "DEBUG"
+        assert config["logging"]["mode"] == "file"
+
+    @pytest.mark.parametrize("row", [
+        {"ipv4_home_nets": "2001:db8::/32"},
+        {"log_mode": "stdout"},
+        {"config_version": "x"},
+        {"unknown_field": "1"},
+    ])
+    def test_apply_overrides_rejects_invalid_values(self, base_config, row):
+        with pytest.raises(ValueError):
+            apply_overrides(base_config, row)
+
+    def test_render_chunk_reports_errors_per_host(self, base_config, output_dir):
+        rows = [(1, {"host": "good", "nids_name": "G"}), (2, {"host": "bad", "log_level": "LOUD"}),
+                (3, {"host": "../escape"})]
+        results = render_chunk(base_config, rows, output_dir)
+        assert results[0][3] is None
+        assert results[1][3] is not None
+        assert results[2][3] is not None
+        assert os.listdir(output_dir) == ["good.yml"]
+
+    def test_run_batch_renders_every_host(self, base_config, output_dir):
+        manifest = os.path.join(output_dir, "hosts.jsonl")
+        with open(manifest, "w", encoding="utf-8") as f:
+            for i in range(20):
+                f.write(f'{{"host": "h{i}", "nids_name": "sensor-{i}"}}\n')
+        out = os.path.join(output_dir, "out")
+        summary = run_batch(manifest, base_config, out, jobs=1, chunk_size=3)
+        assert summary == {"rendered": 20, "unchanged": 0, "failed": 0}
+        with open(os.path.join(out, "h7.yml"), encoding="utf-8") as f:
+            assert yaml.safe_load(f)["general"]["nids_name"] == "sensor-7"
+        assert base_config["general"]["nids_name"] == "MyNIDS"
+
+    def test_run_batch_if_changed_skips_identical_hosts(self, base_config, output_dir):
+        manifest = os.path.join(output_dir, "hosts.csv")
+        with open(manifest, "w", encoding="utf-8") as f:
+            f.write("host,nids_name\nh1,a\nh2,b\n")
+        out = os.path.join(output_dir, "out")
+        run_batch(manifest, base_config, out, jobs=1)
+        mtime = os.stat(os.path.join(out, "h1.yml")).st_mtime_ns
+        with open(manifest, "w", encoding="utf-8") as f:
+            f.write("host,nids_name\nh1,a\nh2,changed\n")
+        summary = run_batch(manifest, base_config, out, jobs=1, if_changed=True)
+        assert summary == {"rendered": 1, "unchanged": 1, "failed": 0}
+        assert os.stat(os.path.join(out, "h1.yml")).st_mtime_ns == mtime
@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def bench_suite():
+    # The suite is a script: it imports bench_writer from its own directory and the package from src/.
+    for path in (os.path.join(ROOT, "benchmarks"), os.path.join(ROOT, "src")):
+        if path not in sys.path:
+            sys.path.append(path)
+    import bench_suite
+    return bench_suite
+
+
+def report(**normalized):
+    return {"results": {name: {"normalized": value} for name, value in normalized.items()}}
+
+
+def test_compare_flags_regressions_and_faster_results(bench_suite):
+    baseline = report(slow=1.0, fast=1.0, steady=1.0)
+    regressions, lines = bench_suite.compare(report(slow=1.3, fast=0.7, steady=1.2, new=5.0), baseline, 0.25)
+    assert regressions == ["slow"]
+    assert [line.split()[-1] for line in lines] == ["REGRESSION", "faster", "ok", "baseline)"]
+    assert lines[3].startswith("new") and "(no baseline)" in lines[3]
+
+
+def test_compare_uses_per_benchmark_tolerances(bench_suite):
+    baseline = dict(report(noisy=1.0, tight=1.0), tolerances={"noisy": 0.5, "tight": 0.05})
+    regressions, lines = bench_suite.compare(report(noisy=1.4, tight=1.1), baseline, 0.25)
+    assert regressions == ["tight"]
+    assert "tolerance 50%" in lines[0] and lines[0].endswith("ok")
+
+
+def test_save_baseline_keeps_tolerances(bench_suite):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "baseline.json")
+        old = dict(report(a=2.0), tolerances={"a": 0.4})
+        bench_suite.save_baseline(path, report(a=1.0, b=3.0), old)
+        with open(path, encoding="utf-8") as f:
+            stored = json.load(f)
+        assert stored == dict(report(a=1.0, b=3.0), tolerances={"a": 0.4})
+        assert bench_suite.save_baseline(path, report(a=1.0))["tolerances"] == {}
@@ -0,0 +1,83 @@
+import ipaddress
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.bpffilter import coarsen, compile_filter, prefix_instructions
+from src.nids_configurator.cidrset import CIDRSet
+
+NETWORK = {
+    "ipv4_home_nets": ["10.0.0.0/8", "192.168.0.0/16"],
+    "ipv4_excluded_nets": ["10.2.0.0/16", "10.3.0.0/16", "10.1.5.7", "172.16.0.0/12"],
+    "ipv6_home_nets": ["2001:db8::/32"],
+    "ipv6_excluded_nets": [],
+}
+
+
+def test_excluded_networks_are_merged_into_one_expression():
+    capture_filter = compile_filter(NETWORK)
+    assert capture_filter.expression == "not (net 10.1.5.7/32 or net 10.2.0.0/15 or net 172.16.0.0/12)"
+    assert capture_filter.instructions == 2 + 2 + 4 + 6 + 6
+    assert capture_filter.left_to_engine == 0
+
+
+def test_home_only_drops_excluded_space_outside_home():
+    capture_filter = compile_filter(NETWORK, home_only=True)
+    assert capture_filter.expression == ("(net 10.0.0.0/8 or net 192.168.0.0/16 or net 2001:db8::/32) and "
+                                         "not (net 10.1.5.7/32 or net 10.2.0.0/15)")
+
+
+def test_family_without_home_networks_is_not_restricted():
+    network = dict(NETWORK, ipv6_home_nets=[])
+    expression = compile_filter(network, home_only=True).expression
+    assert expression.startswith("(net 10.0.0.0/8 or net 192.168.0.0/16 or ip6)")
+
+
+def test_no_networks_gives_no_filter():
+    capture_filter = compile_filter({})
+    assert capture_filter.expression == ""
+    assert capture_filter.instructions == 0
+
+
+def test_filter_stays_under_the_instruction_limit():
+    excluded = [f"10.{i >> 8}.{i & 255}.1/32" for i in range(0, 4000, 2)]
+    home = ["10.0.0.0/8"] + [f"{i}.{j}.0.1/32" for i in range(11, 20) for j in range(0, 200, 2)]
+    network = {"ipv4_home_nets": home,
+               "ipv4_excluded_nets": excluded + ["10.200.0.0/16"]}
+    capture_filter = compile_filter(network, home_only=True, max_instructions=4096)
+    assert capture_filter.instructions <= 4096
+    assert capture_filter.widened
+    assert capture_filter.left_to_engine > 0
+    # The widest excluded prefix is kept first.
+    assert "net 10.200.0.0/16" in capture_filter.expression
+
+
+def test_home_that_does_not_fit_at_slash_8_is_left_unrestricted():
+    network = {"ipv4_home_nets": [f"{i}.0.0.1/32" for i in range(2, 224, 2)],
+               "ipv4_excluded_nets": ["4.1.0.0/16", "5.1.0.0/16"],
+               "ipv6_home_nets": ["2001:db8::/32"]}
+    capture_filter = compile_filter(network, home_only=True, max_instructions=200)
+    assert capture_filter.instructions <= 200
+    assert capture_filter.unrestricted == [4]
+    # Without an IPv4 home match the excluded space outside home is still dropped.
+    assert capture_filter.expression == "(net 2001:db8::/32 or ip) and not (net 4.1.0.0/16 or net 5.1.0.0/16)"
+    assert any("IPv4 traffic is not restricted" in line for line in capture_filter.report())
+
+
+def test_coarsen_returns_a_superset():
+    cidr_set = CIDRSet.from_cidrs(["10.0.0.1/32", "10.0.1.0/24"], 4)
+    widened = coarsen(cidr_set, 16)
+    assert widened.to_cidrs() == ["10.0.0.0/16"]
+    assert int(ipaddress.ip_address("10.0.0.1")) in widened
+
+
+def test_prefix_instructions():
+    assert prefix_instructions(4, 32) == 4
+    assert prefix_instructions(4, 24) == 6
+    assert prefix_instructions(6, 64) == 8
+    assert prefix_instructions(6, 48) == 10
+
+
+def test_configurator_writes_capture_filter():
+    configurator = NIDSConfigurator(non_interactive=True, capture_filter=True)
+    configurator.config["network"].update(NETWORK)
+    configurator.build_capture_filter()
+    assert configurator.config["network"]["capture_filter"].startswith("not (net 10.1.5.7/32")
@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+import pytest
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.changes import (
+    canonical_digest, diff_sections, format_diff, load_config_yaml, write_if_changed
+)
+
+
+@pytest.fixture
+def config():
+    return NIDSConfigurator().default_config()
+
+
+@pytest.fixture
+def path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield os.path.join(tmpdir, "nids-config.yml")
+
+
+def test_canonical_digest_ignores_key_order(config):
+    reordered = {section: dict(reversed(list(values.items()))) for section, values in reversed(list(config.items()))}
+    assert canonical_digest(reordered) == canonical_digest(config)
+
+
+def test_canonical_digest_changes_with_content(config):
+    before = canonical_digest(config)
+    config["network"]["interfaces"] = ["eth0"]
+    assert canonical_digest(config) != before
+
+
+def test_diff_sections_reports_changed_added_and_removed(config):
+    new = {section: dict(values) for section, values in config.items()}
+    new["network"]["interfaces"] = ["eth1"]
+    new["performance"] = {"workers": 4}
+    del new["logging"]
+    diff = diff_sections(config, new)
+    assert diff == {
+        "network": {"status": "changed", "keys": ["interfaces"]},
+        "performance": {"status": "added", "keys": ["workers"]},
+        "logging": {"status": "removed", "keys": []},
+    }
+    assert "  network: changed (interfaces)" in format_diff(diff)
+
+
+def test_write_if_changed_skips_identical_config(config, path):
+    assert write_if_changed(path, config)[0] is True
+    mtime = os.stat(path).st_mtime_ns
+    changed, diff = write_if_changed(path, config)
+    assert changed is False
+    assert diff == {}
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_write_if_changed_rewrites_and_diffs_modified_config(config, path):
+    write_if_changed(path, config)
+    config["general"]["nids_name"] = "Other"
+    changed, diff = write_if_changed(path, config)
+    assert changed is True
+    assert diff == {"general": {"status": "changed", "keys": ["nids_name"]}}
+    assert load_config_yaml(path)["general"]["nids_name"] == "Other"
+
+
+def test_load_config_yaml_treats_broken_file_as_missing(path):
+    with open(path, "w") as f:
+        f.write("general: [unclosed\n")
+    assert load_config_yaml(path) is None
@@ -0,0 +1,93 @@
+import gzip
+import io
+import os
+import tempfile
+
+import pytest
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.cidrimport import MAX_REPORTED, guess_format, import_networks
+
+DROP_LIST = """; Spamhaus DROP List 2026/10/17
+1.10.16.0/20 ; SBL256894
+1.10.24.0/21 ; SBL256894
+1.19.0.0/16 ; SBL434604
+
+# duplicates and contained prefixes collapse
+1.19.4.0/24
+not-a-network
+2001:db8::/32
+2001:db8:1::/48
+10.0.0.300/8
+"""
+
+
+@pytest.fixture
+def feed_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield tmpdir
+
+
+def _write(path, text, compress=False):
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def test_text_feed_is_merged_and_bad_lines_have_numbers(feed_dir):
+    path = _write(os.path.join(feed_dir, "drop.txt"), DROP_LIST)
+    result = import_networks([path])
+    assert result.networks(4).to_cidrs() == ["1.10.16.0/20", "1.19.0.0/16"]
+    assert result.networks(6).to_cidrs() == ["2001:db8::/32"]
+    assert result.prefixes == 6
+    assert result.bad_lines == [(path, 8, "not-a-network"), (path, 11, "10.0.0.300/8")]
+    assert result.report()[0] == "Imported 6 prefixes from 8 entries: 2 IPv4 and 1 IPv6 ranges after merging"
+
+
+def test_gzip_is_detected_by_content(feed_dir):
+    path = _write(os.path.join(feed_dir, "drop.feed"), DROP_LIST, compress=True)
+    assert len(import_networks([path]).networks(4)) == 2
+
+
+def test_small_chunks_give_the_same_result(feed_dir):
+    path = _write(os.path.join(feed_dir, "drop.txt"), DROP_LIST)
+    assert import_networks([path], chunk_size=2).bad_lines == import_networks([path]).bad_lines
+    assert import_networks([path], chunk_size=2).networks(4) == import_networks([path]).networks(4)
+
+
+def test_csv_column_by_header_name(feed_dir):
+    path = _write(os.path.join(feed_dir, "feed.csv.gz"),
+                  "id,network,comment\n1,192.0.2.0/25,a\n2,192.0.2.128/25,\"multi\nline\"\n3,,missing\n",
+                  compress=True)
+    assert guess_format(path) == "csv"
+    result = import_networks([path], column="network")
+    assert result.networks(4).to_cidrs() == ["192.0.2.0/24"]
+    assert result.bad_lines == [(path, 5, "")]
+    with pytest.raises(ValueError):
+        import_networks([path], column="prefix")
+
+
+def test_many_bad_lines_are_summarised(feed_dir):
+    path = _write(os.path.join(feed_dir, "junk.txt"), "junk\n" * 50)
+    result = import_networks([path])
+    assert result.bad == 50
+    assert len(result.bad_lines) == MAX_REPORTED
+    assert result.report()[-1] == f"  ... and {50 - MAX_REPORTED} more bad lines"
+
+
+def test_stdin_source(monkeypatch):
+    stdin = io.TextIOWrapper(io.BytesIO(gzip.compress(b"198.51.100.0/24\n198.51.100.7\n")))
+    monkeypatch.setattr("sys.stdin", stdin)
+    assert import_networks(["-"]).networks(4).to_cidrs() == ["198.51.100.0/24"]
+
+
+def test_configurator_merges_imports_into_the_lists(feed_dir):
+    path = _write(os.path.join(feed_dir, "drop.txt"), DROP_LIST)
+    configurator = NIDSConfigurator(non_interactive=True, import_excluded=[path])
+    configurator.config["network"]["ipv4_excluded_nets"] = ["1.19.0.0/17", "203.0.113.0/24"]
+    configurator.import_network_lists()
+    network = configurator.config["network"]
+    assert network["ipv4_excluded_nets"] == ["1.10.16.0/20", "1.19.0.0/16", "203.0.113.0/24"]
+    assert network["ipv6_excluded_nets"] == ["2001:db8::/32"]
+    assert network["ipv4_home_nets"] == []
@@ -0,0 +1,83 @@
+import ipaddress
+import random
+
+import pytest
+
+from src.nids_configurator.cidrset import CIDRSet, compact_network_config, parse_cidr
+
+
+def test_parse_cidr_masks_host_bits():
+    assert parse_cidr("192.168.1.77/24", 4) == (0xC0A80100, 0xC0A801FF)
+
+
+def test_parse_cidr_accepts_bare_addresses_and_netmasks():
+    assert parse_cidr("10.0.0.1", 4) == (0x0A000001, 0x0A000001)
+    assert parse_cidr("10.0.0.0/255.0.0.0", 4) == parse_cidr("10.0.0.0/8", 4)
+    assert parse_cidr("2001:db8::/32", 6)[0] == int(ipaddress.IPv6Address("2001:db8::"))
+
+
+@pytest.mark.parametrize("cidr, ip_version", [
+    ("10.0.0.0/33", 4), ("10.0.0.0/-1", 4), ("300.0.0.0/8", 4), ("2001:db8::/32", 4), ("10.0.0.0/8", 6),
+])
+def test_parse_cidr_rejects_invalid_networks(cidr, ip_version):
+    with pytest.raises(ValueError):
+        parse_cidr(cidr, ip_version)
+
+
+def test_cidrset_merges_duplicates_overlaps_and_adjacent_prefixes():
+    cidrs = ["10.0.0.0/24", "10.0.1.0/24", "10.0.0.128/25", "10.0.0.0/24", "192.168.0.0/16"]
+    assert CIDRSet.from_cidrs(cidrs, 4).to_cidrs() == ["10.0.0.0/23", "192.168.0.0/16"]
+
+
+def test_cidrset_difference_emits_minimal_prefixes():
+    home = CIDRSet.from_cidrs(["10.0.0.0/8"], 4)
+    excluded = CIDRSet.from_cidrs(["10.0.0.0/9"], 4)
+    assert home.difference(excluded).to_cidrs() == ["10.128.0.0/9"]
+
+
+def test_cidrset_matches_ipaddress_on_random_input():
+    rng = random.Random(7)
+    nets = [f"10.{rng.randrange(256)}.{rng.randrange(256)}.0/{rng.randrange(16, 29)}" for _ in range(500)]
+    excl = [f"10.{rng.randrange(256)}.0.0/{rng.randrange(18, 25)}" for _ in range(50)]
+    home = CIDRSet.from_cidrs(nets, 4)
+    expected = list(ipaddress.collapse_addresses(ipaddress.ip_network(n, strict=False) for n in nets))
+    assert home.to_cidrs() == [str(n) for n in expected]
+
+    remaining = home.difference(CIDRSet.from_cidrs(excl, 4))
+    for _ in range(2000):
+        addr = ipaddress.IPv4Address(0x0A000000 + rng.randrange(1 << 24))
+        in_home = any(addr in n for n in expected)
+        in_excl = any(addr in ipaddress.ip_network(n, strict=False) for n in excl)
+        assert (int(addr) in remaining) == (in_home and not in_excl)
+
+
+def test_cidrset_intersection_and_membership_ipv6():
+    a = CIDRSet.from_cidrs(["2001:db8::/32"], 6)
+    b = CIDRSet.from_cidrs(["2001:db8:1::/48", "2001:dead::/32"], 6)
+    assert a.intersection(b).to_cidrs() == ["2001:db8:1::/48"]
+    assert int(ipaddress.IPv6Address("2001:db8:ffff::1")) in a
+    assert int(ipaddress.IPv6Address("2001:dead::1")) not in a
+
+
+def test_cidrset_collects_errors_when_requested():
+    errors = []
+    cidrs = CIDRSet.from_cidrs(["10.0.0.0/8", "bogus"], 4, errors=errors)
+    assert cidrs.to_cidrs() == ["10.0.0.0/8"]
+    assert errors == ["bogus"]
+
+
+def test_compact_network_config_rewrites_lists_and_flags_conflicts():
+    network = {
+        "interfaces": ["eth0"],
+        "ipv4_home_nets": ["10.0.0.0/24", "10.0.1.0/24", "10.0.0.0/24", "172.16.5.0/24"],
+        "ipv4_excluded_nets": ["172.16.0.0/16", "192.168.0.0/16"],
+        "ipv6_home_nets": ["2001:db8::/32"],
+        "ipv6_excluded_nets": ["bad::net::"],
+    }
+    conflicts = compact_network_config(network)
+    assert network["ipv4_home_nets"] == ["10.0.0.0/23", "172.16.5.0/24"]
+    assert network["ipv4_effective_home_nets"] == ["10.0.0.0/23"]
+    assert network["ipv6_effective_home_nets"] == ["2001:db8::/32"]
+    assert any("172.16.5.0/24" in c and "covered" in c for c in conflicts)
+    assert any("192.168.0.0/16" in c and "outside" in c for c in conflicts)
+    assert any("bad::net::" in c for c in conflicts)
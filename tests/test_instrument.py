@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+from src.nids_configurator.__main__ import main
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.instrument import NULL_STAGE, Recorder, format_prometheus
+
+
+@pytest.fixture
+def tmpdir():
+    with tempfile.TemporaryDirectory() as path:
+        yield path
+
+
+def test_disabled_stages_share_the_null_stage():
+    configurator = NIDSConfigurator()
+    assert configurator.stage("configure_network") is NULL_STAGE
+    assert configurator.run_stage("x", lambda: 42, items=lambda: pytest.fail("counted while disabled")) == 42
+
+
+def test_repeated_stages_are_summed():
+    recorder = Recorder()
+    configurator = NIDSConfigurator(metrics=recorder)
+    configurator.validate_cidr_list(["10.0.0.0/8", "bad"], 4)
+    configurator.validate_cidr_list(["2001:db8::/32"], 6)
+    stage = recorder.stages["validate_cidr_list"]
+    assert stage["calls"] == 2
+    assert stage["items"] == 3
+    assert stage["wall_seconds"] > 0
+    assert stage["peak_rss_bytes"] > 0
+
+
+def test_prometheus_format_escapes_labels():
+    recorder = Recorder()
+    recorder.add("save_config_yaml", 0.5, 0.25, 1 << 20, 0, items=450)
+    recorder.set("config_bytes", 450)
+    text = format_prometheus(recorder.report({"nids_name": 'edge "1"\\'}, exit_code=3))
+    labels = 'nids_name="edge \\"1\\"\\\\"'
+    assert f"nids_configurator_exit_code{{{labels}}} 3\n" in text
+    assert f"nids_configurator_config_bytes{{{labels}}} 450\n" in text
+    assert f'nids_configurator_stage_duration_seconds{{{labels},stage="save_config_yaml"}} 0.5\n' in text
+    assert "# TYPE nids_configurator_stage_items gauge\n" in text
+    assert text.endswith("\n")
+
+
+def test_main_exports_metrics_and_profile(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    monkeypatch.setattr(sys, "argv", [
+        "nids-configurator", "--non-interactive", "--nids-name", "edge-1", "--ipv4-home", "10.0.0.0/8",
+        "--ipv4-home", "10.1.0.0/16", "--compact-networks", "--output", os.path.join(tmpdir, "nids-config.yml"),
+        "--metrics-json", "metrics.json", "--metrics-prom", "metrics.prom", "--profile", "run.prof"])
+    main()
+    with open("metrics.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["labels"] == {"nids_name": "edge-1"}
+    assert report["exit_code"] == 0
+    assert {"os_detect", "configure_network", "process_network", "save_config_yaml"} <= set(report["stages"])
+    # Compaction folds 10.1.0.0/16 into 10.0.0.0/8 during the network stage.
+    assert report["stages"]["configure_network"]["items"] == 2
+    assert report["stages"]["process_network"]["items"] == 1
+    assert report["stages"]["save_config_yaml"]["items"] == report["gauges"]["config_bytes"] > 0
+    with open("metrics.prom", encoding="utf-8") as f:
+        assert 'nids_configurator_stage_items{nids_name="edge-1",stage="process_network"} 1\n' in f.read()
+    assert os.path.getsize("run.prof") > 0
+
+
+def test_metrics_are_written_for_failed_runs(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    monkeypatch.setattr(sys, "argv", ["nids-configurator", "--non-interactive", "--memory-budget", "1M",
+                                      "--output", os.path.join(tmpdir, "nids-config.yml"),
+                                      "--metrics-json", "metrics.json"])
+    with pytest.raises(SystemExit):
+        main()
+    with open("metrics.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["exit_code"] == 1
+    assert "estimate_engine_memory" in report["stages"]
+    assert "save_config_yaml" not in report["stages"]
+
+
+def test_watch_regenerations_record_into_the_session_metrics(tmpdir, monkeypatch):
+    from src.nids_configurator import watch
+
+    def run_watch(build, env_file, *options):
+        session = watch.WatchSession(build, env_file)
+        session.render_all()
+        session.render_all()
+        return 0
+
+    monkeypatch.setattr(watch, "run_watch", run_watch)
+    monkeypatch.chdir(tmpdir)
+    monkeypatch.setattr(sys, "argv", ["nids-configurator", "--watch", "--env-file", os.path.join(tmpdir, "env"),
+                                      "--output", os.path.join(tmpdir, "nids-config.yml"),
+                                      "--metrics-json", "metrics.json"])
+    with pytest.raises(SystemExit):
+        main()
+    with open("metrics.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["exit_code"] == 0
+    assert report["stages"]["configure_network"]["calls"] == 2
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.integrity import (
+    ChecksumManifestError, IntegrityChecker, hash_file, read_checksum_manifest, tree_digest
+)
+from src.nids_configurator.rulescan import RuleScanner
+
+FILES = {
+    "local.rules": b"alert ip any any -> any any (sid:1;)\n",
+    "et/malware.rules": b"drop tcp any any -> any 80 (sid:2;)\n",
+}
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def tree():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rules = os.path.join(tmpdir, "rules")
+        for rel, data in FILES.items():
+            path = os.path.join(rules, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        with open(os.path.join(rules, "SHA256SUMS"), "w") as f:
+            f.writelines(f"{sha256(data)}  {rel}\n" for rel, data in FILES.items())
+        yield tmpdir, rules
+
+
+def scan(tmpdir, rules):
+    return RuleScanner(os.path.join(tmpdir, "index.json")).scan([rules])
+
+
+def test_hash_file_matches_hashlib(tree):
+    _, rules = tree
+    assert hash_file(os.path.join(rules, "local.rules")) == sha256(FILES["local.rules"])
+
+
+def test_read_checksum_manifest_resolves_relative_paths(tree):
+    _, rules = tree
+    expected = read_checksum_manifest(os.path.join(rules, "SHA256SUMS"))
+    assert expected[os.path.join(rules, "et", "malware.rules")] == sha256(FILES["et/malware.rules"])
+
+
+def test_read_checksum_manifest_rejects_bad_lines(tree):
+    tmpdir, _ = tree
+    path = os.path.join(tmpdir, "bad")
+    with open(path, "w") as f:
+        f.write("abc  local.rules\n")
+    with pytest.raises(ChecksumManifestError, match=":1:"):
+        read_checksum_manifest(path)
+
+
+def test_verify_reports_mismatch_and_missing_files(tree):
+    tmpdir, rules = tree
+    expected = read_checksum_manifest(os.path.join(rules, "SHA256SUMS"))
+    expected[os.path.join(rules, "gone.rules")] = "0" * 64
+    with open(os.path.join(rules, "local.rules"), "ab") as f:
+        f.write(b"# tampered\n")
+    report = IntegrityChecker(os.path.join(tmpdir, "digests.json")).verify(scan(tmpdir, rules), expected)
+    assert report["ok"] is False
+    assert report["mismatched"] == [os.path.join(rules, "local.rules")]
+    assert report["missing"] == [os.path.join(rules, "gone.rules")]
+
+
+def test_unchanged_files_are_not_hashed_again(tree):
+    tmpdir, rules = tree
+    checker = IntegrityChecker(os.path.join(tmpdir, "digests.json"))
+    first = checker.verify(scan(tmpdir, rules))
+    assert first["hashed"] == 2
+    with patch("src.nids_configurator.integrity.hash_file") as hasher:
+        second = checker.verify(scan(tmpdir, rules))
+    hasher.assert_not_called()
+    assert second["tree_digest"] == first["tree_digest"]
+
+
+def test_tree_digest_depends_on_content_and_paths():
+    assert tree_digest({"/a": "1", "/b": "2"}) == tree_digest({"/b": "2", "/a": "1"})
+    assert tree_digest({"/a": "1", "/b": "2"}) != tree_digest({"/a": "1", "/c": "2"})
+
+
+def test_configurator_records_tree_digest(tree):
+    tmpdir, rules = tree
+    configurator = NIDSConfigurator(non_interactive=True, rule_index=os.path.join(tmpdir, "index.json"),
+                                    rule_checksums=os.path.join(rules, "SHA256SUMS"))
+    configurator.config["rules"]["rule_paths"] = [rules]
+    with patch.dict(os.environ, {"NDIS_CACHE_DIR": tmpdir}):
+        report = configurator.verify_rule_integrity()
+    assert configurator.config["rules"]["rule_tree_digest"] == report["tree_digest"]
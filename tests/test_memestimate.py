@@ -0,0 +1,98 @@
+import os
+import tempfile
+
+import pytest
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.batch import render_chunk
+from src.nids_configurator.memestimate import (
+    DEFAULT_FLOWS, MIB, RULE_OVERHEAD_BYTES, count_active_rules, estimate_memory, format_estimate, parse_size
+)
+
+INVENTORY = {
+    "roots": {},
+    "files": {
+        "/rules/emerging-dns.rules": [1000, 0, 1, 300, 20],
+        "/rules/emerging-web.rules": [5000, 0, 2, 1700, 100],
+    },
+}
+
+
+def _config():
+    config = NIDSConfigurator().default_config()
+    config["network"]["interfaces"] = ["eth0"]
+    config["network"]["ipv4_home_nets"] = ["10.0.0.0/8", "192.168.0.0/16"]
+    config["network"]["ipv4_excluded_nets"] = ["10.1.0.0/16"]
+    return config
+
+
+@pytest.mark.parametrize("text, size", [
+    ("1024", 1024), ("512M", 512 * MIB), ("4G", 4 << 30), ("4GiB", 4 << 30), ("1.5k", 1536), ("100B", 100),
+])
+def test_parse_size(text, size):
+    assert parse_size(text) == size
+
+
+@pytest.mark.parametrize("text", ["", "lots", "-1G", "4X"])
+def test_parse_size_rejects_garbage(text):
+    with pytest.raises(ValueError):
+        parse_size(text)
+
+
+def test_active_rules_follow_the_rule_manifest():
+    assert count_active_rules({}, INVENTORY) == 2000
+    assert count_active_rules({"rule_files": ["/rules/emerging-dns.rules"]}, INVENTORY) == 300
+    assert count_active_rules({}, None) == 0
+
+
+def test_estimate_breaks_down_every_component():
+    estimate = estimate_memory(_config(), INVENTORY, disabled_rules=500)
+    components = estimate["components"]
+    assert estimate["rules"] == 1500
+    assert components["rules"] == 1500 * RULE_OVERHEAD_BYTES
+    assert components["pattern_matcher"] > 0
+    assert components["address_tables"] > 0
+    assert components["ring_buffers"] > 0
+    assert estimate["flows"] == DEFAULT_FLOWS
+    assert estimate["total"] == sum(components.values())
+
+
+def test_planned_rings_and_sampled_traffic_are_used():
+    config = _config()
+    config["performance"] = {
+        "workers": {"eth0": {"threads": 6}},
+        "rings": {"memory_bytes": 123 * MIB},
+        "sampled": {"eth0": {"p99_pps": 2000000}},
+    }
+    estimate = estimate_memory(config)
+    assert estimate["threads"] == 6
+    assert estimate["components"]["ring_buffers"] == 123 * MIB
+    assert estimate["flows"] == 2000000 * 60 // 20
+
+
+def test_format_estimate_lists_components_largest_first():
+    lines = format_estimate(estimate_memory(_config(), INVENTORY), budget=4 << 30)
+    assert lines[0].startswith("Estimated engine memory:")
+    assert lines[-1].split() == ["budget", "4096.0", "MiB"]
+    sizes = [float(line.split()[1]) for line in lines[1:-1]]
+    assert sizes == sorted(sizes, reverse=True)
+
+
+def test_configurator_fails_over_budget(capsys):
+    configurator = NIDSConfigurator(non_interactive=True, memory_budget=64 * MIB)
+    configurator.config = _config()
+    with pytest.raises(SystemExit) as excinfo:
+        configurator.estimate_engine_memory()
+    assert excinfo.value.code == 1
+    assert "exceeds the budget" in capsys.readouterr().out
+
+
+def test_batch_fails_only_hosts_over_budget():
+    config = _config()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rows = [(1, {"host": "small"}), (2, {"host": "big", "interfaces": "eth0,eth1,eth2"})]
+        budget = estimate_memory(config, rule_count=2000)["total"]
+        results = render_chunk(config, rows, tmpdir, memory_budget=budget, rule_count=2000)
+        assert results[0][3] is None
+        assert "exceeds the budget" in results[1][3]
+        assert os.listdir(tmpdir) == ["small.yml"]
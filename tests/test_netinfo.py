@@ -0,0 +1,75 @@
+import os
+import tempfile
+
+import pytest
+
+from src.nids_configurator.netinfo import (
+    format_interface, interface_details, read_interfaces, validate_interfaces
+)
+
+
+def write(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(f"{value}\n")
+
+
+@pytest.fixture
+def sysfs():
+    # Mimics /sys/class/net with one physical NIC, a link-down NIC and loopback.
+    with tempfile.TemporaryDirectory() as root:
+        net = os.path.join(root, "class", "net")
+        drivers = os.path.join(root, "bus", "pci", "drivers")
+        for name, driver, speed, queues, numa in (("ens1f0", "ixgbe", 10000, 8, 1), ("eno1", "igb", None, 4, -1)):
+            device = os.path.join(root, "devices", name)
+            write(os.path.join(device, "numa_node"), numa)
+            os.makedirs(os.path.join(drivers, driver))
+            os.symlink(os.path.join(drivers, driver), os.path.join(device, "driver"))
+            iface = os.path.join(net, name)
+            write(os.path.join(iface, "operstate"), "up" if speed else "down")
+            write(os.path.join(iface, "mtu"), 1500)
+            if speed:
+                write(os.path.join(iface, "speed"), speed)
+            os.symlink(device, os.path.join(iface, "device"))
+            for i in range(queues):
+                os.makedirs(os.path.join(iface, "queues", f"rx-{i}"))
+                os.makedirs(os.path.join(iface, "queues", f"tx-{i}"))
+        write(os.path.join(net, "lo", "operstate"), "unknown")
+        write(os.path.join(net, "lo", "mtu"), 65536)
+        write(os.path.join(net, "lo", "speed"), -1)
+        os.makedirs(os.path.join(net, "lo", "queues", "rx-0"))
+        yield net
+
+
+def test_read_interfaces_collects_sysfs_attributes(sysfs):
+    inventory = read_interfaces(sysfs)
+    assert sorted(inventory) == ["eno1", "ens1f0", "lo"]
+    assert inventory["ens1f0"] == {"operstate": "up", "speed_mbps": 10000, "mtu": 1500, "driver": "ixgbe",
+                                   "rx_queues": 8, "tx_queues": 8, "numa_node": 1, "virtual": False}
+    assert inventory["eno1"]["speed_mbps"] is None
+    assert inventory["eno1"]["numa_node"] is None
+    assert inventory["lo"]["virtual"] is True
+    assert inventory["lo"]["driver"] is None
+
+
+def test_missing_sysfs_gives_empty_inventory():
+    assert read_interfaces("/nonexistent/sys/class/net") == {}
+
+
+def test_validate_interfaces_suggests_close_names(sysfs):
+    inventory = read_interfaces(sysfs)
+    known, unknown = validate_interfaces(["ens1f0", "ens1f1", "wlan0"], inventory)
+    assert known == ["ens1f0"]
+    assert unknown["ens1f1"][0] == "ens1f0"
+    assert unknown["wlan0"] == []
+
+
+def test_validate_interfaces_without_inventory_accepts_everything():
+    assert validate_interfaces(["eth0"], {}) == (["eth0"], {})
+
+
+def test_interface_details_and_formatting(sysfs):
+    inventory = read_interfaces(sysfs)
+    assert interface_details(["ens1f0", "missing"], inventory) == {
+        "ens1f0": {"speed_mbps": 10000, "rx_queues": 8, "tx_queues": 8, "numa_node": 1, "mtu": 1500}}
+    assert format_interface("lo", inventory["lo"]) == "lo (unknown, speed unknown, virtual, 1 rx / 0 tx queues)"
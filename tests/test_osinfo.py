@@ -1,7 +1,12 @@
 # import pytest
 # from unittest.mock import patch, mock_open, MagicMock
+import os
+import tempfile
 from unittest.mock import patch, mock_open
-from src.nids_configurator.osinfo import OSInfo
+
+import pytest
+
+from src.nids_configurator.osinfo import OSInfo, load_capabilities, parse_kernel_version, probe_capabilities
 
 
 def test_detects_non_linux_system():
@@ -178,3 +183,70 @@ PRETTY_NAME="Fedora Linux 34"
             patch('builtins.open', mock_open(read_data=os_release_content)):
         os_info = OSInfo()
         assert os_info.family == 'redhat'
+
+
+def write(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(f"{value}\n")
+
+
+@pytest.fixture
+def fake_root():
+    # Minimal /proc and /sys of a modern kernel with AF_PACKET, bpffs and 2 MB hugepages.
+    with tempfile.TemporaryDirectory() as root:
+        proc = os.path.join(root, "proc")
+        sys_root = os.path.join(root, "sys")
+        write(os.path.join(proc, "net", "packet"), "sk RefCnt Type Proto Iface R Rmem User Inode")
+        write(os.path.join(proc, "sys", "net", "core", "rmem_max"), 212992)
+        write(os.path.join(proc, "sys", "net", "core", "netdev_max_backlog"), 1000)
+        write(os.path.join(proc, "sys", "net", "core", "bpf_jit_enable"), 1)
+        write(os.path.join(proc, "sys", "kernel", "random", "boot_id"), "11111111-2222-3333-4444-555555555555")
+        write(os.path.join(proc, "meminfo"), "MemTotal: 16384000 kB\nHugePages_Total: 512\nHugePages_Free: 500\n"
+                                             "Hugepagesize: 2048 kB")
+        os.makedirs(os.path.join(sys_root, "fs", "bpf"))
+        os.makedirs(os.path.join(sys_root, "kernel", "mm", "hugepages", "hugepages-2048kB"))
+        os.makedirs(os.path.join(sys_root, "kernel", "mm", "hugepages", "hugepages-1048576kB"))
+        yield proc, sys_root
+
+
+def test_parse_kernel_version():
+    assert parse_kernel_version("5.14.0-362.el9.x86_64") == (5, 14, 0)
+    assert parse_kernel_version("3.10.0-1160.el7.x86_64") == (3, 10, 0)
+    assert parse_kernel_version("6.1") == (6, 1, 0)
+    assert parse_kernel_version("6.8.0rc1+") == (6, 8, 0)
+
+
+def test_probe_prefers_af_xdp_on_modern_kernels(fake_root):
+    proc, sys_root = fake_root
+    capabilities = probe_capabilities("6.8.0-45-generic", proc, sys_root)
+    assert capabilities["capture_methods"] == ["af_xdp", "af_packet_v3", "af_packet_v2", "pcap"]
+    assert capabilities["net_core"] == {"rmem_max": 212992, "netdev_max_backlog": 1000, "bpf_jit_enable": 1}
+    assert capabilities["hugepages"] == {"total": 512, "free": 500, "size_kb": 2048, "sizes_kb": [2048, 1048576]}
+
+
+def test_probe_falls_back_to_tpacket_v3_on_old_kernels(fake_root):
+    proc, sys_root = fake_root
+    capabilities = probe_capabilities("3.10.0-1160.el7.x86_64", proc, sys_root)
+    assert capabilities["xdp"] is False
+    assert capabilities["capture_methods"][0] == "af_packet_v3"
+
+
+def test_probe_without_af_packet_only_offers_pcap(fake_root):
+    proc, sys_root = fake_root
+    os.remove(os.path.join(proc, "net", "packet"))
+    os.remove(os.path.join(proc, "sys", "net", "core", "bpf_jit_enable"))
+    assert probe_capabilities("5.15.0", proc, sys_root)["capture_methods"] == ["pcap"]
+
+
+def test_capabilities_are_cached_per_boot(fake_root):
+    proc, sys_root = fake_root
+    with tempfile.TemporaryDirectory() as cache, patch.dict(os.environ, {"NDIS_CACHE_DIR": cache}):
+        first = load_capabilities("6.8.0", proc, sys_root)
+        with patch("src.nids_configurator.osinfo.probe_capabilities") as probe:
+            assert load_capabilities("6.8.0", proc, sys_root) == first
+            probe.assert_not_called()
+        write(os.path.join(proc, "sys", "kernel", "random", "boot_id"), "after-reboot")
+        with patch("src.nids_configurator.osinfo.probe_capabilities", return_value=first) as probe:
+            load_capabilities("6.8.0", proc, sys_root)
+            probe.assert_called_once()
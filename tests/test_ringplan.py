@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+import pytest
+
+from src.nids_configurator.__main__ import configurator_from_argv
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.ringplan import DEFAULT_BURST_MS, plan_ring, plan_rings, read_meminfo
+
+GIB = 1 << 30
+MEMINFO = {"MemTotal": 64 * GIB, "MemAvailable": 48 * GIB}
+
+
+def test_ring_holds_the_burst_at_line_rate():
+    ring = plan_ring(10000, 8, 100)
+    # 10 Gb/s for 100 ms is 125 MB, split over 8 threads.
+    assert ring["ring_bytes"] * 8 >= 125000000
+    assert ring["block_size"] == 1 << 18
+    assert ring["ring_bytes"] == ring["block_size"] * ring["blocks"]
+    assert ring["memory_bytes"] == ring["ring_bytes"] * 8
+
+
+def test_small_links_keep_minimum_block_size_and_count():
+    ring = plan_ring(100, 4, 10)
+    assert ring["block_size"] == 1 << 16
+    assert ring["blocks"] == 8
+
+
+def test_plan_rings_totals_and_defaults_unknown_speed():
+    section, warnings = plan_rings({"ens1f0": {"speed_mbps": 25000, "threads": 8},
+                                    "eno1": {"speed_mbps": None, "threads": None}}, MEMINFO)
+    assert section["memory_bytes"] == sum(r["memory_bytes"] for r in section["interfaces"].values())
+    assert section["interfaces"]["eno1"]["threads"] == 1
+    assert warnings == ["interface eno1: link speed unknown, sizing for 1000 Mb/s"]
+
+
+def test_plan_rings_warns_above_ram_fraction():
+    meminfo = {"MemTotal": GIB, "MemAvailable": GIB // 2}
+    _, warnings = plan_rings({"ens1f0": {"speed_mbps": 100000, "threads": 16}}, meminfo, burst_ms=200,
+                             max_ram_fraction=0.25)
+    assert any("more than 25% of RAM" in message for message in warnings)
+    assert any("are available" in message for message in warnings)
+
+
+@pytest.fixture
+def meminfo_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "meminfo")
+        with open(path, "w") as f:
+            f.write("MemTotal:       65536000 kB\nMemAvailable:   32768000 kB\nHugePages_Total:       0\n")
+        yield path
+
+
+def test_read_meminfo_returns_bytes(meminfo_file):
+    meminfo = read_meminfo(meminfo_file)
+    assert meminfo["MemTotal"] == 65536000 * 1024
+    assert meminfo["HugePages_Total"] == 0
+
+
+def test_configurator_uses_worker_threads_for_rings(meminfo_file):
+    configurator = NIDSConfigurator(non_interactive=True, burst_ms=50)
+    configurator.config["network"]["interfaces"] = ["eth0"]
+    configurator.config["network"]["interface_details"] = {"eth0": {"speed_mbps": 10000, "rx_queues": 16}}
+    configurator.config["performance"] = {"workers": {"eth0": {"threads": 4}}}
+    section = configurator.plan_capture_rings(meminfo_file)
+    assert section["burst_ms"] == 50
+    assert section["interfaces"]["eth0"]["threads"] == 4
+    assert configurator.config["performance"]["rings"] is section
+
+
+@pytest.mark.parametrize("argv, env", [
+    (["--burst-ms", "0"], {}),
+    (["--max-ring-ram", "-0.5"], {}),
+    ([], {"NDIS_BURST_MS": "0"}),
+    ([], {"NDIS_MAX_RING_RAM": "none"}),
+])
+def test_parser_rejects_non_positive_ring_options(argv, env, monkeypatch):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    with pytest.raises(SystemExit):
+        configurator_from_argv(["--non-interactive"] + argv)
+
+
+def test_parser_defaults_and_explicit_ring_options(monkeypatch):
+    monkeypatch.setenv("NDIS_MAX_RING_RAM", "0.5")
+    configurator, _args = configurator_from_argv(["--burst-ms", "20"])
+    assert (configurator.burst_ms, configurator.max_ring_ram) == (20, 0.5)
+    configurator, _args = configurator_from_argv([])
+    assert configurator.burst_ms == DEFAULT_BURST_MS
@@ -0,0 +1,123 @@
+import os
+import tempfile
+
+import pytest
+
+from src.nids_configurator.__main__ import configurator_from_argv
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.ruleprune import (
+    AddressExpressionError, AddressResolver, AddressSpace, RulePruner, content_bytes, split_header
+)
+
+NETWORK = {
+    "ipv4_home_nets": ["10.0.0.0/8"],
+    "ipv4_excluded_nets": ["10.99.0.0/16", "192.0.2.0/24"],
+    "ipv6_home_nets": [],
+    "ipv6_excluded_nets": [],
+}
+
+RULES = """\
+alert tcp $EXTERNAL_NET any -> $HOME_NET 22 (msg:"live"; content:"SSH-"; sid:1;)
+alert ip 192.0.2.10 any -> any any (msg:"excluded source"; sid:2;)
+alert tcp any any -> [10.99.1.1,10.99.2.0/24] 80 (msg:"excluded group"; sid:3;)
+alert udp [172.16.0.0/12,!172.16.5.0/24] any <> 198.51.100.0/24 53 (msg:"outside home"; sid:4;)
+# alert ip 192.0.2.10 any -> any any (msg:"commented out"; sid:5;)
+alert http $HTTP_SERVERS any -> $EXTERNAL_NET any (msg:"servers var"; sid:6;)
+alert ip [2001:db8::/32] any -> any any (msg:"v6 literal"; sid:7;)
+"""
+
+
+def resolver(variables=None):
+    return AddressResolver(AddressSpace.from_cidrs(["10.0.0.0/8"]), variables)
+
+
+def test_split_header_keeps_groups_with_spaces():
+    fields = split_header('alert tcp [1.1.1.1, 2.2.2.2] any -> $HOME_NET 80 (msg:"x (y)"; sid:1;)')
+    assert fields == ["alert", "tcp", "[1.1.1.1, 2.2.2.2]", "any", "->", "$HOME_NET", "80"]
+
+
+def test_resolver_handles_groups_and_negation():
+    space = resolver().resolve("[10.0.0.0/8,!10.1.0.0/16]")
+    assert space.v4.to_cidrs()[:2] == ["10.0.0.0/16", "10.2.0.0/15"]
+    assert not space.v6
+    external = resolver({"EXTERNAL_NET": "!$HOME_NET"}).resolve("$EXTERNAL_NET")
+    assert not external.v4.intersection(space.v4)
+    assert external.v6.address_count() == 1 << 128
+
+
+@pytest.mark.parametrize("expression, v4_count", [
+    ("$EXTERNAL_NET", 1 << 32), ("$HTTP_SERVERS", 1 << 32), ("!$DNS_SERVERS", 1 << 32),
+    ("[10.0.0.0/8,!$SMTP]", 1 << 24),
+])
+def test_undefined_variables_resolve_to_a_superset(expression, v4_count):
+    # Negating or subtracting an undefined variable must not shrink the space.
+    assert resolver().resolve(expression).v4.address_count() == v4_count
+    assert AddressResolver(None).resolve("!$HOME_NET").v4.address_count() == 1 << 32
+
+
+def test_self_referencing_variables_are_rejected():
+    with pytest.raises(AddressExpressionError):
+        resolver({"A": "[$B]", "B": "!$A"}).resolve("$A")
+
+
+def test_resolver_rejects_invalid_addresses():
+    with pytest.raises(AddressExpressionError):
+        resolver().resolve("[10.0.0.300]")
+
+
+def test_content_bytes_counts_hex_blocks():
+    assert content_bytes('content:"GET "; content:"|0d 0a|Host|3a|"; sid:1;') == 4 + 2 + 4 + 1
+
+
+@pytest.fixture
+def rule_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "local.rules")
+        with open(path, "w") as f:
+            f.write(RULES)
+        yield tmpdir, path
+
+
+def test_prune_finds_rules_limited_to_excluded_networks(rule_file):
+    _, path = rule_file
+    report = RulePruner(NETWORK).prune([path])
+    assert report["checked"] == 6
+    assert sorted(sid for sid, _ in report["dead"]) == [2, 3]
+    assert report["memory_saved"] > 0
+
+
+def test_home_only_capture_also_prunes_rules_outside_home(rule_file):
+    _, path = rule_file
+    report = RulePruner(NETWORK, home_only=True).prune([path])
+    # sid 7 stays: IPv6 has no home networks, so IPv6 traffic is not restricted.
+    assert sorted(sid for sid, _ in report["dead"]) == [2, 3, 4]
+
+
+def test_defined_variables_can_prove_rules_dead(rule_file):
+    _, path = rule_file
+    report = RulePruner(NETWORK, variables={"HTTP_SERVERS": "192.0.2.0/25"}).prune([path])
+    assert sorted(sid for sid, _ in report["dead"]) == [2, 3, 6]
+    report = RulePruner(NETWORK, home_only=True, variables={"EXTERNAL_NET": "!$HOME_NET"}).prune([path])
+    assert sorted(sid for sid, _ in report["dead"]) == [2, 3, 4]
+
+
+def test_rule_vars_from_cli_and_env(monkeypatch):
+    monkeypatch.setenv("NDIS_RULE_VARS", "DNS_SERVERS=[10.0.0.53,10.0.1.53];SMTP=10.0.0.25")
+    configurator, _args = configurator_from_argv(["--rule-var", "$EXTERNAL_NET=!$HOME_NET"])
+    assert configurator.rule_vars == {"DNS_SERVERS": "[10.0.0.53,10.0.1.53]", "SMTP": "10.0.0.25",
+                                      "EXTERNAL_NET": "!$HOME_NET"}
+    monkeypatch.delenv("NDIS_RULE_VARS")
+    with pytest.raises(SystemExit):
+        configurator_from_argv(["--rule-var", "EXTERNAL_NET"])
+
+
+def test_configurator_writes_disable_list(rule_file):
+    tmpdir, path = rule_file
+    configurator = NIDSConfigurator(non_interactive=True, prune_rules=True)
+    configurator.config["network"].update(NETWORK)
+    configurator.config["rules"]["rule_files"] = [path]
+    configurator.prune_dead_rules(os.path.join(tmpdir, "nids-config.yml"))
+    disable_conf = configurator.config["rules"]["disabled_sids_file"]
+    assert disable_conf == os.path.join(tmpdir, "nids-config.disable.conf")
+    with open(disable_conf) as f:
+        assert [line for line in f.read().splitlines() if not line.startswith("#")] == ["2", "3"]
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from src.nids_configurator.rulescan import RuleScanner, count_rules, format_inventory
+
+RULES = """# Emerging threats sample
+alert tcp any any -> $HOME_NET 22 (msg:"ssh"; sid:1; rev:1;)
+# alert tcp any any -> $HOME_NET 23 (msg:"telnet"; sid:2; rev:1;)
+
+drop udp any any -> any 53 (msg:"dns"; sid:3; rev:2;)
+"""
+
+
+@pytest.fixture
+def tree():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rules = os.path.join(tmpdir, "rules")
+        os.makedirs(os.path.join(rules, "et", "deep"))
+        for rel in ("local.rules", "et/malware.rules", "et/deep/scan.rules"):
+            with open(os.path.join(rules, rel), "w") as f:
+                f.write(RULES)
+        with open(os.path.join(rules, "README.txt"), "w") as f:
+            f.write("not a rule file\n")
+        yield tmpdir, rules
+
+
+def test_count_rules_separates_active_and_commented_rules(tree):
+    _, rules = tree
+    assert count_rules(os.path.join(rules, "local.rules")) == (2, 1)
+
+
+def test_scan_reports_counts_per_path(tree):
+    tmpdir, rules = tree
+    scanner = RuleScanner(os.path.join(tmpdir, "index.json"), workers=4)
+    inventory = scanner.scan([rules, os.path.join(tmpdir, "missing")])
+    summary = inventory["roots"][rules]
+    assert (summary["files"], summary["rules"], summary["disabled"], summary["rescanned"]) == (3, 6, 3, 3)
+    assert inventory["roots"][os.path.join(tmpdir, "missing")]["exists"] is False
+    assert len(inventory["files"]) == 3
+    assert format_inventory(inventory)[1].endswith("missing")
+
+
+def test_rescan_only_reads_changed_files(tree):
+    tmpdir, rules = tree
+    index = os.path.join(tmpdir, "index.json")
+    RuleScanner(index).scan([rules])
+    changed = os.path.join(rules, "et", "malware.rules")
+    with open(changed, "a") as f:
+        f.write("alert ip any any -> any any (sid:4;)\n")
+
+    with patch("src.nids_configurator.rulescan.count_rules", wraps=count_rules) as counter:
+        inventory = RuleScanner(index).scan([rules])
+    assert [call.args[0] for call in counter.call_args_list] == [changed]
+    assert inventory["roots"][rules]["rescanned"] == 1
+    assert inventory["roots"][rules]["rules"] == 7
+
+
+def test_scan_keeps_index_entries_of_other_paths(tree):
+    tmpdir, rules = tree
+    index = os.path.join(tmpdir, "index.json")
+    scanner = RuleScanner(index)
+    scanner.scan([rules])
+    other = os.path.join(tmpdir, "other")
+    os.makedirs(other)
+    scanner.scan([other])
+    with patch("src.nids_configurator.rulescan.count_rules", wraps=count_rules) as counter:
+        scanner.scan([rules])
+    assert counter.call_count == 0
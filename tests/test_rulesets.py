@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+import pytest
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.rulescan import RuleScanner
+from src.nids_configurator.rulesets import RuleSetError, RuleSetIndex, rule_set_names
+
+RULE = 'alert tcp any any -> $HOME_NET 22 (msg:"ssh"; sid:1; rev:1;)\n'
+FILES = ("local.rules", "et/open/malware.rules", "et/open/scan.rules", "et/pro/malware.rules")
+
+
+@pytest.fixture
+def tree():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rules = os.path.join(tmpdir, "rules")
+        for rel in FILES:
+            path = os.path.join(rules, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(RULE)
+        inventory = RuleScanner(os.path.join(tmpdir, "index.json")).scan([rules])
+        yield tmpdir, rules, inventory
+
+
+def test_rule_set_names_cover_stem_directories_and_relative_path():
+    names = rule_set_names("/r", "/r/et/open/malware.rules")
+    assert names == {"malware", "et", "et/open", "et/open/malware"}
+
+
+def test_resolve_enabled_minus_disabled(tree):
+    _, rules, inventory = tree
+    index = RuleSetIndex.from_inventory(inventory)
+    files = index.resolve(["et", "local"], ["et/pro/malware"])
+    assert files == [os.path.join(rules, rel) for rel in ("et/open/malware.rules", "et/open/scan.rules",
+                                                          "local.rules")]
+
+
+def test_resolve_without_enabled_sets_selects_everything(tree):
+    _, _, inventory = tree
+    index = RuleSetIndex.from_inventory(inventory)
+    assert len(index.resolve([], ["malware"])) == 2
+
+
+def test_unknown_rule_set_is_rejected_with_suggestions(tree):
+    _, _, inventory = tree
+    index = RuleSetIndex.from_inventory(inventory)
+    with pytest.raises(RuleSetError) as exc:
+        index.resolve(["malwar"], ["nothing-like-this"])
+    assert exc.value.unknown["malwar"][0] == "malware"
+    assert exc.value.unknown["nothing-like-this"] == []
+    assert "did you mean: malware" in str(exc.value)
+
+
+def test_configurator_writes_rule_manifest(tree):
+    tmpdir, rules, _ = tree
+    configurator = NIDSConfigurator(non_interactive=True, rule_index=os.path.join(tmpdir, "index.json"),
+                                    rule_manifest=True)
+    configurator.config["rules"].update(rule_paths=[rules], enabled_rule_sets=["scan"])
+    configurator.resolve_rule_sets()
+    assert configurator.config["rules"]["rule_files"] == [os.path.join(rules, "et/open/scan.rules")]
+
+
+def test_configurator_exits_on_unknown_rule_set(tree):
+    tmpdir, rules, _ = tree
+    configurator = NIDSConfigurator(non_interactive=True, rule_index=os.path.join(tmpdir, "index.json"))
+    configurator.config["rules"].update(rule_paths=[rules], enabled_rule_sets=["emerging"])
+    with pytest.raises(SystemExit):
+        configurator.resolve_rule_sets()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from src.nids_configurator.rulestore import (
+    RuleStore, RuleStoreError, build_store, parse_rules, store_path_for
+)
+
+RULES = b"""# local rules
+alert tcp any any -> $HOME_NET 22 (msg:"ssh"; sid:1000001; rev:3;)
+# drop udp any any -> any 53 (msg:"dns"; sid:1000002; rev:1;)
+alert http any any -> any any (msg:"multi"; \\
+    content:"x"; sid:1000003;)
+pass ip any any -> any any (msg:"no sid";)
+"""
+
+
+@pytest.fixture
+def tmpdir():
+    with tempfile.TemporaryDirectory() as path:
+        yield path
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def test_store_path_sits_next_to_config():
+    assert store_path_for("/etc/nids/nids-config.yml") == "/etc/nids/nids-config.rulestore"
+
+
+def test_parse_rules_reads_fields_and_commented_out_rules():
+    rules = parse_rules(RULES)
+    assert [(sid, rev, proto, enabled) for _, sid, rev, _, _, proto, enabled in rules] == [
+        (1000001, 3, "tcp", 1), (1000002, 1, "udp", 0), (1000003, 0, "http", 1)]
+    offset, _, _, length, _, _, _ = rules[2]
+    assert RULES[offset:offset + length].endswith(b"sid:1000003;)")
+
+
+def test_store_lookups_and_rule_text(tmpdir):
+    source = write(os.path.join(tmpdir, "local.rules"), RULES)
+    other = write(os.path.join(tmpdir, "other.rules"), b"reject tcp any any -> any 80 (sid:5; rev:2;)\n")
+    path = os.path.join(tmpdir, "nids.rulestore")
+    stats = build_store(path, [source, other])
+    assert (stats["files"], stats["rules"], stats["reparsed"]) == (2, 4, 2)
+    with RuleStore(path) as store:
+        assert len(store) == 4
+        assert [store.rule(i)["sid"] for i in range(len(store))] == [5, 1000001, 1000002, 1000003]
+        [rule] = store.find(1000002)
+        assert (rule["action"], rule["proto"], rule["enabled"], rule["file"]) == ("drop", "udp", False, source)
+        assert store.find(42) == []
+        assert store.rule_text(0) == "reject tcp any any -> any 80 (sid:5; rev:2;)"
+
+
+def test_missing_files_and_out_of_range_sids_are_skipped(tmpdir, capsys):
+    rules = (b"alert tcp any any -> any 80 (sid:4294967296;)\n"
+             b"alert tcp any any -> any 80 (sid:7; rev:99999999999;)\n"
+             b"alert tcp any any -> any 80 (sid:4294967295;)\n")
+    source = write(os.path.join(tmpdir, "local.rules"), rules)
+    path = os.path.join(tmpdir, "nids.rulestore")
+    stats = build_store(path, [os.path.join(tmpdir, "deleted.rules"), source])
+    assert (stats["files"], stats["rules"]) == (1, 1)
+    out = capsys.readouterr().out
+    assert "skipping rule file" in out and "deleted.rules" in out
+    assert "skipping 2 rules" in out
+    with RuleStore(path) as store:
+        assert store.files == [source]
+        assert store.rule(0)["sid"] == 4294967295
+
+
+def test_only_changed_files_are_parsed_again(tmpdir):
+    source = write(os.path.join(tmpdir, "local.rules"), RULES)
+    other = write(os.path.join(tmpdir, "other.rules"), b"alert tcp any any -> any 80 (sid:5;)\n")
+    path = os.path.join(tmpdir, "nids.rulestore")
+    build_store(path, [source, other])
+    write(other, b"alert tcp any any -> any 80 (sid:5; rev:2;)\n")
+    with patch("src.nids_configurator.rulestore.parse_rules", wraps=parse_rules) as parser:
+        stats = build_store(path, [source, other])
+    assert parser.call_count == 1
+    assert stats["reparsed"] == 1
+    with RuleStore(path) as store:
+        assert store.find(5)[0]["rev"] == 2
+        assert store.find(1000001)[0]["rev"] == 3
+
+
+def test_corrupted_store_is_rejected(tmpdir):
+    path = os.path.join(tmpdir, "nids.rulestore")
+    build_store(path, [write(os.path.join(tmpdir, "a.rules"), RULES)])
+    with open(path, "r+b") as f:
+        f.seek(-3, os.SEEK_END)
+        f.write(b"xyz")
+    with pytest.raises(RuleStoreError):
+        RuleStore(path)
@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+import pytest
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.sampler import (
+    parse_net_dev, percentile, recommend, take_snapshots, traffic_stats
+)
+
+HEADER = (b"Inter-|   Receive                                                |  Transmit\n"
+          b" face |bytes    packets errs drop fifo frame compressed multicast|"
+          b"bytes    packets errs drop fifo colls carrier compressed\n")
+LINE = b"%6s: %d %d 0 %d 0 0 0 0 7689 56 0 0 0 0 0 0\n"
+
+
+def net_dev(eth1, veth1=(0, 0, 0)):
+    # Recorded /proc/net/dev layout with a veth whose name ends like the capture interface.
+    return HEADER + LINE % ((b"lo", 100, 2, 0)) + LINE % ((b"veth1",) + veth1) + LINE % ((b"eth1",) + eth1)
+
+
+def test_parse_net_dev_reads_only_requested_interfaces():
+    counters = parse_net_dev(net_dev((1500, 10, 1), veth1=(99, 9, 9)), ["eth1", "missing"])
+    assert counters == {"eth1": (1500, 10, 1)}
+
+
+def test_traffic_stats_from_recorded_snapshots():
+    # 100 ms apart: 1000, 3000, 2000 packets per interval of 500-byte packets.
+    packets = [0, 1000, 4000, 6000]
+    snapshots = [(i * 0.1, parse_net_dev(net_dev((p * 500, p, i)), ["eth1"])) for i, p in enumerate(packets)]
+    stats = traffic_stats(snapshots)["eth1"]
+    assert stats["samples"] == 3
+    assert stats["peak_pps"] == pytest.approx(30000, rel=1e-6)
+    assert stats["p99_pps"] == stats["peak_pps"]
+    assert stats["peak_bps"] == pytest.approx(30000 * 500 * 8, rel=1e-6)
+    assert stats["dropped"] == 3
+
+
+def test_counter_reset_intervals_are_skipped():
+    snapshots = [(0.0, {"eth1": (1000, 10, 0)}), (0.1, {"eth1": (10, 1, 0)}), (0.2, {"eth1": (510, 6, 0)})]
+    assert traffic_stats(snapshots)["eth1"]["samples"] == 1
+
+
+def test_percentile_nearest_rank():
+    assert percentile(list(range(1, 101)), 99) == 99
+    assert percentile([5], 99) == 5
+    assert percentile([], 99) == 0
+
+
+def test_recommend_caps_workers_at_rx_queues():
+    stats = {"p99_pps": 2000000, "peak_bps": 8000000000}
+    assert recommend(stats)["threads"] == 12
+    recommendation = recommend(stats, rx_queues=8)
+    assert recommendation["threads"] == 8
+    assert recommendation["ring"]["threads"] == 8
+
+
+@pytest.fixture
+def net_dev_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "dev")
+        with open(path, "wb") as f:
+            f.write(net_dev((1500, 10, 0)))
+        yield path
+
+
+def test_take_snapshots_reads_the_file_repeatedly(net_dev_file):
+    snapshots = take_snapshots(["eth1"], 0.05, interval_ms=10, path=net_dev_file)
+    assert len(snapshots) >= 5
+    assert snapshots[-1][1] == {"eth1": (1500, 10, 0)}
+
+
+def test_configurator_writes_sampled_section(net_dev_file):
+    configurator = NIDSConfigurator(non_interactive=True, sample_seconds=0.02, sample_interval_ms=10)
+    configurator.net_interfaces = {}
+    configurator.config["network"]["interfaces"] = ["eth1"]
+    sampled = configurator.sample_traffic(net_dev_file)
+    assert sampled["eth1"]["peak_pps"] == 0
+    assert sampled["eth1"]["recommended"]["threads"] == 1
+    assert configurator.config["performance"]["sampled"] is sampled
+
+
+def test_configurator_reports_unreadable_counters(capsys):
+    configurator = NIDSConfigurator(non_interactive=True, sample_seconds=0.02, sample_interval_ms=10)
+    configurator.net_interfaces = {}
+    configurator.config["network"]["interfaces"] = ["eth1"]
+    with pytest.raises(SystemExit):
+        configurator.sample_traffic("/nonexistent/net/dev")
+    assert capsys.readouterr().out.splitlines()[-1].startswith("Error: cannot sample traffic counters")
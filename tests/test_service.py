@@ -0,0 +1,131 @@
+import asyncio
+import http.client
+import json
+import os
+import tempfile
+import threading
+
+import pytest
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.service import ConfigService, RenderCache, ServiceClient, start_servers
+
+
+@pytest.fixture
+def service():
+    return ConfigService(NIDSConfigurator().default_config(), cache_size=2)
+
+
+@pytest.fixture
+def running(service):
+    # Serves on a real Unix socket and HTTP port from a background event loop.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "nids.sock")
+        loop = asyncio.new_event_loop()
+        servers = loop.run_until_complete(start_servers(service, path, http_port=0))
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        yield path, servers[1].sockets[0].getsockname()[1]
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        for server in servers:
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+        loop.close()
+
+
+def test_cache_evicts_least_recently_used():
+    cache = RenderCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 1, "misses": 1}
+
+
+def test_render_is_cached_by_overrides(service):
+    first = service.handle({"id": 1, "op": "render", "overrides": {"nids_name": "s1"}, "format": "both"})
+    assert first["ok"] and not first["cached"]
+    assert first["config"]["general"]["nids_name"] == "s1"
+    assert "nids_name: s1" in first["yaml"]
+    again = service.handle({"id": 2, "op": "render", "overrides": {"nids_name": "s1"}})
+    assert again["cached"] and again["id"] == 2
+    assert "config" not in again
+    # The base config is never modified by a render.
+    assert service.base_config["general"]["nids_name"] == "MyNIDS"
+
+
+def test_validate_reports_conflicts_and_bad_fields(service):
+    response = service.handle({"op": "validate", "overrides": {
+        "ipv4_home_nets": "10.0.0.0/24", "ipv4_excluded_nets": "10.0.0.0/16"}})
+    assert response["ok"]
+    assert any("fully covered" in conflict for conflict in response["conflicts"])
+    response = service.handle({"op": "validate", "overrides": {"log_level": "LOUD"}})
+    assert not response["ok"]
+    assert "log_level" in response["error"]
+
+
+def test_diff_against_current_config(service):
+    current = NIDSConfigurator().default_config()
+    response = service.handle({"op": "diff", "overrides": {"log_mode": "syslog"}, "current": current})
+    assert response["changed"]
+    assert response["diff"] == {"logging": {"status": "changed", "keys": ["mode"]}}
+    assert not service.handle({"op": "diff", "current": current})["changed"]
+    assert not service.handle({"op": "diff"})["ok"]
+
+
+def test_diff_rejects_unreadable_or_invalid_current_config(service, capsys):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = {name: os.path.join(tmpdir, f"{name}.yml") for name in ("missing", "broken", "scalar")}
+        for name, text in (("broken", "general: [unclosed\n"), ("scalar", "just a string\n")):
+            with open(paths[name], "w") as f:
+                f.write(text)
+        requests = [{"path": path} for path in paths.values()] + [{"current": ["general"]}]
+        for request in requests:
+            response = service.handle(dict(request, op="diff"))
+            assert not response["ok"]
+            assert "diff" not in response
+    assert capsys.readouterr().out == ""
+
+
+def test_unknown_op_is_an_error(service):
+    response = service.handle({"id": 7, "op": "shutdown"})
+    assert response == {"id": 7, "ok": False, "error": "op must be one of render, validate, diff, stats, ping"}
+
+
+def test_unix_socket_clients(service, running):
+    path, _port = running
+    with ServiceClient(path) as client:
+        assert client.request("ping")["ok"]
+        assert client.request("render", overrides={"interfaces": ["eth1"]}, format="json")["config"][
+            "network"]["interfaces"] == ["eth1"]
+    # Concurrent clients on separate connections.
+    results = []
+
+    def worker(name):
+        with ServiceClient(path) as client:
+            results.append(client.request("render", overrides={"nids_name": name})["ok"])
+
+    threads = [threading.Thread(target=worker, args=(f"n{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 8
+    with ServiceClient(path) as client:
+        client.sock.sendall(b"not json\n")
+        assert client.stream.readline().startswith(b'{"id":null,"ok":false,"error":"invalid JSON')
+        assert client.request("stats")["requests"] == 11
+
+
+def test_http_listener(running):
+    _path, port = running
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request("POST", "/render", body=json.dumps({"overrides": {"nids_name": "web"}}))
+    response = connection.getresponse()
+    assert response.status == 200
+    assert "nids_name: web" in json.loads(response.read())["yaml"]
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request("GET", "/nothing")
+    assert connection.getresponse().status == 400
@@ -0,0 +1,111 @@
+import os
+import tempfile
+
+import pytest
+import yaml
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.sharding import (
+    index_path_for, instance_config, instance_log_file, plan_shards, shard_dir_for, write_shards
+)
+
+
+@pytest.fixture
+def config():
+    config = NIDSConfigurator().default_config()
+    config["network"]["interfaces"] = ["eth0", "eth1", "eth2", "eth3"]
+    config["network"]["ipv4_home_nets"] = ["10.0.0.0/8"]
+    config["network"]["interface_details"] = {
+        "eth0": {"numa_node": 0, "rx_queues": 8},
+        "eth1": {"numa_node": 0, "rx_queues": 2},
+        "eth2": {"numa_node": 1, "rx_queues": 4},
+        "eth3": {"numa_node": 1, "rx_queues": 4},
+    }
+    config["performance"] = {"rings": {"burst_ms": 100, "memory_bytes": 40, "interfaces": {
+        name: {"memory_bytes": 10} for name in config["network"]["interfaces"]}}}
+    config["rules"]["rule_files"] = ["/rules/a.rules"]
+    return config
+
+
+@pytest.fixture
+def output_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield tmpdir
+
+
+def test_shards_balance_capture_threads(config):
+    shards, warnings = plan_shards(config, instances=2)
+    # 8 + 2 threads against 4 + 4.
+    assert [shard["interfaces"] for shard in shards] == [["eth0", "eth1"], ["eth2", "eth3"]]
+    assert [shard["numa_node"] for shard in shards] == [0, 1]
+    assert warnings == []
+
+
+def test_more_instances_than_interfaces_is_capped(config):
+    shards, warnings = plan_shards(config, instances=10)
+    assert len(shards) == 4
+    assert "only 4 interfaces" in warnings[0]
+
+
+def test_shards_by_numa_node(config):
+    config["network"]["interfaces"].append("eth9")
+    shards, warnings = plan_shards(config, by_numa=True)
+    assert [(shard["name"], shard["interfaces"]) for shard in shards] == [
+        ("node0", ["eth0", "eth1", "eth9"]), ("node1", ["eth2", "eth3"])]
+    assert warnings == ["interface eth9: NUMA node unknown, placing it with node 0"]
+
+
+def test_no_interfaces_cannot_be_sharded(config):
+    config["network"]["interfaces"] = []
+    with pytest.raises(ValueError):
+        plan_shards(config, instances=2)
+
+
+def test_instance_config_keeps_only_its_own_pieces(config):
+    instance = instance_config(config, {"name": "node1", "interfaces": ["eth2", "eth3"], "numa_node": 1})
+    assert instance["include"] == ["address-groups.yml", "rules.yml"]
+    assert "rules" not in instance
+    assert "ipv4_home_nets" not in instance["network"]
+    assert sorted(instance["network"]["interface_details"]) == ["eth2", "eth3"]
+    assert instance["performance"]["rings"]["memory_bytes"] == 20
+    assert instance["general"]["nids_name"] == "MyNIDS-node1"
+    assert instance["logging"]["log_file"] == "/var/log/nids/alerts-node1.log"
+    # The rendered config itself is left alone.
+    assert len(config["network"]["interface_details"]) == 4
+
+
+def test_instance_log_file_without_extension():
+    assert instance_log_file("/var/log/nids/eve", "0") == "/var/log/nids/eve-0"
+
+
+def test_write_shards_layout_and_stale_instances(config, output_dir):
+    config_path = os.path.join(output_dir, "nids-config.yml")
+    shards, _ = plan_shards(config, instances=3)
+    write_shards(config, config_path, shards)
+    shards, _ = plan_shards(config, instances=2)
+    path = write_shards(config, config_path, shards)
+    assert path == index_path_for(config_path)
+
+    shard_dir = shard_dir_for(config_path)
+    assert sorted(os.listdir(shard_dir)) == ["address-groups.yml", "instance-0.yml", "instance-1.yml", "rules.yml"]
+    with open(path, encoding="utf-8") as f:
+        index = yaml.safe_load(f)
+    assert index["includes"] == ["nids-config.d/address-groups.yml", "nids-config.d/rules.yml"]
+    assert index["instances"]["1"]["config"] == "nids-config.d/instance-1.yml"
+    assert index["instances"]["1"]["interfaces"] == ["eth2", "eth3"]
+    assert index["instances"]["1"]["log_file"] == "/var/log/nids/alerts-1.log"
+    with open(os.path.join(shard_dir, "address-groups.yml"), encoding="utf-8") as f:
+        assert yaml.safe_load(f)["network"]["ipv4_home_nets"] == ["10.0.0.0/8"]
+    with open(os.path.join(shard_dir, "rules.yml"), encoding="utf-8") as f:
+        assert yaml.safe_load(f)["rules"]["rule_files"] == ["/rules/a.rules"]
+
+
+def test_write_shards_if_changed_keeps_mtimes(config, output_dir):
+    config_path = os.path.join(output_dir, "nids-config.yml")
+    shards, _ = plan_shards(config, instances=2)
+    write_shards(config, config_path, shards, if_changed=True)
+    instance_path = os.path.join(shard_dir_for(config_path), "instance-0.yml")
+    mtime = os.stat(instance_path).st_mtime_ns
+    config["network"]["ipv4_home_nets"] = ["192.168.0.0/16"]
+    write_shards(config, config_path, shards, if_changed=True)
+    assert os.stat(instance_path).st_mtime_ns == mtime
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+import pytest
+
+from src.nids_configurator.bundle import build_bundle
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+PACKAGE_DIR = os.path.join(SRC_DIR, "nids_configurator")
+
+# Extra wall time `--help` may take on top of a bare interpreter start, in milliseconds.
+STARTUP_BUDGET_MS = float(os.environ.get("NDIS_STARTUP_BUDGET_MS", "250"))
+
+HEAVY_MODULES = ("yaml", "ipaddress", "socket", "concurrent.futures", "hashlib", "mmap", "tempfile")
+
+
+def _env():
+    return dict(os.environ, PYTHONPATH=SRC_DIR)
+
+
+def _best_wall_time(cmd, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def test_help_does_not_import_heavy_modules():
+    probe = (
+        "import sys\n"
+        "sys.argv = ['nids-configurator', '--help']\n"
+        "from nids_configurator.__main__ import main\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print('loaded:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], env=_env(), capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == "loaded:"
+
+
+def test_help_does_not_detect_os():
+    probe = (
+        "import sys\n"
+        "sys.argv = ['nids-configurator', '--help']\n"
+        "import nids_configurator.osinfo as osinfo\n"
+        "osinfo.OSInfo.detect = lambda self: sys.exit('OS detection during --help')\n"
+        "from nids_configurator.__main__ import main\n"
+        "main()\n"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], env=_env(), capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_help_startup_within_budget():
+    baseline = _best_wall_time([sys.executable, "-c", "pass"])
+    startup = _best_wall_time([sys.executable, "-m", "nids_configurator", "--help"])
+    assert startup - baseline <= STARTUP_BUDGET_MS, (
+        f"--help took {startup:.1f} ms, {startup - baseline:.1f} ms over a bare interpreter "
+        f"(budget {STARTUP_BUDGET_MS:.0f} ms, override with NDIS_STARTUP_BUDGET_MS)"
+    )
+
+
+class TestBundle:
+
+    @pytest.fixture
+    def bundle_path(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "nids-configurator.pyz")
+            build_bundle(path, PACKAGE_DIR)
+            yield path
+
+    def test_bundle_contains_source_and_bytecode(self, bundle_path):
+        with zipfile.ZipFile(bundle_path) as bundle:
+            names = set(bundle.namelist())
+        assert "__main__.py" in names
+        assert {"nids_configurator/app.py", "nids_configurator/app.pyc"} <= names
+
+    def test_bundle_runs_help(self, bundle_path):
+        result = subprocess.run([sys.executable, bundle_path, "--help"], capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=""))
+        assert result.returncode == 0
+        assert "NIDS Configuration Application" in result.stdout
+
+    def test_bundle_loads_precompiled_bytecode(self, bundle_path):
+        # Replace one module's source with a same-sized stub: only the .pyc can make --help work.
+        patched = bundle_path + ".patched"
+        with zipfile.ZipFile(bundle_path) as src, zipfile.ZipFile(patched, "w") as dst:
+            for info in src.infolist():
+                data = src.read(info)
+                if info.filename == "nids_configurator/osinfo.py":
+                    stub = b"raise SystemExit('source was compiled')\n"
+                    data = stub + b"#" * (len(data) - len(stub))
+                dst.writestr(info, data)
+        result = subprocess.run([sys.executable, patched, "--help"], capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=""))
+        assert result.returncode == 0, result.stderr
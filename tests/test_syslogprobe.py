@@ -0,0 +1,154 @@
+import socket
+
+import pytest
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.syslogprobe import (
+    ProbeError, SyslogReceiver, build_message, frame, parse_target, probe_target, recommend, resolve_target
+)
+
+
+@pytest.fixture
+def receiver():
+    with SyslogReceiver() as stand_in:
+        yield stand_in
+
+
+def _trial(transport, batch, rate, loss=None, error=None):
+    return {"transport": transport, "batch": batch, "sent": 0 if error else 1000, "rate": rate, "loss": loss,
+            "error": error}
+
+
+@pytest.mark.parametrize("target, expected", [
+    ("logs.example.com:6514", ("logs.example.com", 6514)),
+    ("10.0.0.5", ("10.0.0.5", 514)),
+    ("[2001:db8::5]:601", ("2001:db8::5", 601)),
+    ("2001:db8::5", ("2001:db8::5", 514)),
+])
+def test_parse_target(target, expected):
+    assert parse_target(target) == expected
+
+
+@pytest.mark.parametrize("target", ["", "host:0", "host:70000", "host:syslog", "[2001:db8::5", "log host:514"])
+def test_parse_target_rejects_bad_targets(target):
+    with pytest.raises(ProbeError):
+        parse_target(target)
+
+
+def test_resolve_target():
+    assert (socket.AF_INET, ("127.0.0.1", 514)) in resolve_target("127.0.0.1", 514)
+    with pytest.raises(ProbeError, match="cannot resolve"):
+        resolve_target("nids-probe.invalid", 514)
+
+
+def test_messages_are_rfc5424_with_octet_counting():
+    message = build_message("<132>1 2026-01-01T00:00:00Z sensor nids-configurator 42 probe ", 7, 123, 200)
+    assert len(message) == 200
+    assert message.startswith(b'<132>1 2026-01-01T00:00:00Z sensor nids-configurator 42 probe '
+                              b'[nidsprobe@32473 seq="7" sent="123"] ')
+    assert frame(b"abc") == b"3 abc"
+
+
+def test_receiver_counts_both_framings(receiver):
+    first, second, third = (build_message("<132>1 - - - - probe ", seq, 0, 64) for seq in (1, 2, 3))
+    with socket.create_connection(receiver.address[1]) as sock:
+        sock.sendall(frame(first) + frame(second)[:10])
+        sock.sendall(frame(second)[10:] + third + b"\nnot a probe message\n")
+        assert receiver.wait(3)[0] == 3
+
+
+def test_receiver_counts_duplicates_once(receiver):
+    message = build_message("<132>1 - - - - probe ", 1, 0, 64)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _ in range(3):
+            sock.sendto(message, receiver.address[1])
+        sock.sendto(build_message("<132>1 - - - - probe ", 2, 0, 64), receiver.address[1])
+        assert receiver.wait(3, timeout=0.5, idle=0.2)[0] == 2
+
+
+def test_probe_local_receiver(receiver):
+    trials = probe_target(*receiver.address, count=500, size=256, batch_sizes=(1, 16), receiver=receiver)
+    assert [(trial["transport"], trial["batch"]) for trial in trials] == [("udp", 1), ("tcp", 1), ("tcp", 16)]
+    for trial in trials:
+        assert trial["error"] is None
+        assert trial["latency"] == "delivery"
+        assert trial["latency_ms"]["p50"] <= trial["latency_ms"]["p99"] <= trial["latency_ms"]["max"]
+    # TCP is reliable; UDP on loopback may drop part of a burst.
+    assert [trial["loss"] for trial in trials[1:]] == [0, 0]
+    assert 0 <= trials[0]["loss"] < 1
+
+
+def test_probe_closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    trials = probe_target(socket.AF_INET, ("127.0.0.1", port), count=50)
+    assert trials[-1]["transport"] == "tcp" and trials[-1]["error"]
+    assert len(trials) == 2
+    if trials[0]["error"] is not None:
+        assert recommend(trials) is None
+
+
+def test_recommend_prefers_the_smallest_tcp_batch_that_keeps_up():
+    trials = [_trial("udp", 1, 90000, loss=0), _trial("tcp", 1, 1500, loss=0), _trial("tcp", 8, 9000, loss=0),
+              _trial("tcp", 32, 30000, loss=0)]
+    result = recommend(trials, alert_rate=2000)
+    assert result["ok"]
+    assert result["settings"] == {"syslog_transport": "tcp", "syslog_batch_size": 8, "syslog_flush_ms": 4,
+                                  "syslog_queue_size": 20000}
+
+
+def test_recommend_udp_only_collector():
+    trials = [_trial("udp", 1, 50000), _trial("tcp", 1, 0, error="Connection refused")]
+    result = recommend(trials, alert_rate=1000)
+    # Unmeasured UDP loss is not taken as lossless.
+    assert not result["ok"]
+    assert result["settings"]["syslog_transport"] == "udp"
+    assert result["settings"]["syslog_flush_ms"] == 0
+    assert any("does not accept TCP" in note for note in result["notes"])
+    assert any("not measured" in note for note in result["notes"])
+
+
+def test_recommend_prefers_unmeasured_tcp_to_unmeasured_udp():
+    trials = [_trial("udp", 1, 90000), _trial("tcp", 1, 800), _trial("tcp", 8, 2500)]
+    result = recommend(trials, alert_rate=1000)
+    assert result["ok"]
+    assert (result["settings"]["syslog_transport"], result["settings"]["syslog_batch_size"]) == ("tcp", 8)
+
+
+def test_recommend_flags_a_collector_that_cannot_keep_up():
+    trials = [_trial("udp", 1, 90000, loss=0.2), _trial("tcp", 1, 500, loss=0), _trial("tcp", 8, 800, loss=0)]
+    result = recommend(trials, alert_rate=1000)
+    assert not result["ok"]
+    assert (result["settings"]["syslog_transport"], result["settings"]["syslog_batch_size"]) == ("tcp", 8)
+    assert "keep mode 'both'" in result["notes"][0]
+
+
+def test_configurator_writes_recommendation(receiver, capsys):
+    configurator = NIDSConfigurator(probe_messages=200, alert_rate=100)
+    configurator.config["logging"].update(mode="both", syslog_target=receiver.target)
+    result = configurator.probe_syslog_target()
+    logging_cfg = configurator.config["logging"]
+    assert logging_cfg["syslog_transport"] == result["settings"]["syslog_transport"] == "tcp"
+    assert logging_cfg["syslog_queue_size"] == 1000
+    assert "Recommended:" in capsys.readouterr().out
+
+
+def test_local_probe_only_reports(capsys):
+    configurator = NIDSConfigurator(probe_local=True, probe_messages=200, alert_rate=100)
+    configurator.config["logging"]["mode"] = "both"
+    before = dict(configurator.config["logging"])
+    assert configurator.probe_syslog_target()["settings"]["syslog_queue_size"] == 1000
+    assert configurator.config["logging"] == before
+    out = capsys.readouterr().out
+    assert "Recommended:" in out and "not written to the config" in out
+
+
+def test_configurator_probe_checks_mode_and_target(capsys):
+    configurator = NIDSConfigurator()
+    assert configurator.probe_syslog_target() is None
+    assert "skipped" in capsys.readouterr().out
+    configurator.config["logging"].update(mode="syslog", syslog_target="collector:99999")
+    with pytest.raises(SystemExit):
+        configurator.probe_syslog_target()
+    assert "not a valid port" in capsys.readouterr().out
@@ -0,0 +1,80 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from src.nids_configurator.app import NIDSConfigurator
+from src.nids_configurator.topology import format_cpu_list, parse_cpu_list, plan_workers, read_topology
+
+
+def write(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(f"{value}\n")
+
+
+@pytest.fixture
+def sysfs():
+    # Two NUMA nodes with 4 cores and 2 threads per core: node0 cpus 0-3,8-11, node1 cpus 4-7,12-15.
+    with tempfile.TemporaryDirectory() as root:
+        write(os.path.join(root, "cpu", "online"), "0-15")
+        write(os.path.join(root, "node", "node0", "cpulist"), "0-3,8-11")
+        write(os.path.join(root, "node", "node1", "cpulist"), "4-7,12-15")
+        for cpu in range(16):
+            core = cpu % 8
+            write(os.path.join(root, "cpu", f"cpu{cpu}", "topology", "thread_siblings_list"), f"{core},{core + 8}")
+        yield root
+
+
+def test_cpu_list_round_trip():
+    assert parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    assert format_cpu_list([11, 0, 1, 2, 3, 8, 10]) == "0-3,8,10-11"
+    assert parse_cpu_list("") == []
+
+
+def test_read_topology_groups_cpus_by_node(sysfs):
+    topology = read_topology(sysfs)
+    assert topology["nodes"] == {0: [0, 1, 2, 3, 8, 9, 10, 11], 1: [4, 5, 6, 7, 12, 13, 14, 15]}
+    assert topology["siblings"][9] == [1, 9]
+
+
+def test_read_topology_without_numa_uses_one_node(sysfs):
+    write(os.path.join(sysfs, "cpu", "online"), "0-3")
+    os.rename(os.path.join(sysfs, "node"), os.path.join(sysfs, "node.off"))
+    assert read_topology(sysfs)["nodes"] == {0: [0, 1, 2, 3]}
+
+
+def test_workers_stay_on_the_nic_node_away_from_management(sysfs):
+    details = {"ens1f0": {"numa_node": 1, "rx_queues": 8}, "eno1": {"numa_node": 0, "rx_queues": 2}}
+    section, warnings = plan_workers(read_topology(sysfs), ["ens1f0", "eno1"], details)
+    assert section["workers"]["ens1f0"] == {"numa_node": 1, "threads": 4, "cpu_affinity": "4-7"}
+    # Both nodes carry one interface, so management goes to the lower node.
+    assert section["management_cpus"] == "0,8"
+    assert section["workers"]["eno1"] == {"numa_node": 0, "threads": 2, "cpu_affinity": "1-2"}
+    assert warnings == ["interface ens1f0: 8 RX queues but only 4 cores on NUMA node 1"]
+
+
+def test_interfaces_on_one_node_share_its_cores(sysfs):
+    details = {"a": {"numa_node": 1, "rx_queues": 16}, "b": {"numa_node": 1, "rx_queues": 16}}
+    section, _ = plan_workers(read_topology(sysfs), ["a", "b"], details)
+    assert section["management_cpus"] == "0,8"
+    assert section["workers"]["a"]["cpu_affinity"] == "4-5"
+    assert section["workers"]["b"]["cpu_affinity"] == "6-7"
+
+
+def test_single_cpu_host_still_gets_a_worker():
+    section, warnings = plan_workers({"nodes": {0: [0]}, "siblings": {0: [0]}}, ["eth0"], {})
+    assert section["workers"]["eth0"]["cpu_affinity"] == "0"
+    assert section["management_cpus"] == ""
+    assert warnings
+
+
+def test_configurator_writes_performance_section(sysfs):
+    configurator = NIDSConfigurator(non_interactive=True)
+    configurator.net_interfaces = {}
+    configurator.config["network"]["interfaces"] = ["eth0"]
+    configurator.config["network"]["interface_details"] = {"eth0": {"numa_node": 1, "rx_queues": 2}}
+    with patch("src.nids_configurator.topology.read_topology", lambda: read_topology(sysfs)):
+        configurator.plan_worker_layout()
+    assert configurator.config["performance"]["workers"]["eth0"]["cpu_affinity"] == "4-5"
@@ -0,0 +1,166 @@
+import os
+import tempfile
+
+import pytest
+import yaml
+
+from src.nids_configurator import watch
+from src.nids_configurator.__main__ import configurator_from_argv
+from src.nids_configurator.watch import (
+    EnvFile, InotifyWatcher, PollingWatcher, WatchSession, read_env_file, run_watch, wait_for_changes, watch_targets
+)
+
+
+@pytest.fixture
+def tmpdir():
+    with tempfile.TemporaryDirectory() as path:
+        yield path
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_read_env_file(tmpdir):
+    path = os.path.join(tmpdir, "default")
+    _write(path, '# comment\nNDIS_NIDS_NAME="EnvNIDS"\nexport NDIS_LOG_MODE=both\nNDIS_X=\'a b\'\nnot a line\n')
+    assert read_env_file(path) == {"NDIS_NIDS_NAME": "EnvNIDS", "NDIS_LOG_MODE": "both", "NDIS_X": "a b"}
+    assert read_env_file(os.path.join(tmpdir, "missing")) == {}
+
+
+def test_env_file_restores_removed_keys(tmpdir, monkeypatch):
+    monkeypatch.setenv("NDIS_LOG_MODE", "file")
+    monkeypatch.delenv("NDIS_NIDS_NAME", raising=False)
+    path = os.path.join(tmpdir, "default")
+    _write(path, "NDIS_LOG_MODE=syslog\nNDIS_NIDS_NAME=a\n")
+    env = EnvFile(path)
+    env.load()
+    assert os.environ["NDIS_LOG_MODE"] == "syslog"
+    _write(path, "NDIS_NIDS_NAME=b\n")
+    env.load()
+    assert os.environ["NDIS_LOG_MODE"] == "file"
+    assert os.environ["NDIS_NIDS_NAME"] == "b"
+    _write(path, "")
+    env.load()
+    assert "NDIS_NIDS_NAME" not in os.environ
+
+
+def test_inotify_watcher_reports_groups_and_new_subdirectories(tmpdir):
+    rules = os.path.join(tmpdir, "rules")
+    os.makedirs(rules)
+    env_file = os.path.join(tmpdir, "etc", "default")
+    _write(env_file, "")
+    try:
+        watcher = InotifyWatcher([("rules", rules, True), ("env", env_file, False)])
+    except OSError:
+        pytest.skip("inotify not available")
+    try:
+        _write(os.path.join(tmpdir, "etc", "unrelated"), "x")
+        assert watcher.poll(0.2) == set()
+        os.makedirs(os.path.join(rules, "et", "open"))
+        assert watcher.poll(1) == {"rules"}
+        _write(os.path.join(rules, "et", "open", "emerging-dns.rules"), "alert ip any any -> any any (sid:1;)\n")
+        assert watcher.poll(1) == {"rules"}
+        _write(env_file, "NDIS_NIDS_NAME=x\n")
+        assert watcher.poll(1) == {"env"}
+    finally:
+        watcher.close()
+
+
+def test_polling_watcher(tmpdir):
+    rules = os.path.join(tmpdir, "rules")
+    _write(os.path.join(rules, "a.rules"), "")
+    watcher = PollingWatcher([("rules", rules, True), ("env", os.path.join(tmpdir, "missing"), False)],
+                             interval_s=0.01)
+    assert watcher.poll(0.05) == set()
+    _write(os.path.join(rules, "sub", "b.rules"), "x")
+    assert watcher.poll(1) == {"rules"}
+    _write(os.path.join(tmpdir, "missing"), "now there")
+    assert watcher.poll(1) == {"env"}
+
+
+class ScriptedWatcher:
+    def __init__(self, events):
+        self.events = list(events)
+        self.timeouts = []
+
+    def poll(self, timeout=None):
+        self.timeouts.append(timeout)
+        return self.events.pop(0) if self.events else set()
+
+
+def test_bursts_are_debounced_into_one_change():
+    watcher = ScriptedWatcher([set(), {"rules"}, {"rules"}, {"env"}])
+    assert wait_for_changes(watcher, debounce_s=0.5) == {"rules", "env"}
+    assert watcher.timeouts == [None, None, 0.5, 0.5, 0.5]
+
+
+def test_storms_are_cut_off_at_max_delay():
+    watcher = ScriptedWatcher([{"rules"}] * 1000)
+    assert wait_for_changes(watcher, debounce_s=0.5, max_delay_s=0) == {"rules"}
+
+
+def test_session_recomputes_changed_sections(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    rules = os.path.join(tmpdir, "rules")
+    _write(os.path.join(rules, "a.rules"), "alert ip any any -> any any (sid:1;)\n")
+    feed = os.path.join(tmpdir, "drop.txt")
+    _write(feed, "192.0.2.0/24\n")
+    argv = ["--non-interactive", "--rule-path", rules, "--rule-manifest", "--import-excluded", feed]
+    session = WatchSession(lambda: configurator_from_argv(argv))
+    session.render_all()
+    assert [target[:2] for target, _exists in session.targets()] == [("network", feed), ("rules", rules)]
+
+    _write(os.path.join(rules, "b.rules"), "alert ip any any -> any any (sid:2;)\n")
+    assert session.regenerate({"rules"}) == {"rules"}
+    with open("nids-config.yml", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    assert [os.path.basename(path) for path in config["rules"]["rule_files"]] == ["a.rules", "b.rules"]
+    assert config["network"]["ipv4_excluded_nets"] == ["192.0.2.0/24"]
+
+    _write(feed, "198.51.100.0/24\n")
+    session.regenerate({"network"})
+    with open("nids-config.yml", encoding="utf-8") as f:
+        # Imports are applied to the base lists again, not on top of the previous result.
+        assert yaml.safe_load(f)["network"]["ipv4_excluded_nets"] == ["198.51.100.0/24"]
+
+
+class EditingWatcher:
+    # Applies one edit per wait and reports it as a change; Ctrl-C once the edits run out.
+    def __init__(self, edits):
+        self.edits = list(edits)
+
+    def poll(self, timeout=None):
+        if timeout is not None:
+            return set()
+        if not self.edits:
+            raise KeyboardInterrupt
+        self.edits.pop(0)()
+        return {"manifest"}
+
+    def close(self):
+        pass
+
+
+def test_broken_manifest_keeps_the_watch_running(tmpdir, monkeypatch, capsys):
+    manifest = os.path.join(tmpdir, "hosts.yaml")
+    out = os.path.join(tmpdir, "out")
+    _write(manifest, "- host: h1\n")
+    edits = [lambda: _write(manifest, "- host: h2\n- [unclosed\n"), lambda: os.remove(manifest),
+             lambda: _write(manifest, "- host: h1\n- host: h2\n")]
+    monkeypatch.setattr(watch, "make_watcher", lambda *args: EditingWatcher(edits))
+    argv = ["--batch", manifest, "--output-dir", out, "--jobs", "1"]
+    assert run_watch(lambda: configurator_from_argv(argv)) == 0
+    output = capsys.readouterr().out
+    assert "Error: invalid YAML manifest" in output
+    assert "No such file or directory" in output
+    assert output.count("Regeneration failed") == 2
+    assert sorted(os.listdir(out)) == ["h1.yml", "h2.yml"]
+
+
+def test_watch_targets_skip_stdin():
+    configurator, args = configurator_from_argv(["--import-home", "-", "--rule-checksums", "/x/SHA256SUMS"])
+    assert watch_targets(configurator, "/etc/default/nids-configurator", "-") == [
+        ("env", "/etc/default/nids-configurator", False), ("rules", "/x/SHA256SUMS", False)]
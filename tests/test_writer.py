@@ -0,0 +1,61 @@
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from src.nids_configurator import writer
+
+
+@pytest.fixture
+def tmpdir():
+    with tempfile.TemporaryDirectory() as path:
+        yield path
+
+
+def test_dump_yaml_prefers_libyaml_dumper():
+    if not getattr(yaml, "__with_libyaml__", False):
+        pytest.skip("libyaml not available")
+    assert writer.yaml_dumper() is yaml.CSafeDumper
+
+
+def test_dump_yaml_falls_back_to_pure_python_dumper():
+    with patch.object(writer.require_yaml(), "CSafeDumper", None):
+        assert writer.yaml_dumper() is yaml.SafeDumper
+        assert writer.dump_yaml({"b": 1, "a": [1, 2]}) == "b: 1\na:\n- 1\n- 2\n"
+
+
+def test_write_config_yaml_loads_pyyaml_on_first_use(tmpdir):
+    # A fresh interpreter (like a spawned batch worker) has not called require_yaml() yet.
+    path = os.path.join(tmpdir, "nids-config.yml")
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    code = f"from nids_configurator.writer import write_config_yaml; write_config_yaml({path!r}, {{'general': {{}}}})"
+    subprocess.run([sys.executable, "-c", code], env=dict(os.environ, PYTHONPATH=src), check=True)
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "general: {}\n"
+
+
+def test_atomic_write_preserves_existing_file_mode(tmpdir):
+    path = os.path.join(tmpdir, "cfg.yml")
+    with open(path, "w") as f:
+        f.write("old")
+    os.chmod(path, 0o640)
+    writer.atomic_write(path, "new")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    with open(writer.backup_path_for(path)) as f:
+        assert f.read() == "old"
+
+
+def test_atomic_write_leaves_target_untouched_on_failure(tmpdir):
+    path = os.path.join(tmpdir, "cfg.yml")
+    writer.atomic_write(path, "old", backup=False)
+    with patch("os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            writer.atomic_write(path, "new")
+    with open(path) as f:
+        assert f.read() == "old"
+    assert sorted(os.listdir(tmpdir)) == ["cfg.yml", "cfg.yml.bak"]
@@ -0,0 +1,8 @@
+#!/usr/bin/env bash
+# Precompile with the target's own python3, so neither the loose modules nor the
+# bundle have to be compiled again on every (non-root) start.
+
+APP_DIR="/opt/nids-configurator"
+
+python3 -m compileall -q "$APP_DIR/nids_configurator" || true
+PYTHONPATH="$APP_DIR" python3 -m nids_configurator.bundle "$APP_DIR/nids-configurator.pyz" || true
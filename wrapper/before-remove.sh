@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+# Remove the files generated by after-install.sh, they are not tracked by the package.
+
+APP_DIR="/opt/nids-configurator"
+
+rm -f "$APP_DIR/nids-configurator.pyz"
+rm -rf "$APP_DIR/nids_configurator/__pycache__"